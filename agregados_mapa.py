@@ -0,0 +1,99 @@
+# agregados_mapa.py
+import math
+
+import pandas as pd
+
+from almacen import SIN_DISTRITO, distrito_del_cubo
+from cache_memoria import memoizar
+from geocodificador import geocodificar_distritos, resolver_lote
+
+# ==============================================================================
+# 1. CONTEOS POR DISTRITO CON COORDENADAS
+# ==============================================================================
+
+
+def sumar_por_distrito(celdas, distritos=None, secciones=None, fuentes=None):
+    """
+    DataFrame (Distrito, Delitos) a partir de celdas del cubo (CuboPorDia.ventana).
+    `secciones` es una máscara de bits; 'LIMA' cuenta como 'CERCADO DE LIMA'.
+    """
+    celdas = celdas[celdas["Distrito"] != SIN_DISTRITO]
+    if distritos is not None:
+        celdas = celdas[celdas["Distrito"].isin([distrito_del_cubo(d) for d in distritos])]
+    if fuentes is not None:
+        celdas = celdas[celdas["Fuente"].isin(fuentes)]
+    if secciones is not None:
+        celdas = celdas[(celdas["Secciones"].to_numpy(dtype=int) & secciones) != 0]
+    return (celdas.groupby("Distrito", as_index=False)["Casos"].sum()
+            .rename(columns={"Casos": "Delitos"}))
+
+
+@memoizar("geocodigos")
+def coordenadas_distritos(distritos):
+    """lat/lon de una tupla de distritos. No depende de los datos: sobrevive a los escaneos."""
+    return geocodificar_distritos(pd.Series(distritos, dtype=object), respaldo=resolver_lote)
+
+
+def geocodificar_con_cache(serie):
+    """
+    geocodificar_distritos con la caché "geocodigos" del proceso, para el
+    dashboard y la API por igual.
+    """
+    return coordenadas_distritos(tuple(serie)).set_axis(serie.index)
+
+
+def ubicar_conteos(conteos, respaldo=resolver_lote, geocodificar=None):
+    """
+    Agrega lat/lon a un DataFrame (Distrito, Delitos) de
+    AlmacenNoticias.conteos_por_distrito. Son unas decenas de filas: el
+    geocodificador resuelve cada distrito una sola vez. `geocodificar(serie)`
+    reemplaza a geocodificar_distritos (por ejemplo, una versión con caché).
+    """
+    if conteos.empty:
+        return conteos.assign(lat=[], lon=[])
+    if geocodificar is None:
+        coordenadas = geocodificar_distritos(conteos["Distrito"], respaldo=respaldo)
+    else:
+        coordenadas = geocodificar(conteos["Distrito"])
+    return conteos.join(coordenadas).dropna(subset=["lat", "lon"])
+
+# ==============================================================================
+# 2. CELDAS SEGÚN EL ZOOM
+# ==============================================================================
+
+
+def grados_por_celda(zoom, pixeles=60):
+    """Lado de la celda en grados para que mida ~`pixeles` en pantalla a ese zoom."""
+    return pixeles * 360 / (256 * 2 ** zoom)
+
+
+def agrupar_en_celdas(ubicados, zoom, pixeles=60):
+    """
+    Junta los distritos que caen en la misma celda de una grilla regular cuyo
+    tamaño depende del zoom (alejado = celdas grandes). Devuelve una fila por
+    celda con el total de delitos, el centro ponderado y los distritos.
+    """
+    columnas = ["lat", "lon", "Delitos", "Distritos", "radio"]
+    if ubicados.empty:
+        return pd.DataFrame(columns=columnas)
+
+    lado = grados_por_celda(zoom, pixeles)
+    celdas = ubicados.assign(
+        fila=(ubicados["lat"] // lado).astype(int),
+        columna=(ubicados["lon"] // lado).astype(int),
+        lat_p=ubicados["lat"] * ubicados["Delitos"],
+        lon_p=ubicados["lon"] * ubicados["Delitos"],
+    ).groupby(["fila", "columna"]).agg(
+        Delitos=("Delitos", "sum"),
+        lat_p=("lat_p", "sum"),
+        lon_p=("lon_p", "sum"),
+        Distritos=("Distrito", lambda d: ", ".join(sorted(d))),
+    ).reset_index(drop=True)
+
+    celdas["lat"] = celdas["lat_p"] / celdas["Delitos"]
+    celdas["lon"] = celdas["lon_p"] / celdas["Delitos"]
+    # Área del círculo proporcional a los delitos, sin pasar de media celda
+    metros_lado = lado * 111_000
+    celdas["radio"] = ((metros_lado / 2) * (celdas["Delitos"] / celdas["Delitos"].max()).map(math.sqrt)
+                       ).clip(lower=metros_lado * 0.08)
+    return celdas[columnas]
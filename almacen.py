@@ -0,0 +1,664 @@
+# almacen.py
+import argparse
+import csv
+import json
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from bd_local import BaseSQLite
+from clasificador import BUSCADOR_DELITOS, BUSCADOR_DISTRITOS, mascara_secciones
+from config import (
+    ALIAS_FUENTES, RUTA_ALMACEN, RUTA_CSV_HISTORICO, UMBRAL_DUPLICADO, VENTANA_DUPLICADOS_DIAS,
+    ZONA_LIMA
+)
+from deduplicacion import bandas_lsh, enlace_canonico, firma_minhash, jaccard, palabras_titular
+from fechas import SIN_FECHA, acotar_ventana, dia_de, fecha_en_url
+
+SIN_DISTRITO = "⚠️ No Especificado"
+
+# Nombres guardados en incidentes que el cubo junta bajo otro (ver ESQUEMA_CUBO)
+DISTRITO_EN_CUBO = {"LIMA": "CERCADO DE LIMA"}
+
+
+def distrito_del_cubo(distrito):
+    return DISTRITO_EN_CUBO.get(distrito, distrito)
+
+
+def variantes_distrito(distritos):
+    """Todos los nombres de `incidentes` que cuentan como esos distritos ('LIMA' <-> 'CERCADO DE LIMA')."""
+    canonicos = {distrito_del_cubo(d) for d in distritos}
+    return sorted(canonicos | {d for d, canonico in DISTRITO_EN_CUBO.items() if canonico in canonicos})
+
+# Columnas de la base -> columnas que usa el dashboard
+COLUMNAS = {
+    "titular": "Titular",
+    "enlace": "Enlace",
+    "fuente": "Fuente",
+    "distrito": "Distrito",
+    "categoria": "Categoría",
+    "secciones": "Secciones",
+    "fecha_scrapeo": "Fecha",
+    "publicado": "Publicado",
+    "dia": "Día",
+}
+
+# ==============================================================================
+# 1. FECHAS
+# ==============================================================================
+
+
+def ahora_lima():
+    return datetime.now(ZONA_LIMA).isoformat(timespec="seconds")
+
+
+def _restar_dias(fecha_iso, dias=VENTANA_DUPLICADOS_DIAS):
+    return (datetime.fromisoformat(fecha_iso) - timedelta(days=dias)).isoformat(timespec="seconds")
+
+# ==============================================================================
+# 2. ALMACÉN DE INCIDENTES (SQLITE, SOLO SE AGREGAN FILAS)
+# ==============================================================================
+
+
+class AlmacenNoticias(BaseSQLite):
+    """
+    Reemplaza al DataFrame de st.session_state y al CSV plano: guarda cada
+    incidente una sola vez (índice único por enlace canónico) y responde los
+    filtros del dashboard con índices por distrito, categoría, fuente y fecha.
+
+    Cada incidente cae en la partición `dia` (día de publicación o, si la
+    fuente no la da, del escaneo): los filtros por rango de fechas recorren
+    solo los días pedidos con idx_incidentes_dia.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS incidentes (
+            id INTEGER PRIMARY KEY,
+            titular TEXT NOT NULL,
+            enlace TEXT NOT NULL,
+            enlace_canonico TEXT NOT NULL,
+            fuente TEXT NOT NULL,
+            distrito TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            fecha_scrapeo TEXT NOT NULL,
+            origen TEXT NOT NULL DEFAULT 'escaneo',
+            duplicado_de INTEGER,         -- Misma noticia ya guardada desde otro enlace
+            secciones INTEGER NOT NULL DEFAULT 0,  -- Bits de las secciones A-F (clasificador.py)
+            publicado TEXT,               -- ISO de la fuente o de la URL; NULL si no la dio
+            contexto TEXT,                -- Resumen o entradilla donde se buscó el distrito
+            dia TEXT NOT NULL DEFAULT ''  -- Partición: día de publicación, del escaneo o SIN_FECHA
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_incidentes_enlace ON incidentes(enlace_canonico);
+        CREATE INDEX IF NOT EXISTS idx_incidentes_distrito ON incidentes(distrito);
+        CREATE INDEX IF NOT EXISTS idx_incidentes_categoria ON incidentes(categoria);
+        CREATE INDEX IF NOT EXISTS idx_incidentes_fuente ON incidentes(fuente);
+        CREATE INDEX IF NOT EXISTS idx_incidentes_fecha ON incidentes(fecha_scrapeo);
+
+        CREATE TABLE IF NOT EXISTS escaneos (
+            id INTEGER PRIMARY KEY,
+            fuente TEXT NOT NULL,
+            inicio TEXT NOT NULL,
+            fin TEXT NOT NULL,
+            noticias INTEGER NOT NULL,
+            nuevas INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_escaneos_fuente ON escaneos(fuente, id);
+
+        -- Bandas LSH de los titulares recientes (ver deduplicacion.py). Solo
+        -- guarda VENTANA_DUPLICADOS_DIAS: su tamaño no crece con el archivo.
+        CREATE TABLE IF NOT EXISTS bandas_titular (
+            banda INTEGER NOT NULL,
+            valor INTEGER NOT NULL,
+            incidente_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_bandas_valor ON bandas_titular(banda, valor);
+        CREATE INDEX IF NOT EXISTS idx_bandas_fecha ON bandas_titular(fecha);
+
+        -- Revisión de los datos y avance de la reclasificación (reclasificar.py)
+        CREATE TABLE IF NOT EXISTS estado (
+            clave TEXT PRIMARY KEY,
+            valor TEXT NOT NULL
+        );
+    """
+    VERSION_ESQUEMA = 8
+
+    # Cubo de conteos Distrito x Secciones x Fuente x día (la partición
+    # `dia` de cada incidente) que mantienen los
+    # triggers en cada inserción. `secciones` es la máscara de bits completa
+    # (a lo más 64 valores), así que un filtro por sección es `secciones & ?`
+    # sobre pocas celdas. El mapa y la página de análisis lo cortan con
+    # GROUP BY: cuestan según el número de celdas, no de noticias.
+    # 'LIMA' se guarda ya como 'CERCADO DE LIMA'.
+    ESQUEMA_CUBO = """
+        CREATE TABLE IF NOT EXISTS cubo_incidentes (
+            distrito TEXT NOT NULL,
+            secciones INTEGER NOT NULL,
+            fuente TEXT NOT NULL,
+            dia TEXT NOT NULL,
+            cuenta INTEGER NOT NULL,
+            PRIMARY KEY (distrito, secciones, fuente, dia)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_cubo_dia ON cubo_incidentes(dia);
+
+        CREATE TRIGGER IF NOT EXISTS trg_cubo_insertar AFTER INSERT ON incidentes
+        WHEN NEW.duplicado_de IS NULL
+        BEGIN
+            INSERT INTO cubo_incidentes VALUES (
+                CASE NEW.distrito WHEN 'LIMA' THEN 'CERCADO DE LIMA' ELSE NEW.distrito END,
+                NEW.secciones, NEW.fuente, NEW.dia, 1)
+            ON CONFLICT (distrito, secciones, fuente, dia) DO UPDATE SET cuenta = cuenta + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_cubo_quitar AFTER UPDATE OF duplicado_de ON incidentes
+        WHEN OLD.duplicado_de IS NULL AND NEW.duplicado_de IS NOT NULL
+        BEGIN
+            UPDATE cubo_incidentes SET cuenta = cuenta - 1
+            WHERE distrito = CASE OLD.distrito WHEN 'LIMA' THEN 'CERCADO DE LIMA' ELSE OLD.distrito END
+              AND secciones = OLD.secciones AND fuente = OLD.fuente
+              AND dia = OLD.dia;
+            DELETE FROM cubo_incidentes WHERE cuenta <= 0;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_cubo_borrar AFTER DELETE ON incidentes
+        WHEN OLD.duplicado_de IS NULL
+        BEGIN
+            UPDATE cubo_incidentes SET cuenta = cuenta - 1
+            WHERE distrito = CASE OLD.distrito WHEN 'LIMA' THEN 'CERCADO DE LIMA' ELSE OLD.distrito END
+              AND secciones = OLD.secciones AND fuente = OLD.fuente
+              AND dia = OLD.dia;
+            DELETE FROM cubo_incidentes WHERE cuenta <= 0;
+        END;
+
+        -- Renombres de medios (ALIAS_FUENTES), reclasificación y fechas
+        -- corregidas: se mueve la cuenta de celda
+        CREATE TRIGGER IF NOT EXISTS trg_cubo_mover AFTER UPDATE OF fuente, distrito, secciones, dia ON incidentes
+        WHEN OLD.duplicado_de IS NULL AND (OLD.fuente != NEW.fuente
+            OR OLD.distrito != NEW.distrito OR OLD.secciones != NEW.secciones OR OLD.dia != NEW.dia)
+        BEGIN
+            UPDATE cubo_incidentes SET cuenta = cuenta - 1
+            WHERE distrito = CASE OLD.distrito WHEN 'LIMA' THEN 'CERCADO DE LIMA' ELSE OLD.distrito END
+              AND secciones = OLD.secciones AND fuente = OLD.fuente
+              AND dia = OLD.dia;
+            DELETE FROM cubo_incidentes WHERE cuenta <= 0;
+            INSERT INTO cubo_incidentes VALUES (
+                CASE NEW.distrito WHEN 'LIMA' THEN 'CERCADO DE LIMA' ELSE NEW.distrito END,
+                NEW.secciones, NEW.fuente, NEW.dia, 1)
+            ON CONFLICT (distrito, secciones, fuente, dia) DO UPDATE SET cuenta = cuenta + 1;
+        END;
+    """
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        super().__init__(ruta)
+        self._migrar()
+        self._unificar_fuentes()
+
+    def _migrar(self):
+        """Pone al día bases creadas por versiones anteriores (PRAGMA user_version)."""
+        with self._conexion() as con:
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            if version >= self.VERSION_ESQUEMA:
+                return
+            if version < 1:
+                self._migrar_deduplicacion(con)
+            if version < 5:
+                self._migrar_secciones(con)
+            if version < 6:
+                self._migrar_fechas(con)
+                self._migrar_cubo(con)
+            if version < 7:
+                self._migrar_contexto(con)
+            if version < 8:
+                self._migrar_sin_fecha(con)
+            con.execute("PRAGMA user_version = %d" % self.VERSION_ESQUEMA)
+
+        self._podar_bandas(ahora_lima())
+
+    def _migrar_deduplicacion(self, con):
+        """Columna duplicado_de, enlaces canónicos nuevos y bandas de los titulares."""
+        columnas = {c[1] for c in con.execute("PRAGMA table_info(incidentes)")}
+        if "duplicado_de" not in columnas:
+            con.execute("ALTER TABLE incidentes ADD COLUMN duplicado_de INTEGER")
+
+        # Enlaces canónicos con las reglas nuevas; los que ahora coinciden
+        # eran la misma noticia (?utm_..., /amp/) y se queda la primera
+        filas = con.execute(
+            "SELECT id, enlace, titular, distrito, fecha_scrapeo FROM incidentes ORDER BY id").fetchall()
+        con.execute("UPDATE incidentes SET enlace_canonico = '#' || id")
+        vistos = set()
+        for id_, enlace, titular, distrito, fecha in filas:
+            canonico = enlace_canonico(enlace)
+            if canonico in vistos:
+                con.execute("DELETE FROM incidentes WHERE id = ?", (id_,))
+                continue
+            vistos.add(canonico)
+            con.execute("UPDATE incidentes SET enlace_canonico = ? WHERE id = ?", (canonico, id_))
+            self._indexar_titular(con, id_, titular, distrito, fecha)
+
+    def _migrar_secciones(self, con):
+        """Columna secciones, calculada con el titular y la categoría guardada."""
+        columnas = {c[1] for c in con.execute("PRAGMA table_info(incidentes)")}
+        if "secciones" not in columnas:
+            con.execute("ALTER TABLE incidentes ADD COLUMN secciones INTEGER NOT NULL DEFAULT 0")
+        filas = con.execute("SELECT id, titular, categoria FROM incidentes").fetchall()
+        con.executemany("UPDATE incidentes SET secciones = ? WHERE id = ?",
+                        [(mascara_secciones(titular, categoria=categoria), id_)
+                         for id_, titular, categoria in filas])
+
+    def _migrar_fechas(self, con):
+        """
+        Columnas publicado y dia. Las filas viejas solo pueden fecharse por la
+        URL (/2026/10/14/); las demás quedan en el día en que se escanearon o,
+        si se importaron, en SIN_FECHA.
+        """
+        columnas = {c[1] for c in con.execute("PRAGMA table_info(incidentes)")}
+        if "publicado" not in columnas:
+            con.execute("ALTER TABLE incidentes ADD COLUMN publicado TEXT")
+        if "dia" not in columnas:
+            con.execute("ALTER TABLE incidentes ADD COLUMN dia TEXT NOT NULL DEFAULT ''")
+        filas = con.execute(
+            "SELECT id, enlace, publicado, fecha_scrapeo, origen FROM incidentes").fetchall()
+        actualizadas = []
+        for id_, enlace, publicado, fecha, origen in filas:
+            publicado = publicado or fecha_en_url(enlace)
+            actualizadas.append((publicado, dia_de(publicado, fecha if origen == "escaneo" else None), id_))
+        con.executemany("UPDATE incidentes SET publicado = ?, dia = ? WHERE id = ?", actualizadas)
+        con.execute("CREATE INDEX IF NOT EXISTS idx_incidentes_dia ON incidentes(dia)")
+
+    def _migrar_contexto(self, con):
+        """Columna contexto; las filas viejas se ubicaron solo con el titular."""
+        columnas = {c[1] for c in con.execute("PRAGMA table_info(incidentes)")}
+        if "contexto" not in columnas:
+            con.execute("ALTER TABLE incidentes ADD COLUMN contexto TEXT")
+
+    def _migrar_sin_fecha(self, con):
+        """
+        Las filas importadas sin fecha se habían fechado con el día de la
+        importación; pasan a SIN_FECHA (los triggers mueven el cubo).
+        """
+        con.execute("UPDATE incidentes SET dia = ? WHERE origen != 'escaneo' AND publicado IS NULL",
+                    (SIN_FECHA,))
+
+    def _migrar_cubo(self, con):
+        """
+        (Re)crea el cubo con sus triggers y lo llena una vez. Reemplaza a los
+        conteos por distrito y al cubo por categoría de versiones anteriores.
+        """
+        con.executescript("""
+            DROP TRIGGER IF EXISTS trg_conteo_insertar;
+            DROP TRIGGER IF EXISTS trg_conteo_duplicado;
+            DROP TRIGGER IF EXISTS trg_conteo_borrar;
+            DROP TABLE IF EXISTS conteo_distrito_categoria;
+            DROP TRIGGER IF EXISTS trg_cubo_insertar;
+            DROP TRIGGER IF EXISTS trg_cubo_quitar;
+            DROP TRIGGER IF EXISTS trg_cubo_borrar;
+            DROP TRIGGER IF EXISTS trg_cubo_fuente;
+            DROP TRIGGER IF EXISTS trg_cubo_mover;
+            DROP TABLE IF EXISTS cubo_incidentes;
+        """ + self.ESQUEMA_CUBO)
+        con.execute("""
+            INSERT INTO cubo_incidentes (distrito, secciones, fuente, dia, cuenta)
+            SELECT CASE distrito WHEN 'LIMA' THEN 'CERCADO DE LIMA' ELSE distrito END,
+                   secciones, fuente, dia, COUNT(*)
+            FROM incidentes WHERE duplicado_de IS NULL
+            GROUP BY 1, 2, 3, 4""")
+
+    def _podar_bandas(self, fecha):
+        with self._conexion() as con:
+            con.execute("DELETE FROM bandas_titular WHERE fecha < ?", (_restar_dias(fecha),))
+
+    def _unificar_fuentes(self):
+        """Renombra filas guardadas con nombres antiguos ('Infobae Perú' -> 'Infobae')."""
+        with self._conexion() as con:
+            for antiguo, nombre in ALIAS_FUENTES.items():
+                con.execute("UPDATE incidentes SET fuente = ? WHERE fuente = ?", (nombre, antiguo))
+                con.execute("UPDATE escaneos SET fuente = ? WHERE fuente = ?", (nombre, antiguo))
+
+    # --------------------------------------------------------------------------
+    # Escritura
+    # --------------------------------------------------------------------------
+    def _indexar_titular(self, con, incidente_id, titular, distrito, fecha):
+        """
+        Busca la misma noticia publicada por otro enlace en los últimos
+        VENTANA_DUPLICADOS_DIAS (bandas LSH + Jaccard exacta, mismo distrito)
+        y guarda las bandas del titular. Devuelve el id original o None.
+        """
+        palabras = palabras_titular(titular)
+        firma = firma_minhash(palabras)
+        if firma is None:
+            return None
+        bandas = bandas_lsh(firma)
+
+        # Hasta 50 incidentes distintos (no filas de bandas: cada uno tiene
+        # varias), primero los que comparten más bandas
+        pares = " OR ".join("(banda = ? AND valor = ?)" for _ in bandas)
+        candidatos = con.execute(f"""
+            SELECT i.id, i.titular, i.distrito, i.duplicado_de
+            FROM incidentes i
+            WHERE i.id IN (SELECT incidente_id FROM bandas_titular
+                           WHERE fecha >= ? AND ({pares})
+                           GROUP BY incidente_id
+                           ORDER BY COUNT(*) DESC LIMIT 50)""",
+            [_restar_dias(fecha)] + [x for par in bandas for x in par]).fetchall()
+
+        original, mejor = None, UMBRAL_DUPLICADO
+        for id_, titular_c, distrito_c, duplicado_de in candidatos:
+            if SIN_DISTRITO not in (distrito, distrito_c) and distrito != distrito_c:
+                continue
+            parecido = jaccard(palabras, palabras_titular(titular_c))
+            if parecido >= mejor:
+                original, mejor = duplicado_de or id_, parecido
+
+        if original is not None:
+            con.execute("UPDATE incidentes SET duplicado_de = ? WHERE id = ?",
+                        (original, incidente_id))
+        con.executemany(
+            "INSERT INTO bandas_titular (banda, valor, incidente_id, fecha) VALUES (?, ?, ?, ?)",
+            [(banda, valor, incidente_id, fecha) for banda, valor in bandas])
+        return original
+
+    def guardar_noticias(self, noticias, origen="escaneo", fecha=None):
+        """
+        Agrega las noticias nuevas y devuelve cuántos incidentes nuevos entraron.
+        Un enlace ya guardado (tras canonizarlo) se ignora; un titular casi igual
+        de otro medio se guarda enlazado a la noticia original y no cuenta.
+        """
+        fecha = fecha or ahora_lima()
+        nuevas = 0
+        with self._conexion() as con:
+            for n in noticias:
+                enlace = n.get("Enlace")
+                if not enlace or not n.get("Titular"):
+                    continue
+                distrito = n.get("Distrito") or SIN_DISTRITO
+                categoria = n.get("Categoría") or "Delito Detectado"
+                secciones = n.get("Secciones")
+                if secciones is None:   # Scrapers antiguos y CSV: solo el titular
+                    secciones = mascara_secciones(n["Titular"], categoria=categoria)
+                publicado = n.get("Publicado") or fecha_en_url(enlace)
+                # Solo un escaneo sabe que la noticia es de hoy; una importada sin fecha no
+                dia = dia_de(publicado, fecha if origen == "escaneo" else None)
+                cursor = con.execute("""
+                    INSERT OR IGNORE INTO incidentes
+                        (titular, enlace, enlace_canonico, fuente, distrito, categoria, secciones,
+                         fecha_scrapeo, origen, publicado, dia, contexto)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", (
+                    n["Titular"], enlace, enlace_canonico(enlace),
+                    ALIAS_FUENTES.get(n.get("Fuente"), n.get("Fuente")) or "Desconocida",
+                    distrito, categoria, int(secciones),
+                    fecha, origen, publicado, dia, n.get("Contexto"),
+                ))
+                if cursor.rowcount == 0:
+                    continue
+                if self._indexar_titular(con, cursor.lastrowid, n["Titular"], distrito, fecha) is None:
+                    nuevas += 1
+        self._podar_bandas(fecha)
+        return nuevas
+
+    def importar_csv(self, ruta_csv=RUTA_CSV_HISTORICO, lote=500):
+        """
+        Importa el CSV histórico (Titulo, Link, Fuente) fila por fila, en lotes,
+        sin cargarlo entero en memoria. Distrito y categoría se calculan con el
+        mismo clasificador de los scrapers.
+        """
+        nuevos = 0
+        pendientes = []
+        with open(ruta_csv, newline="", encoding="utf-8") as archivo:
+            for fila in csv.DictReader(archivo):
+                titulo = (fila.get("Titulo") or "").strip()
+                pendientes.append({
+                    "Titular": titulo,
+                    "Enlace": (fila.get("Link") or "").strip(),
+                    "Fuente": (fila.get("Fuente") or "").strip(),
+                    "Distrito": BUSCADOR_DISTRITOS.buscar(titulo),
+                    "Categoría": BUSCADOR_DELITOS.buscar(titulo),
+                })
+                if len(pendientes) >= lote:
+                    nuevos += self.guardar_noticias(pendientes, origen="csv")
+                    pendientes = []
+
+        nuevos += self.guardar_noticias(pendientes, origen="csv")
+        return nuevos
+
+    def importar_csv_si_falta(self, ruta_csv=RUTA_CSV_HISTORICO):
+        with self._conexion() as con:
+            ya_importado = con.execute(
+                "SELECT 1 FROM incidentes WHERE origen = 'csv' LIMIT 1").fetchone()
+        if ya_importado is None:
+            return self.importar_csv(ruta_csv)
+        return 0
+
+    def leer_lote(self, despues_de, tamano):
+        """
+        Filas (id, titular, enlace, fuente, distrito, categoria, secciones,
+        contexto) con id > despues_de.
+        """
+        with self._conexion() as con:
+            return con.execute(
+                "SELECT id, titular, enlace, fuente, distrito, categoria, secciones, contexto "
+                "FROM incidentes "
+                "WHERE id > ? ORDER BY id LIMIT ?", (despues_de, tamano)).fetchall()
+
+    def aplicar_cambios(self, cambios, clave, valor):
+        """
+        Escribe [(id, distrito, categoria, secciones)] y guarda `clave` = `valor` en la
+        misma transacción: o entra el lote entero con su marca de avance, o
+        nada. Los triggers mueven las cuentas del cubo.
+        """
+        with self._conexion() as con:
+            con.executemany(
+                "UPDATE incidentes SET distrito = ?, categoria = ?, secciones = ? WHERE id = ?",
+                [(distrito, categoria, secciones, id_) for id_, distrito, categoria, secciones in cambios])
+            con.execute("INSERT OR REPLACE INTO estado VALUES (?, ?)", (clave, str(valor)))
+            if cambios:
+                con.execute("""
+                    INSERT INTO estado VALUES ('revision', '1')
+                    ON CONFLICT (clave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1""")
+
+    # --------------------------------------------------------------------------
+    # Turnos entre procesos (un solo escaneo a la vez en todo el servidor)
+    # --------------------------------------------------------------------------
+    def tomar_turno(self, nombre, dueno, segundos):
+        """
+        True si `dueno` obtiene el turno `nombre` por `segundos`: está libre,
+        venció (el proceso que lo tenía murió) o ya era suyo. Una sola
+        sentencia, así dos procesos no pueden tomarlo a la vez.
+        """
+        ahora = time.time()
+        with self._conexion() as con:
+            cursor = con.execute("""
+                INSERT INTO estado VALUES (?, ?)
+                ON CONFLICT (clave) DO UPDATE SET valor = excluded.valor
+                WHERE json_extract(valor, '$.vence') < ? OR json_extract(valor, '$.dueno') = ?""",
+                ("turno_" + nombre, json.dumps({"dueno": dueno, "vence": ahora + segundos}),
+                 ahora, dueno))
+            return cursor.rowcount > 0
+
+    def liberar_turno(self, nombre, dueno, completo=True):
+        """Suelta el turno; `completo` registra la hora (escaneo de todas las fuentes)."""
+        with self._conexion() as con:
+            con.execute("DELETE FROM estado WHERE clave = ? AND json_extract(valor, '$.dueno') = ?",
+                        ("turno_" + nombre, dueno))
+            if completo:
+                con.execute("INSERT OR REPLACE INTO estado VALUES (?, ?)",
+                            ("fin_" + nombre, str(time.time())))
+
+    def turno_ocupado(self, nombre):
+        turno = self.leer_estado("turno_" + nombre)
+        return turno is not None and json.loads(turno)["vence"] >= time.time()
+
+    def segundos_desde(self, nombre):
+        """Segundos desde la última vez que se liberó el turno `nombre` completo."""
+        fin = self.leer_estado("fin_" + nombre)
+        return float("inf") if fin is None else time.time() - float(fin)
+
+    def leer_estado(self, clave, por_defecto=None):
+        with self._conexion() as con:
+            fila = con.execute("SELECT valor FROM estado WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else por_defecto
+
+    def registrar_escaneo(self, fuente, inicio, noticias, nuevas):
+        with self._conexion() as con:
+            con.execute(
+                "INSERT INTO escaneos (fuente, inicio, fin, noticias, nuevas) VALUES (?, ?, ?, ?, ?)",
+                (fuente, inicio, ahora_lima(), noticias, nuevas))
+
+    # --------------------------------------------------------------------------
+    # Lectura
+    # --------------------------------------------------------------------------
+    def ultimos_escaneos(self):
+        """Último escaneo de cada fuente (el 'snapshot' que ve el dashboard)."""
+        with self._conexion() as con:
+            return pd.read_sql_query("""
+                SELECT fuente AS Fuente, fin AS Fin, noticias AS Noticias, nuevas AS Nuevas
+                FROM escaneos
+                WHERE id IN (SELECT MAX(id) FROM escaneos GROUP BY fuente)
+                ORDER BY fuente""", con)
+
+    def _condiciones(self, distritos=None, categorias=None, fuentes=None, secciones=None,
+                     desde=None, hasta=None, con_distrito=False, incluir_duplicados=False, ids=None):
+        where, parametros = [], []
+        if not incluir_duplicados:
+            # La misma noticia en varios medios cuenta una sola vez
+            where.append("duplicado_de IS NULL")
+        if distritos is not None:
+            distritos = variantes_distrito(distritos)
+        for columna, valores in (("distrito", distritos), ("categoria", categorias),
+                                 ("fuente", fuentes), ("id", ids)):
+            if valores is not None:
+                valores = [int(v) for v in valores] if columna == "id" else list(valores)
+                where.append(f"{columna} IN ({','.join('?' * len(valores))})"
+                             if valores else "0")
+                parametros += valores
+        if secciones is not None:
+            # Alguna de las secciones pedidas (máscara de bits)
+            where.append("secciones & ? != 0")
+            parametros.append(int(secciones))
+        # Días 'AAAA-MM-DD' (hasta exclusivo) sobre la partición de cada incidente
+        desde, hasta = acotar_ventana(desde, hasta)
+        if desde is not None:
+            where.append("dia >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            where.append("dia < ?")
+            parametros.append(hasta)
+        if con_distrito:
+            where.append("distrito != ?")
+            parametros.append(SIN_DISTRITO)
+
+        return (" WHERE " + " AND ".join(where)) if where else "", parametros
+
+    def consultar(self, limite=None, **filtros):
+        """
+        DataFrame con las columnas del dashboard (Titular, Enlace, Fuente, ...).
+        Con `limite` devuelve solo las últimas `limite` noticias guardadas.
+        """
+        where, parametros = self._condiciones(**filtros)
+        columnas = ", ".join(COLUMNAS)
+        orden = " ORDER BY id"
+        if limite is not None:
+            orden = " ORDER BY id DESC LIMIT ?"
+            parametros = parametros + [limite]
+        with self._conexion() as con:
+            df = pd.read_sql_query(
+                f"SELECT {columnas} FROM incidentes{where}{orden}", con,
+                params=parametros)
+        # Pocas decenas de valores distintos: códigos enteros en vez de strings
+        return df.astype({c: "category" for c in ("distrito", "categoria", "fuente")}
+                         ).rename(columns=COLUMNAS)
+
+    def contar(self, **filtros):
+        where, parametros = self._condiciones(**filtros)
+        with self._conexion() as con:
+            return con.execute(f"SELECT COUNT(*) FROM incidentes{where}", parametros).fetchone()[0]
+
+    def cubo(self, distritos=None, secciones=None, fuentes=None, desde=None, hasta=None, dias=None):
+        """
+        Corte del cubo: DataFrame (Distrito, Secciones, Fuente, Día, Casos) con
+        una fila por celda. `secciones` es una máscara: entran las celdas con
+        alguno de sus bits. `desde`/`hasta` son días 'AAAA-MM-DD' (hasta exclusivo);
+        `dias`, una lista de días sueltos.
+        """
+        where, parametros = [], []
+        if distritos is not None:
+            distritos = [distrito_del_cubo(d) for d in distritos]
+        for columna, valores in (("distrito", distritos), ("fuente", fuentes), ("dia", dias)):
+            if valores is not None:
+                valores = list(valores)
+                where.append(f"{columna} IN ({','.join('?' * len(valores))})" if valores else "0")
+                parametros += valores
+        if secciones is not None:
+            where.append("secciones & ? != 0")
+            parametros.append(int(secciones))
+        desde, hasta = acotar_ventana(desde, hasta)
+        if desde is not None:
+            where.append("dia >= ?")
+            parametros.append(desde)
+        if hasta is not None:
+            where.append("dia < ?")
+            parametros.append(hasta)
+
+        with self._conexion() as con:
+            return pd.read_sql_query(
+                "SELECT distrito AS Distrito, secciones AS Secciones, fuente AS Fuente, "
+                "dia AS Día, cuenta AS Casos FROM cubo_incidentes"
+                + ((" WHERE " + " AND ".join(where)) if where else ""), con, params=parametros)
+
+    def conteos_por_distrito(self, distritos=None, secciones=None, desde=None, hasta=None):
+        """DataFrame (Distrito, Delitos) para el mapa, sumando el cubo."""
+        corte = self.cubo(distritos=distritos, secciones=secciones, desde=desde, hasta=hasta)
+        corte = corte[corte["Distrito"] != SIN_DISTRITO]
+        return (corte.groupby("Distrito", as_index=False)["Casos"].sum()
+                .rename(columns={"Casos": "Delitos"}))
+
+    def version_datos(self):
+        """
+        Cambia con cada incidente guardado o reclasificado (sirve de clave para
+        st.cache_data).
+        """
+        with self._conexion() as con:
+            ultimo = con.execute("SELECT MAX(id) FROM incidentes").fetchone()[0] or 0
+        return ultimo, int(self.leer_estado("revision", 0))
+
+    def ubicaciones(self, despues_de=0):
+        """DataFrame (id, Distrito, Día) de los incidentes con distrito e id > `despues_de`."""
+        with self._conexion() as con:
+            return pd.read_sql_query(
+                "SELECT id, distrito AS Distrito, dia AS Día FROM incidentes "
+                "WHERE id > ? AND duplicado_de IS NULL AND distrito != ? ORDER BY id",
+                con, params=(despues_de, SIN_DISTRITO))
+
+    def dias_desde(self, despues_de):
+        """Particiones que recibieron incidentes con id > `despues_de`."""
+        with self._conexion() as con:
+            return [f[0] for f in con.execute(
+                "SELECT DISTINCT dia FROM incidentes WHERE id > ?", (despues_de,))]
+
+    def version_escaneos(self):
+        """Cambia con cada escaneo registrado, aunque no traiga noticias nuevas."""
+        with self._conexion() as con:
+            return con.execute("SELECT MAX(id) FROM escaneos").fetchone()[0] or 0
+
+    def valores_distintos(self, columna, **filtros):
+        """Valores distintos de 'distrito', 'categoria' o 'fuente' (usa su índice)."""
+        if columna not in ("distrito", "categoria", "fuente"):
+            raise ValueError(f"Columna no indexada: {columna}")
+        where, parametros = self._condiciones(**filtros)
+        with self._conexion() as con:
+            filas = con.execute(
+                f"SELECT DISTINCT {columna} FROM incidentes{where} ORDER BY {columna}",
+                parametros).fetchall()
+        return [f[0] for f in filas]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Almacén de noticias de Lima Segura")
+    parser.add_argument("--importar", metavar="CSV", nargs="?", const=RUTA_CSV_HISTORICO,
+                        help="Importa un CSV histórico (Titulo, Link, Fuente)")
+    args = parser.parse_args()
+
+    almacen = AlmacenNoticias()
+    if args.importar:
+        print(f"📥 {almacen.importar_csv(args.importar)} noticias importadas de {args.importar}")
+    print(f"🗄️ {almacen.contar()} incidentes en {almacen.ruta}")
@@ -0,0 +1,377 @@
+# api_datos.py
+"""
+API HTTP de solo lectura (JSON) sobre el mismo almacén que usa el dashboard,
+para clientes móviles y otras herramientas que no deben pasar por Streamlit:
+
+    python api_datos.py                          # http://127.0.0.1:8502/api/
+    python api_datos.py --host 0.0.0.0 --puerto 8080
+
+Rutas (todas GET):
+
+    /api/version      versión de datos [último id, revisión]
+    /api/incidentes   ?pagina=1&por_pagina=100&campos=Titular,Distrito,Publicado
+    /api/distritos    delitos por distrito con lat/lon
+    /api/ranking      ?limite=10
+    /api/celdas       ?zoom=11   (los círculos del mapa "Celdas (agregado)")
+
+Filtros comunes: distrito, fuente, seccion (repetibles o separados por
+comas), desde/hasta ('AAAA-MM-DD', hasta exclusivo) o dias (últimos N días).
+Los incidentes importados sin fecha tienen "Día": null y no entran en
+ninguna ventana de fechas.
+
+Cada respuesta se serializa (y comprime) una sola vez por versión de datos y
+consulta; las peticiones repetidas salen de una caché LRU (API_CACHE). El
+ETag es el hash del cuerpo, que no incluye la versión: con If-None-Match un
+cliente que sondea recibe 304 mientras su respuesta no cambie, aunque entren
+noticias que no le afectan.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from agregados_mapa import agrupar_en_celdas, geocodificar_con_cache, sumar_por_distrito, ubicar_conteos
+from almacen import AlmacenNoticias
+from cache_memoria import EspacioCache
+from clasificador import BITS_SECCION, nombres_secciones
+from config import (
+    API_CACHE, API_GZIP_MINIMO_BYTES, API_HOST, API_MAX_POR_PAGINA, API_POR_PAGINA, API_PUERTO,
+    API_VERSION_SEGUNDOS
+)
+from cubo_dias import CuboPorDia
+from fechas import SIN_FECHA, ventana_dias
+from tabla_compacta import TablaIncidentes
+
+CAMPOS_INCIDENTE = ["Titular", "Enlace", "Fuente", "Distrito", "Categoría", "Secciones",
+                    "Publicado", "Día", "Fecha"]
+FILTROS = {"distrito", "fuente", "seccion", "desde", "hasta", "dias"}
+LIMITE_RANKING = 10
+
+
+class ErrorConsulta(ValueError):
+    """Parámetro inválido: se responde 400 con el mensaje."""
+
+# ==============================================================================
+# 1. RESPUESTAS YA SERIALIZADAS
+# ==============================================================================
+
+
+def _a_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+class Respuesta:
+    """Cuerpo JSON, su versión gzip y su ETag, calculados una vez al crearla."""
+
+    __slots__ = ("estado", "cuerpo", "comprimido", "etag")
+
+    def __init__(self, estado, datos):
+        self.estado = estado
+        self.cuerpo = json.dumps(datos, ensure_ascii=False, separators=(",", ":"),
+                                 default=_a_json).encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.cuerpo).hexdigest()[:16] + '"'
+        self.comprimido = None
+        if len(self.cuerpo) >= API_GZIP_MINIMO_BYTES:
+            self.comprimido = gzip.compress(self.cuerpo, compresslevel=6)
+
+    def memoria(self):
+        return len(self.cuerpo) + len(self.comprimido or b"")
+
+
+def _registros(df):
+    """Lista de dicts con None en lugar de NaN (JSON válido)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+# ==============================================================================
+# 2. PARÁMETROS
+# ==============================================================================
+
+
+def _permitidos(consulta, nombres):
+    desconocidos = sorted(set(consulta) - nombres)
+    if desconocidos:
+        raise ErrorConsulta(f"Parámetros desconocidos: {', '.join(desconocidos)} "
+                            f"(válidos: {', '.join(sorted(nombres))})")
+
+
+def _lista(consulta, nombre):
+    """Valores de un parámetro repetible o separado por comas (None si no vino)."""
+    valores = [v.strip() for valor in consulta.get(nombre, []) for v in valor.split(",") if v.strip()]
+    return valores or None
+
+
+def _entero(consulta, nombre, por_defecto, minimo, maximo=None):
+    if nombre not in consulta:
+        return por_defecto
+    try:
+        valor = int(consulta[nombre][-1])
+    except ValueError:
+        raise ErrorConsulta(f"'{nombre}' debe ser un entero") from None
+    if valor < minimo or (maximo is not None and valor > maximo):
+        rango = f"entre {minimo} y {maximo}" if maximo is not None else f">= {minimo}"
+        raise ErrorConsulta(f"'{nombre}' debe estar {rango}")
+    return valor
+
+
+def _dia(consulta, nombre):
+    if nombre not in consulta:
+        return None
+    try:
+        return date.fromisoformat(consulta[nombre][-1]).isoformat()
+    except ValueError:
+        raise ErrorConsulta(f"'{nombre}' debe ser una fecha AAAA-MM-DD") from None
+
+
+def leer_filtros(consulta):
+    """dict(distritos, fuentes, secciones, desde, hasta) con los filtros comunes."""
+    distritos = _lista(consulta, "distrito")
+    fuentes = _lista(consulta, "fuente")
+
+    secciones = None
+    nombres = _lista(consulta, "seccion")
+    if nombres is not None:
+        por_nombre = {nombre.lower(): bit for nombre, bit in BITS_SECCION.items()}
+        desconocidas = [n for n in nombres if n.lower() not in por_nombre]
+        if desconocidas:
+            raise ErrorConsulta(f"Secciones desconocidas: {', '.join(desconocidas)} "
+                                f"(válidas: {', '.join(BITS_SECCION)})")
+        secciones = 0
+        for nombre in nombres:
+            secciones |= por_nombre[nombre.lower()]
+
+    desde, hasta = _dia(consulta, "desde"), _dia(consulta, "hasta")
+    if "dias" in consulta:
+        if desde or hasta:
+            raise ErrorConsulta("Usa 'dias' o 'desde'/'hasta', no ambos")
+        desde, hasta = ventana_dias(_entero(consulta, "dias", None, 1))
+
+    return dict(distritos=tuple(d.upper() for d in distritos) if distritos else None,
+                fuentes=tuple(fuentes) if fuentes else None,
+                secciones=secciones, desde=desde, hasta=hasta)
+
+# ==============================================================================
+# 3. CONSULTAS (UNA RESPUESTA POR VERSIÓN DE DATOS Y CONSULTA)
+# ==============================================================================
+
+
+class ApiDatos:
+    """
+    Lógica de la API, sin HTTP. Lee del almacén igual que el dashboard: el
+    cubo por día (CuboPorDia) para los agregados y una TablaIncidentes por
+    versión de datos para las páginas de incidentes.
+
+    La versión se mira en SQLite a lo sumo cada API_VERSION_SEGUNDOS; entre
+    una mirada y otra una petición repetida no toca la base de datos.
+    """
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self.cubo = CuboPorDia(almacen)
+        self.cache = EspacioCache("api", descripcion="Respuestas JSON", **API_CACHE)
+        self._candado = threading.Lock()
+        self._candado_tabla = threading.Lock()
+        self._version = None
+        self._mirada = -math.inf
+        self._tabla = None   # (versión, TablaIncidentes)
+        self.rutas = {
+            "/api/version": self.version_actual,
+            "/api/incidentes": self.incidentes,
+            "/api/distritos": self.distritos,
+            "/api/ranking": self.ranking,
+            "/api/celdas": self.celdas,
+        }
+
+    def version(self):
+        if time.monotonic() - self._mirada < API_VERSION_SEGUNDOS:
+            return self._version
+        with self._candado:
+            if time.monotonic() - self._mirada >= API_VERSION_SEGUNDOS:   # Otro hilo ya miró
+                version = self.cubo.actualizar()
+                if self._version is not None and version != self._version:
+                    # Las claves llevan la versión: lo viejo ya no se pide
+                    self.cache.invalidar()
+                self._version = version
+                self._mirada = time.monotonic()
+        return self._version
+
+    def tabla(self, version):
+        with self._candado_tabla:
+            if self._tabla is None or self._tabla[0] != version:
+                self._tabla = (version, TablaIncidentes.desde_almacen(self.almacen))
+            return self._tabla[1]
+
+    def responder(self, ruta, consulta_texto=""):
+        """Respuesta (ya serializada) para una ruta y su query string."""
+        consultar = self.rutas.get(ruta.rstrip("/"))
+        if consultar is None:
+            return Respuesta(404, {"error": f"Ruta desconocida: {ruta}", "rutas": list(self.rutas)})
+
+        version = self.version()
+        clave = (ruta.rstrip("/"), version, consulta_texto)
+        encontrada, respuesta = self.cache.obtener(clave)
+        if encontrada:
+            return respuesta
+        try:
+            consulta = parse_qs(consulta_texto, strict_parsing=False)
+            respuesta = Respuesta(200, consultar(version, consulta))
+        except ErrorConsulta as e:
+            respuesta = Respuesta(400, {"error": str(e)})
+        self.cache.guardar(clave, respuesta)
+        return respuesta
+
+    def _conteos(self, filtros):
+        celdas = self.cubo.ventana(filtros["desde"], filtros["hasta"])
+        return sumar_por_distrito(celdas, filtros["distritos"], filtros["secciones"], filtros["fuentes"])
+
+    # --------------------------------------------------------------------------
+    # Rutas: (versión, consulta de parse_qs) -> dict
+    # --------------------------------------------------------------------------
+    def version_actual(self, version, consulta):
+        _permitidos(consulta, set())
+        return {"version": version}
+
+    def incidentes(self, version, consulta):
+        _permitidos(consulta, FILTROS | {"pagina", "por_pagina", "campos"})
+        filtros = leer_filtros(consulta)
+        pagina = _entero(consulta, "pagina", 1, 1)
+        por_pagina = _entero(consulta, "por_pagina", API_POR_PAGINA, 1, API_MAX_POR_PAGINA)
+
+        por_nombre = {c.lower(): c for c in CAMPOS_INCIDENTE}
+        campos = _lista(consulta, "campos") or CAMPOS_INCIDENTE
+        desconocidos = [c for c in campos if c.lower() not in por_nombre]
+        if desconocidos:
+            raise ErrorConsulta(f"Campos desconocidos: {', '.join(desconocidos)} "
+                                f"(válidos: {', '.join(CAMPOS_INCIDENTE)})")
+        campos = list(dict.fromkeys(por_nombre[c.lower()] for c in campos))
+
+        total, filas = self.tabla(version).pagina(pagina, por_pagina, **filtros)
+        filas = filas[campos]
+        if "Secciones" in campos:
+            filas = filas.assign(Secciones=[nombres_secciones(int(m)) for m in filas["Secciones"]])
+        if "Día" in campos:
+            filas = filas.assign(**{"Día": filas["Día"].astype(object).replace(SIN_FECHA, None)})
+        return {"pagina": pagina, "por_pagina": por_pagina, "total": total,
+                "paginas": math.ceil(total / por_pagina), "incidentes": _registros(filas)}
+
+    def distritos(self, version, consulta):
+        _permitidos(consulta, FILTROS)
+        conteos = self._conteos(leer_filtros(consulta))
+        if not conteos.empty:
+            conteos = (conteos.join(geocodificar_con_cache(conteos["Distrito"]))
+                       .sort_values(["Delitos", "Distrito"], ascending=[False, True]))
+        return {"total": int(conteos["Delitos"].sum()) if not conteos.empty else 0,
+                "distritos": _registros(conteos)}
+
+    def ranking(self, version, consulta):
+        _permitidos(consulta, FILTROS | {"limite"})
+        limite = _entero(consulta, "limite", LIMITE_RANKING, 1, 100)
+        conteos = (self._conteos(leer_filtros(consulta))
+                   .sort_values(["Delitos", "Distrito"], ascending=[False, True]).head(limite))
+        conteos.insert(0, "Ranking", range(1, len(conteos) + 1))
+        return {"ranking": _registros(conteos)}
+
+    def celdas(self, version, consulta):
+        _permitidos(consulta, FILTROS | {"zoom"})
+        zoom = _entero(consulta, "zoom", 11, 1, 18)
+        ubicados = ubicar_conteos(self._conteos(leer_filtros(consulta)),
+                                  geocodificar=geocodificar_con_cache)
+        celdas = agrupar_en_celdas(ubicados, zoom)
+        if not celdas.empty:
+            celdas = celdas.round({"lat": 5, "lon": 5, "radio": 1})
+        return {"zoom": zoom, "celdas": _registros(celdas)}
+
+# ==============================================================================
+# 4. SERVIDOR HTTP (HILOS, KEEP-ALIVE, GZIP Y 304)
+# ==============================================================================
+
+
+def _coincide(if_none_match, etag):
+    if not if_none_match:
+        return False
+    etiquetas = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return "*" in etiquetas or etag in etiquetas
+
+
+class ManejadorApi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive: un cliente que sondea reutiliza la conexión
+    disable_nagle_algorithm = True    # Cabeceras y cuerpo salen sin esperar el ACK
+    server_version = "LimaSegura-API"
+    api = None
+
+    def do_GET(self):
+        ruta, _, consulta = self.path.partition("?")
+        try:
+            respuesta = self.api.responder(ruta, consulta)
+        except Exception as e:
+            print(f"❌ {self.path}: {e}")
+            respuesta = Respuesta(500, {"error": "Error interno"})
+
+        if respuesta.estado == 200 and _coincide(self.headers.get("If-None-Match"), respuesta.etag):
+            self.send_response(304)
+            self.send_header("ETag", respuesta.etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        cuerpo = respuesta.cuerpo
+        self.send_response(respuesta.estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        if respuesta.comprimido is not None:
+            self.send_header("Vary", "Accept-Encoding")
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                cuerpo = respuesta.comprimido
+                self.send_header("Content-Encoding", "gzip")
+        if respuesta.estado == 200:
+            self.send_header("ETag", respuesta.etag)
+            # El cliente puede guardarla, pero debe revalidarla (304) en cada uso
+            self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+class ServidorApi(ThreadingHTTPServer):
+    request_queue_size = 256   # Ráfagas de conexiones nuevas sin rechazos
+    daemon_threads = True
+
+
+def crear_servidor(almacen=None, host=API_HOST, puerto=API_PUERTO):
+    """ServidorApi listo para serve_forever() (puerto 0 = uno libre)."""
+    api = ApiDatos(almacen or AlmacenNoticias())
+    manejador = type("ManejadorApiDatos", (ManejadorApi,), {"api": api})
+    return ServidorApi((host, puerto), manejador)
+
+
+def iniciar_en_hilo(almacen=None, host="127.0.0.1", puerto=0):
+    """Arranca la API en segundo plano; devuelve (servidor, url_base)."""
+    servidor = crear_servidor(almacen, host, puerto)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://{host}:{servidor.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP (JSON) de Lima Segura")
+    parser.add_argument("--host", default=API_HOST, help="Interfaz (0.0.0.0 = todas)")
+    parser.add_argument("--puerto", type=int, default=API_PUERTO)
+    args = parser.parse_args()
+
+    servidor = crear_servidor(host=args.host, puerto=args.puerto)
+    print(f"🌐 API de datos en http://{args.host}:{servidor.server_address[1]}/api/")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 API detenida.")
@@ -1,138 +1,259 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
 import pandas as pd
+import numpy as np
 import pydeck as pdk
 import plotly.express as px
-import requests
-import time
 import re
+import time
+from datetime import timedelta
 
 # ==============================================================================
 # 1. IMPORTAR CONFIGURACIÓN CENTRALIZADA (TU ARCHIVO CONFIG.PY)
 # ==============================================================================
 try:
     from config import PALABRAS_CLAVE  # <--- AQUÍ USAMOS TU LISTA CENTRAL
+    from config import ESCANEO_VIGENCIA_SEGUNDOS, VENTANAS_FECHA
+    from config import COORDENADAS_LIMA, RADIO_CERCA_KM, SERVICIOS_CERCANOS, TELEFONOS_EMERGENCIA
 except ImportError:
     st.error("⚠️ Error Crítico: No se encontró el archivo 'config.py'. Asegúrate de que esté en la misma carpeta que 'app_streamlit.py'.")
     PALABRAS_CLAVE = []  # Lista vacía de respaldo para que no explote
+    ESCANEO_VIGENCIA_SEGUNDOS = 120
+    VENTANAS_FECHA = {"Todo el archivo": None}
+    COORDENADAS_LIMA = {"CERCADO DE LIMA": [-12.0464, -77.0428]}
+    RADIO_CERCA_KM, SERVICIOS_CERCANOS = 2.0, 3
+    TELEFONOS_EMERGENCIA = {}
 
 # ==============================================================================
-# 2. IMPORTACIÓN DE MÓDULOS DE SCRAPING
+# 2. IMPORTACIÓN DE MÓDULOS DE SCRAPING (ORQUESTADOS DESDE ESCANEO.PY)
 # ==============================================================================
-try:
-    from webscraping import (
-        webscraping_rpp,
-        web_scraping_el_comercio,
-        webscraping_canalN,
-        webscraping_diariocorreo,
-        webscraping_infobaePE,
-        webscraping_larepublica,
-        webscraping_peru21
-    )
-    MODULES_AVAILABLE = True
-except ImportError as e:
-    MODULES_AVAILABLE = False
-    print(f"Error importando módulos: {e}")
+from escaneo import FUENTES, MODULES_AVAILABLE
+from agregados_mapa import agrupar_en_celdas, geocodificar_con_cache, sumar_por_distrito, ubicar_conteos
+from cache_memoria import invalidar, memoizar
+import cache_memoria
+from tabla_compacta import TablaIncidentes, etiquetas_secciones, expandir_secciones
+from clasificador import BITS_SECCION, mascara_de
+from almacen import AlmacenNoticias
+from cubo_dias import CuboPorDia
+from fechas import hoy_lima, ventana_dias
+from escaneo_compartido import CoordinadorEscaneos
+from indice_espacial import IndiceIncidentes, ServiciosEmergencia
+import instrumentacion
 
 # ==============================================================================
-# 3. CONFIGURACIÓN Y GEOCODIFICACIÓN (API NOMINATIM)
+# 3. CONFIGURACIÓN DE LA PÁGINA
 # ==============================================================================
 st.set_page_config(page_title="Lima Segura: Monitor",
                    page_icon="🚨", layout="wide")
 
-if 'historial_noticias' not in st.session_state:
-    st.session_state['historial_noticias'] = pd.DataFrame()
 
+@st.cache_resource(show_spinner=False)
+def obtener_almacen():
+    """Almacén SQLite compartido por todas las sesiones (datos/noticias.sqlite)"""
+    almacen = AlmacenNoticias()
+    almacen.importar_csv_si_falta()  # dataset_unificado.csv, solo la primera vez
+    return almacen
 
-@st.cache_data(show_spinner=False)
-def obtener_coordenadas(ubicacion):
-    """Consulta la API de Nominatim (OpenStreetMap)"""
-    if not ubicacion or ubicacion == "⚠️ No Especificado":
-        return None, None
 
-    url = f"https://nominatim.openstreetmap.org/search?q={ubicacion},+Lima,+Peru&format=json&limit=1"
-    headers = {'User-Agent': 'SistemaAlertaDelitos_LP2_Final'}
+almacen = obtener_almacen()
 
-    try:
-        time.sleep(0.5)  # Pausa cortés a la API
-        response = requests.get(url, headers=headers).json()
-        if response:
-            return float(response[0]['lat']), float(response[0]['lon'])
-    except Exception as e:
-        print(f"Error en {ubicacion}: {e}")
 
-    return None, None
+@st.cache_resource(show_spinner=False)
+def obtener_cubo():
+    """Cubo por día en memoria, compartido; tras un escaneo relee solo los días nuevos."""
+    return CuboPorDia(almacen)
 
-# ==============================================================================
-# 4. ESCANEO CON FILTRO ESTRICTO (USANDO CONFIG.PY)
-# ==============================================================================
 
+cubo = obtener_cubo()
 
-@st.cache_data(ttl=300, show_spinner="Escaneando fuentes...")
-def escanear_con_archivos_propios():
-    # Verificamos si los módulos se cargaron bien
-    if not MODULES_AVAILABLE:
-        st.error("⚠️ Error: No se detectan los archivos en la carpeta 'webscraping'.")
-        return pd.DataFrame()
 
-    todas_las_noticias = []
+def version_datos():
+    """Pone al día el cubo por día y devuelve la versión de datos (clave de las cachés)."""
+    return cubo.actualizar()
 
-    # Lista de tus scrapers
-    mis_scrapers = [
-        ("RPP", webscraping_rpp),
-        ("El Comercio", web_scraping_el_comercio),
-        ("Canal N", webscraping_canalN),
-        ("Diario Correo", webscraping_diariocorreo),
-        ("Infobae", webscraping_infobaePE),
-        ("La República", webscraping_larepublica),
-        ("Perú 21", webscraping_peru21)
-    ]
 
-    progress_bar = st.progress(0, text="Iniciando monitor de crimen...")
-    total = len(mis_scrapers)
-
-    for i, (nombre_web, modulo) in enumerate(mis_scrapers):
-        try:
-            progress_bar.progress(int(((i)/total)*100),
-                                  text=f"Analizando: {nombre_web}...")
-
-            # 1. EJECUTAR EL SCRAPER
-            # (El scraper ya se encargó de filtrar, confiamos en él)
-            if hasattr(modulo, 'obtener_noticias'):
-                datos = modulo.obtener_noticias()
-            elif hasattr(modulo, 'scrape'):
-                datos = modulo.scrape()
-            else:
-                continue
+# Cachés por espacio (cache_memoria.py, límites en config.LIMITES_CACHE).
+# `version_datos` en la clave hace que un escaneo con noticias nuevas no
+# devuelva resultados viejos; invalidar el espacio solo libera memoria.
 
-            # 2. PROCESAR RESULTADOS (SIN VOLVER A FILTRAR)
-            if datos:
-                # Si devuelve un DataFrame, lo convertimos a lista
-                if isinstance(datos, pd.DataFrame):
-                    datos = datos.to_dict('records')
+@memoizar("agregados")
+def tabla_incidentes(version_datos):
+    """Una sola tabla codificada por proceso (no una copia por sesión)."""
+    return TablaIncidentes.desde_almacen(almacen)
 
-                for noticia in datos:
-                    # Nos aseguramos de que tenga 'Fuente'
-                    if 'Fuente' not in noticia:
-                        noticia['Fuente'] = nombre_web
 
-                    # Si no tiene categoría, le ponemos una por defecto
-                    if 'Categoría' not in noticia or not noticia['Categoría']:
-                        noticia['Categoría'] = "Delito Detectado"
+LIMITE_TABLA = 500   # Filas de la tabla de noticias en "Análisis por Periódico"
 
-                    # ¡IMPORTANTE! Agregamos la noticia directamente
-                    # (Aquí borramos el bloque 'if re.search' que te estaba borrando la noticia)
-                    todas_las_noticias.append(noticia)
 
-        except Exception as e:
-            # Si falla un periódico, seguimos con los otros sin detener todo
-            print(f"Error leyendo {nombre_web}: {e}")
-            continue
+@memoizar("agregados")
+def corte_cubo(version_datos, fuentes, desde, hasta):
+    """Celdas del cubo de esos medios en los días [desde, hasta)."""
+    celdas = cubo.ventana(desde, hasta)
+    return celdas[celdas['Fuente'].isin(fuentes)]
+
+
+@memoizar("agregados")
+def conteos_distrito(version_datos, distritos, secciones, desde, hasta):
+    """DataFrame (Distrito, Delitos) sumando solo las particiones de esos días."""
+    return sumar_por_distrito(cubo.ventana(desde, hasta), distritos, secciones)
 
-    progress_bar.empty()
 
-    # Retornamos todo lo que encontramos
-    return pd.DataFrame(todas_las_noticias) if todas_las_noticias else pd.DataFrame()
+def conteos_ubicados(version_datos, distritos, secciones, desde, hasta):
+    """Delitos por distrito con coordenadas."""
+    return ubicar_conteos(conteos_distrito(version_datos, distritos, secciones, desde, hasta),
+                          geocodificar=geocodificar_con_cache)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_indice_incidentes():
+    """Rejilla de incidentes compartida; tras un escaneo agrega solo los ids nuevos."""
+    return IndiceIncidentes(almacen, geocodificar_con_cache)
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_servicios():
+    """Comisarías, bomberos y hospitales de servicios_emergencia.csv (sin servicios externos)."""
+    return ServiciosEmergencia()
+
+
+LIMITE_CERCANOS = 200   # Noticias listadas en "Cerca de mí"
+
+
+@memoizar("escaneos")
+def estado_escaneos(version_escaneos, version_datos):
+    """(último escaneo por fuente, delitos, repetidas agrupadas) para Inicio."""
+    total = almacen.contar()
+    return almacen.ultimos_escaneos(), total, almacen.contar(incluir_duplicados=True) - total
+
+
+@memoizar("graficos")
+def figuras_analisis(version_datos, fuentes, filtro_secciones, periodicos, desde, hasta):
+    """Barras por medio, torta y treemap por sección y ranking de distritos."""
+    # Corte del cubo Distrito x Secciones x Fuente x día: una fila por
+    # celda, no por noticia ('LIMA' ya viene como 'CERCADO DE LIMA').
+    # El filtro de sección es un AND de bits sobre la columna entera.
+    df_cubo = corte_cubo(version_datos, fuentes, desde, hasta)
+    if filtro_secciones is not None:
+        df_cubo = df_cubo[(df_cubo['Secciones'].to_numpy(dtype=int) & filtro_secciones) != 0]
+    df_por_seccion = expandir_secciones(df_cubo)
+    figuras = {"secciones": None, "treemap": None, "ranking": None}
+
+    conteo = (
+        df_cubo
+        .groupby('Fuente')['Casos']
+        .sum()
+        .reindex(list(periodicos), fill_value=0)
+        .reset_index()
+    )
+    conteo.columns = ['Fuente', 'Cantidad']
+    figuras["medios"] = px.bar(conteo, x='Fuente', y='Cantidad', color='Fuente',
+                               title="Noticias por Medio")
+
+    if not df_cubo.empty:
+        conteo_tipo = (df_por_seccion.groupby('Sección')['Casos'].sum()
+                       .sort_values(ascending=False).reset_index())
+        conteo_tipo.columns = ['Sección', 'Cantidad']
+        figuras["secciones"] = px.pie(conteo_tipo, names='Sección', values='Cantidad',
+                                      hole=0.4, title="Distribución de Delitos")
+
+    df_geo = df_cubo[df_cubo['Distrito'] != "⚠️ No Especificado"]
+    if not df_geo.empty:
+        df_treemap = (
+            df_por_seccion[df_por_seccion['Distrito'] != "⚠️ No Especificado"]
+            .groupby(['Distrito', 'Sección'])['Casos']
+            .sum()
+            .reset_index()
+        )
+        figuras["treemap"] = px.treemap(
+            df_treemap,
+            path=['Distrito', 'Sección'],
+            values='Casos',
+            color='Casos',
+            color_continuous_scale='Reds',
+            title="Concentración de Crimen"
+        )
+
+        ranking = (
+            df_geo
+            .groupby('Distrito')['Casos']
+            .sum()
+            .reset_index(name='Cantidad de Delitos')
+            .sort_values(by='Cantidad de Delitos', ascending=False)
+        )
+        ranking.index = range(1, len(ranking) + 1)
+        ranking.index.name = "Ranking"
+        figuras["ranking"] = ranking
+
+    return figuras
+
+
+def selector_fechas(clave):
+    """
+    Ventana de VENTANAS_FECHA o rango personalizado -> (desde, hasta) en días
+    'AAAA-MM-DD' (hasta exclusivo; None = sin límite).
+    """
+    opcion = st.selectbox("Fecha de publicación:", list(VENTANAS_FECHA) + ["Rango personalizado"],
+                          key=f"ventana_{clave}")
+    if opcion != "Rango personalizado":
+        return ventana_dias(VENTANAS_FECHA[opcion])
+
+    hoy = hoy_lima()
+    rango = st.date_input("Entre:", value=(hoy - timedelta(days=6), hoy), max_value=hoy,
+                          key=f"rango_{clave}")
+    if len(rango) < 2:   # Aún se está eligiendo el segundo día
+        rango = (rango[0], rango[0]) if rango else (hoy, hoy)
+    return rango[0].isoformat(), (rango[1] + timedelta(days=1)).isoformat()
+
+
+# ==============================================================================
+# 4. ESCANEO MANUAL (EL ESCANEO HABITUAL LO HACE ingesta.py EN SEGUNDO PLANO)
+# ==============================================================================
+
+
+def al_terminar_escaneo(escaneo):
+    """Corre una vez por escaneo (en su hilo), no una vez por sesión."""
+    # Solo se vacía lo que cambió: las coordenadas nunca dependen del escaneo
+    invalidar("escaneos")
+    if escaneo.total_nuevas() != 0:   # None = escaneó otro proceso
+        invalidar("agregados", "graficos")
+
+
+@st.cache_resource(show_spinner=False)
+def obtener_coordinador():
+    """Un escaneo a la vez para todo el servidor (escaneo_compartido.py)."""
+    return CoordinadorEscaneos(almacen, FUENTES, al_terminar=al_terminar_escaneo)
+
+
+coordinador = obtener_coordinador()
+
+
+def seguir_escaneo(escaneo):
+    """
+    Dibuja el progreso del escaneo compartido hasta que termine. La sesión
+    solo guarda su número de versión; las filas las llena el hilo de fondo.
+    """
+    if escaneo.origen == "otro_proceso":
+        st.info("⏳ Otro proceso (ingesta.py) está escaneando; se usará su resultado.")
+    progress_bar = st.progress(0, text="Iniciando monitor de crimen...")
+    en_vivo = st.empty()
+    mostradas = -1
+
+    # Cada noticia se muestra apenas la entrega su fuente (la tabla empieza
+    # a llenarse con la más rápida); la barra avanza por fuente terminada
+    while True:
+        terminado = escaneo.esperar(0.5)
+        terminadas = list(escaneo.terminadas)
+        progress_bar.progress(int(len(terminadas) / escaneo.total * 100),
+                              text=f"✅ {len(terminadas)}/{escaneo.total} fuentes: " + ", ".join(terminadas))
+        if len(escaneo.llegadas) != mostradas:
+            llegadas = escaneo.llegadas[:]
+            mostradas = len(llegadas)
+            en_vivo.dataframe(pd.DataFrame(llegadas[::-1]), hide_index=True, use_container_width=True)
+        if terminado:
+            break
+
+    progress_bar.empty()
+    en_vivo.empty()
 
 
 # ==============================================================================
@@ -153,8 +274,8 @@ with st.sidebar:
     menu = option_menu(
         menu_title="Navegación",
         options=["Inicio", "Mapa del Crimen",
-                 "Análisis por Periódico", "Emergencias", "Equipo"],
-        icons=["house", "geo-alt", "newspaper", "phone", "people"],
+                 "Análisis por Periódico", "Cerca de mí", "Diagnóstico", "Emergencias", "Equipo"],
+        icons=["house", "geo-alt", "newspaper", "crosshair", "activity", "phone", "people"],
         menu_icon="list",
         default_index=0,
         styles={"nav-link-selected": {"background-color": "#D32F2F"}}
@@ -184,31 +305,59 @@ if menu == "Inicio":
     col_scan_center = st.columns([1, 2, 1])
     with col_scan_center[1]:
         if st.button("🔄 ESCANEAR DELITOS (FILTRO ACTIVADO)", type="primary", use_container_width=True):
-            st.cache_data.clear()
-            st.session_state['historial_noticias'] = escanear_con_archivos_propios()
+            if not MODULES_AVAILABLE:
+                st.error("⚠️ Error: No se detectan los archivos en la carpeta 'webscraping'.")
+            else:
+                # Si otra sesión ya escanea, esta espera ese mismo escaneo
+                st.session_state["escaneo_version"] = coordinador.solicitar().version
+
+        escaneo = coordinador.actual()
+        if escaneo is not None and st.session_state.get("escaneo_version") == escaneo.version:
+            del st.session_state["escaneo_version"]
+            if escaneo.origen == "reciente":
+                st.session_state["aviso_escaneo"] = (
+                    f"🕒 Las fuentes se escanearon hace menos de {ESCANEO_VIGENCIA_SEGUNDOS} s; "
+                    "se muestran esos resultados.")
+            else:
+                seguir_escaneo(escaneo)
+                if escaneo.error:
+                    st.session_state["aviso_escaneo"] = f"❌ El escaneo se interrumpió: {escaneo.error}"
             st.rerun()
-
-    df_kpi = st.session_state['historial_noticias']
+        elif escaneo is not None and escaneo.en_curso:
+            st.caption(f"🛰️ Escaneo en curso ({len(escaneo.terminadas)}/{escaneo.total} fuentes); "
+                       "los resultados aparecerán al recargar.")
+        if "aviso_escaneo" in st.session_state:
+            st.info(st.session_state.pop("aviso_escaneo"))
+
+    escaneos, total_delitos, repetidas = estado_escaneos(almacen.version_escaneos(),
+                                                         version_datos())
     k1, k2, k3 = st.columns(3)
     with k1:
         st.markdown(
-            f"""<div class="kpi-card"><h3>🗞️ {len(df_kpi)}</h3><p>Delitos Confirmados</p></div>""", unsafe_allow_html=True)
+            f"""<div class="kpi-card"><h3>🗞️ {total_delitos}</h3><p>Delitos Confirmados</p></div>""", unsafe_allow_html=True)
     with k2:
         st.markdown(
             f"""<div class="kpi-card"><h3>🛡️ Filtro</h3><p>Centralizado (Config.py)</p></div>""", unsafe_allow_html=True)
     with k3:
         st.markdown(
-            f"""<div class="kpi-card"><h3>📍 API</h3><p>Nominatim Activo</p></div>""", unsafe_allow_html=True)
+            f"""<div class="kpi-card"><h3>📍 Mapa</h3><p>Coordenadas Locales (+ Nominatim)</p></div>""", unsafe_allow_html=True)
+
+    # Snapshot escrito por ingesta.py (o por el botón): la página no espera a la red
+    if escaneos.empty:
+        st.caption("🕒 Aún no hay escaneos. Ejecuta `python ingesta.py` o usa el botón.")
+    else:
+        st.caption(f"🕒 Última actualización: {escaneos['Fin'].max()} · "
+                   f"🔁 {repetidas} notas repetidas en otros medios agrupadas")
+        with st.expander("Estado de las fuentes"):
+            st.dataframe(escaneos, hide_index=True, use_container_width=True)
 
 elif menu == "Mapa del Crimen":
     st.title("📍 Mapa de Calor (Solo Delitos)")
-    df_base = st.session_state['historial_noticias']
 
-    if df_base.empty:
+    if almacen.contar() == 0:
         st.warning("⚠️ No se han detectado delitos. Ve a 'Inicio' y escanea.")
     else:
-        distritos_disponibles = sorted(
-            df_base[df_base['Distrito'] != "⚠️ No Especificado"]['Distrito'].unique().tolist())
+        distritos_disponibles = almacen.valores_distintos('distrito', con_distrito=True)
 
         col_control, col_map = st.columns([1, 4])
         with col_control:
@@ -216,34 +365,72 @@ elif menu == "Mapa del Crimen":
             distrito_sel = st.selectbox(
                 "Distrito:", ["Todos"] + distritos_disponibles)
 
-            cats_dispo = ["Todos"]
-            if 'Categoría' in df_base.columns:
-                cats_dispo += list(df_base['Categoría'].unique())
-            delito_sel = st.selectbox("Tipo de Delito:", cats_dispo)
+            # Secciones A-F de config.py (una noticia puede estar en varias)
+            delito_sel = st.selectbox("Tipo de Delito:", ["Todos"] + list(BITS_SECCION))
+
+            desde, hasta = selector_fechas("mapa")
+
+            modo_mapa = st.radio("Vista:", ["Celdas (agregado)", "Mapa de calor", "Puntos (cada noticia)"])
+            zoom_c = 13 if distrito_sel != "Todos" else 10
+            if modo_mapa == "Celdas (agregado)":
+                zoom_c = st.slider("Nivel de zoom de las celdas:", 9, 14, zoom_c)
+
+        filtro_distritos = None if distrito_sel == "Todos" else (distrito_sel,)
+        filtro_secciones = None if delito_sel == "Todos" else BITS_SECCION[delito_sel]
 
         with col_map:
-            df_filtrado = df_base.copy()
-            if distrito_sel != "Todos":
-                df_filtrado = df_filtrado[df_filtrado['Distrito']
-                                          == distrito_sel]
-            if delito_sel != "Todos" and 'Categoría' in df_filtrado.columns:
-                df_filtrado = df_filtrado[df_filtrado['Categoría']
-                                          == delito_sel]
-
-            with st.spinner("Geolocalizando delitos con API..."):
-                coordenadas = df_filtrado['Distrito'].apply(
-                    obtener_coordenadas)
-
-            df_filtrado['lat'] = coordenadas.apply(
-                lambda x: x[0] if x else None)
-            df_filtrado['lon'] = coordenadas.apply(
-                lambda x: x[1] if x else None)
-            df_final = df_filtrado.dropna(subset=['lat', 'lon'])
+            if modo_mapa == "Puntos (cada noticia)":
+                # Filtro sobre códigos enteros y bits de sección de la tabla compartida
+                tabla = tabla_incidentes(version_datos())
+                filtros = dict(distritos=filtro_distritos, secciones=filtro_secciones,
+                               desde=desde, hasta=hasta)
+                mascara = tabla.mascara(**filtros)
+                df_final = tabla.filtrar(**filtros)
+                df_final['Sección'] = etiquetas_secciones(df_final['Secciones']).to_numpy()
+
+                # Tabla local (COORDENADAS_LIMA); Nominatim (con caché en disco)
+                # solo para nombres desconocidos, una vez por distrito
+                df_final['lat'], df_final['lon'] = tabla.coordenadas(geocodificar_con_cache, mascara)
+                df_final = df_final.dropna(subset=['lat', 'lon'])
+                capa = pdk.Layer(
+                    "ScatterplotLayer",
+                    df_final,
+                    get_position='[lon, lat]',
+                    get_color='[200, 30, 0, 160]',
+                    get_radius=200,
+                    pickable=True,
+                )
+                tooltip = {"text": "{Titular}\n({Sección})"}
+                total_mapa = len(df_final)
+            else:
+                # Conteos materializados por distrito (se actualizan al guardar)
+                df_final = conteos_ubicados(version_datos(), filtro_distritos,
+                                            filtro_secciones, desde, hasta)
+                total_mapa = int(df_final['Delitos'].sum()) if not df_final.empty else 0
+                if modo_mapa == "Mapa de calor":
+                    capa = pdk.Layer(
+                        "HeatmapLayer",
+                        df_final,
+                        get_position='[lon, lat]',
+                        get_weight='Delitos',
+                        radius_pixels=60,
+                    )
+                    tooltip = None
+                else:
+                    df_final = agrupar_en_celdas(df_final, zoom_c)
+                    capa = pdk.Layer(
+                        "ScatterplotLayer",
+                        df_final,
+                        get_position='[lon, lat]',
+                        get_color='[200, 30, 0, 140]',
+                        get_radius='radio',
+                        pickable=True,
+                    )
+                    tooltip = {"text": "{Delitos} delitos\n{Distritos}"}
 
             if not df_final.empty:
                 lat_c = df_final['lat'].iloc[0]
                 lon_c = df_final['lon'].iloc[0]
-                zoom_c = 13 if distrito_sel != "Todos" else 10
                 if distrito_sel == "Todos":
                     lat_c, lon_c = -12.0464, -77.0428
 
@@ -251,43 +438,26 @@ elif menu == "Mapa del Crimen":
                     map_style='https://basemaps.cartocdn.com/gl/positron-gl-style/style.json',
                     initial_view_state=pdk.ViewState(
                         latitude=lat_c, longitude=lon_c, zoom=zoom_c, pitch=45),
-                    layers=[
-                        pdk.Layer(
-                            "ScatterplotLayer",
-                            df_final,
-                            get_position='[lon, lat]',
-                            get_color='[200, 30, 0, 160]',
-                            get_radius=200,
-                            pickable=True,
-                        ),
-                    ],
-                    tooltip={"text": "{Titular}\n({Categoría})"}
+                    layers=[capa],
+                    tooltip=tooltip
                 ))
-                st.success(f"📍 Mostrando {len(df_final)} delitos en mapa.")
+                st.success(f"📍 Mostrando {total_mapa} delitos en mapa "
+                           f"({len(df_final)} elementos enviados al navegador).")
             else:
                 st.info("No hay delitos ubicables con estos filtros.")
 
 elif menu == "Análisis por Periódico":
     st.title("📊 Estadísticas de Criminalidad")
-    df_analisis = st.session_state['historial_noticias']
 
-    if df_analisis.empty:
+    if almacen.contar() == 0:
         st.warning("⚠️ Sin datos. Ejecuta el escaneo en Inicio.")
     else:
         st.write("### 🔍 Filtros")
 
-        # 🔹 LISTA FIJA DE TODOS LOS PERIÓDICOS
-        TODOS_LOS_PERIODICOS = [
-            "RPP",
-            "El Comercio",
-            "Canal N",
-            "Diario Correo",
-            "Infobae",
-            "La República",
-            "Perú21"
-        ]
+        # 🔹 TODOS LOS PERIÓDICOS (los de FUENTES_DEFINIDAS en config.py)
+        TODOS_LOS_PERIODICOS = [nombre_web for nombre_web, _ in FUENTES]
 
-        col_f1, col_f2 = st.columns(2)
+        col_f1, col_f2, col_f3 = st.columns(3)
 
         # =========================
         # FILTRO DE MEDIOS
@@ -300,22 +470,27 @@ elif menu == "Análisis por Periódico":
             )
 
         # =========================
-        # FILTRO DE CATEGORÍA
+        # FILTRO DE SECCIÓN (A-F DE CONFIG.PY)
         # =========================
-        if 'Categoría' in df_analisis.columns:
-            with col_f2:
-                tipos_sel = st.multiselect(
-                    "Tipo de Delito:",
-                    df_analisis['Categoría'].unique(),
-                    default=df_analisis['Categoría'].unique()
-                )
+        secciones = list(BITS_SECCION)
+        with col_f2:
+            tipos_sel = st.multiselect(
+                "Tipo de Delito:",
+                secciones,
+                default=secciones
+            )
+        # Todas marcadas = sin filtro (incluye las noticias sin sección)
+        filtro_secciones = None if len(tipos_sel) == len(secciones) else mascara_de(tipos_sel)
 
-            df_viz = df_analisis[
-                (df_analisis['Fuente'].isin(fuentes_sel)) &
-                (df_analisis['Categoría'].isin(tipos_sel))
-            ]
-        else:
-            df_viz = df_analisis[df_analisis['Fuente'].isin(fuentes_sel)]
+        # =========================
+        # FILTRO DE FECHAS (SOLO SE LEEN LOS DÍAS PEDIDOS DEL CUBO)
+        # =========================
+        with col_f3:
+            desde, hasta = selector_fechas("analisis")
+
+        # Figuras y ranking salen del cubo y se guardan en el espacio "graficos"
+        figuras = figuras_analisis(version_datos(), tuple(fuentes_sel), filtro_secciones,
+                                   tuple(TODOS_LOS_PERIODICOS), desde, hasta)
 
         st.write("---")
 
@@ -325,36 +500,13 @@ elif menu == "Análisis por Periódico":
         c1, c2 = st.columns(2)
 
         with c1:
-            conteo = (
-                df_viz['Fuente']
-                .value_counts()
-                .reindex(TODOS_LOS_PERIODICOS, fill_value=0)
-                .reset_index()
-            )
-            conteo.columns = ['Fuente', 'Cantidad']
-
-            fig1 = px.bar(
-                conteo,
-                x='Fuente',
-                y='Cantidad',
-                color='Fuente',
-                title="Noticias por Medio"
-            )
-            st.plotly_chart(fig1, use_container_width=True)
+            st.plotly_chart(figuras["medios"], use_container_width=True)
 
         with c2:
-            if 'Categoría' in df_viz.columns and not df_viz.empty:
-                conteo_tipo = df_viz['Categoría'].value_counts().reset_index()
-                conteo_tipo.columns = ['Categoría', 'Cantidad']
-
-                fig2 = px.pie(
-                    conteo_tipo,
-                    names='Categoría',
-                    values='Cantidad',
-                    hole=0.4,
-                    title="Distribución de Delitos"
-                )
-                st.plotly_chart(fig2, use_container_width=True)
+            if figuras["secciones"] is not None:
+                st.plotly_chart(figuras["secciones"], use_container_width=True)
+                st.caption("Una noticia cuenta en cada sección que menciona "
+                           "(p. ej. un robo con arma de fuego: Robos y Armas).")
 
         # =========================
         # TREEMAP
@@ -362,28 +514,8 @@ elif menu == "Análisis por Periódico":
         st.write("---")
         st.subheader("🚨 Mapa de Calor por Distritos")
 
-        df_geo = df_viz[df_viz['Distrito'] != "⚠️ No Especificado"].copy()
-
-        if not df_geo.empty:
-            df_geo.loc[df_geo['Distrito'] == 'LIMA', 'Distrito'] = 'CERCADO DE LIMA'
-
-            df_treemap = (
-                df_geo
-                .groupby(['Distrito', 'Categoría'])
-                .size()
-                .reset_index(name='Casos')
-            )
-
-            fig3 = px.treemap(
-                df_treemap,
-                path=['Distrito', 'Categoría'],
-                values='Casos',
-                color='Casos',
-                color_continuous_scale='Reds',
-                title="Concentración de Crimen"
-            )
-
-            st.plotly_chart(fig3, use_container_width=True)
+        if figuras["treemap"] is not None:
+            st.plotly_chart(figuras["treemap"], use_container_width=True)
 
         # =========================================================
         # RANKING DE DISTRITOS MÁS PELIGROSOS
@@ -391,23 +523,8 @@ elif menu == "Análisis por Periódico":
         st.write("---")
         st.subheader("🏆 Ranking de Distritos Más Peligrosos")
 
-        df_rank = df_viz[df_viz['Distrito'] != "⚠️ No Especificado"].copy()
-
-        if not df_rank.empty:
-            df_rank.loc[df_rank['Distrito'] == 'LIMA', 'Distrito'] = 'CERCADO DE LIMA'
-
-            ranking = (
-                df_rank
-                .groupby('Distrito')
-                .size()
-                .reset_index(name='Cantidad de Delitos')
-                .sort_values(by='Cantidad de Delitos', ascending=False)
-            )
-
-            ranking.index = range(1, len(ranking) + 1)
-            ranking.index.name = "Ranking"
-
-            st.dataframe(ranking, use_container_width=True)
+        if figuras["ranking"] is not None:
+            st.dataframe(figuras["ranking"], use_container_width=True)
         else:
             st.info("No hay datos suficientes para generar el ranking.")
 
@@ -415,8 +532,13 @@ elif menu == "Análisis por Periódico":
         # TABLA FINAL
         # =========================
         st.write("---")
+        st.caption(f"Últimas {LIMITE_TABLA} noticias con estos filtros")
+        df_viz = tabla_incidentes(version_datos()).filtrar(
+            ultimas=LIMITE_TABLA, fuentes=fuentes_sel, secciones=filtro_secciones,
+            desde=desde, hasta=hasta)
+        df_viz['Sección'] = etiquetas_secciones(df_viz['Secciones']).to_numpy()
         st.dataframe(
-            df_viz[['Titular', 'Categoría', 'Distrito', 'Fuente']],
+            df_viz[['Titular', 'Sección', 'Distrito', 'Fuente', 'Publicado']],
             hide_index=True,
             use_container_width=True
         )
@@ -428,6 +550,150 @@ elif menu == "Análisis por Periódico":
 
 
 
+elif menu == "Cerca de mí":
+    st.title("🎯 ¿Qué pasó cerca de mí?")
+
+    indice = obtener_indice_incidentes()
+    indice.actualizar()
+    servicios = obtener_servicios()
+
+    col_control, col_map = st.columns([1, 3])
+    with col_control:
+        st.subheader("Punto de referencia")
+        modo_punto = st.radio("Ubicación:", ["Distrito", "Coordenadas exactas"], key="modo_cerca")
+        if modo_punto == "Distrito":
+            distritos_ref = sorted(COORDENADAS_LIMA)
+            distrito_ref = st.selectbox(
+                "Distrito:", distritos_ref,
+                index=distritos_ref.index("CERCADO DE LIMA") if "CERCADO DE LIMA" in distritos_ref else 0)
+            lat_ref, lon_ref = COORDENADAS_LIMA[distrito_ref]
+        else:
+            lat_ref = st.number_input("Latitud:", value=-12.0464, min_value=-12.6, max_value=-11.5,
+                                      step=0.001, format="%.4f")
+            lon_ref = st.number_input("Longitud:", value=-77.0428, min_value=-77.4, max_value=-76.5,
+                                      step=0.001, format="%.4f")
+        radio_km = st.slider("Radio (km):", 0.5, 10.0, float(RADIO_CERCA_KM), step=0.5)
+        desde, hasta = selector_fechas("cerca")
+
+    # Rejilla en memoria: la consulta no toca SQLite ni servicios externos
+    inicio = time.perf_counter()
+    ids_cerca, _ = indice.en_radio(lat_ref, lon_ref, radio_km * 1000, desde, hasta)
+    cercanos = servicios.cercanos(lat_ref, lon_ref, SERVICIOS_CERCANOS)
+    ms_consulta = (time.perf_counter() - inicio) * 1000
+    zonas = indice.por_distrito(lat_ref, lon_ref, radio_km * 1000, desde, hasta)
+    en_radio = servicios.en_radio(lat_ref, lon_ref, radio_km * 1000)
+
+    with col_map:
+        k1, k2, k3 = st.columns(3)
+        k1.metric(f"Delitos a {radio_km:g} km", len(ids_cerca))
+        k2.metric("Servicios de emergencia en el radio", len(en_radio))
+        k3.metric("Consulta", f"{ms_consulta:.1f} ms")
+
+        colores = {"Comisaría": [25, 80, 200, 220], "Bomberos": [255, 140, 0, 220],
+                   "Hospital": [30, 160, 60, 220]}
+        mapa_servicios = pd.concat([cercanos, en_radio]).drop_duplicates(subset=["Tipo", "Nombre"])
+        mapa_servicios["color"] = mapa_servicios["Tipo"].map(colores)
+        capas = [
+            pdk.Layer("ScatterplotLayer", pd.DataFrame({"lat": [lat_ref], "lon": [lon_ref]}),
+                      get_position='[lon, lat]', get_fill_color='[0, 0, 0, 0]',
+                      get_line_color='[211, 47, 47, 200]', stroked=True, filled=False,
+                      line_width_min_pixels=2, get_radius=radio_km * 1000),
+            pdk.Layer("ScatterplotLayer", zonas, get_position='[lon, lat]',
+                      get_color='[200, 30, 0, 140]', get_radius='300 + Delitos * 20',
+                      pickable=True),
+            pdk.Layer("ScatterplotLayer", mapa_servicios, get_position='[lon, lat]',
+                      get_color='color', get_radius=120, pickable=True),
+            pdk.Layer("ScatterplotLayer", pd.DataFrame({"lat": [lat_ref], "lon": [lon_ref]}),
+                      get_position='[lon, lat]', get_color='[0, 0, 0, 230]', get_radius=80),
+        ]
+        st.pydeck_chart(pdk.Deck(
+            map_style='https://basemaps.cartocdn.com/gl/positron-gl-style/style.json',
+            initial_view_state=pdk.ViewState(latitude=lat_ref, longitude=lon_ref,
+                                             zoom=13 if radio_km <= 3 else 11),
+            layers=capas,
+            tooltip={"text": "{Nombre}{Distrito}\n{Delitos} {Tipo}"}
+        ))
+        st.caption("🔵 Comisarías · 🟠 Bomberos · 🟢 Hospitales · 🔴 Delitos por distrito. "
+                   "Las noticias no traen la dirección: cada delito se ubica en el centro de su distrito.")
+
+    st.subheader("🚓 Ayuda más cercana")
+    cercanos["Teléfono"] = cercanos["Tipo"].map(TELEFONOS_EMERGENCIA)
+    st.dataframe(cercanos[["Tipo", "Nombre", "Distrito", "Distancia (km)", "Teléfono"]],
+                 hide_index=True, use_container_width=True)
+    st.caption("⚠️ Ubicaciones referenciales (servicios_emergencia.csv). En una emergencia, "
+               "llama primero: 105 Policía, 116 Bomberos, 106 SAMU.")
+
+    st.subheader("📰 Delitos recientes en el radio")
+    if len(ids_cerca):
+        # Los de id más alto son los últimos guardados
+        ultimos = np.sort(ids_cerca)[-LIMITE_CERCANOS:]
+        df_cerca = almacen.consultar(ids=ultimos, limite=LIMITE_CERCANOS)
+        df_cerca["Distrito"] = df_cerca["Distrito"].astype(str)
+        df_cerca = df_cerca.merge(zonas[["Distrito", "Distancia (km)"]], on="Distrito", how="left")
+        df_cerca["Sección"] = etiquetas_secciones(df_cerca["Secciones"]).to_numpy()
+        st.dataframe(df_cerca[["Publicado", "Titular", "Distrito", "Distancia (km)", "Sección", "Fuente", "Enlace"]],
+                     column_config={"Enlace": st.column_config.LinkColumn("Link")},
+                     hide_index=True, use_container_width=True)
+    else:
+        st.info("No hay delitos registrados en este radio y periodo.")
+
+elif menu == "Diagnóstico":
+    st.title("🩺 Diagnóstico de Scrapers")
+    st.caption("Métricas por etapa (descarga, parseo, clasificación) de la app y del "
+               "servicio de ingesta. Los percentiles usan las últimas "
+               f"{instrumentacion.VENTANA} observaciones de cada fuente.")
+
+    exportadas = instrumentacion.cargar_exportadas()
+    if not exportadas:
+        st.warning("⚠️ Aún no hay métricas. Ejecuta un escaneo en Inicio o `python ingesta.py`.")
+    else:
+        resumen = pd.DataFrame(instrumentacion.resumen_por_fuente(exportadas))
+        st.write("### ⏱️ Tiempos y volumen por fuente")
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+
+        c1, c2 = st.columns(2)
+        with c1:
+            descartes = pd.DataFrame(instrumentacion.descartes_por_motivo(exportadas))
+            if not descartes.empty:
+                fig_desc = px.bar(descartes, x="Fuente", y="Titulares", color="Motivo",
+                                  title="Titulares descartados por motivo")
+                st.plotly_chart(fig_desc, use_container_width=True)
+        with c2:
+            etapas = resumen.melt(id_vars=["Proceso", "Fuente"],
+                                  value_vars=["Descarga p50 (ms)", "Parseo p50 (ms)",
+                                              "Clasificación p50 (ms)"],
+                                  var_name="Etapa", value_name="ms").dropna()
+            if not etapas.empty:
+                fig_etapas = px.bar(etapas, x="Fuente", y="ms", color="Etapa", barmode="group",
+                                    title="Mediana por etapa (ms)")
+                st.plotly_chart(fig_etapas, use_container_width=True)
+
+        errores = [e for datos in exportadas for e in datos["errores"]]
+        st.write("### ❌ Errores recientes")
+        if errores:
+            st.dataframe(pd.DataFrame(errores).sort_values("hora", ascending=False),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.success("Sin errores registrados.")
+
+        st.caption(f"Formato Prometheus: `{instrumentacion.CARPETA_DATOS}/metricas_<proceso>.prom`")
+
+    # Cachés en memoria de este proceso de Streamlit (compartidas por las sesiones)
+    st.write("### 🧠 Cachés en memoria")
+    filas_cache = cache_memoria.estadisticas()
+    st.dataframe(pd.DataFrame(filas_cache), use_container_width=True, hide_index=True)
+    for fila in filas_cache:
+        if fila["Muy grandes"]:
+            st.warning(f"⚠️ El espacio `{fila['Espacio']}` rechazó {fila['Muy grandes']} resultados "
+                       f"demasiado grandes para cachear (hasta {fila['Mayor rechazado MB']} MB, "
+                       f"tope {fila['Tope MB']} MB): se recalculan en cada consulta. "
+                       "Sube su `max_mb` en `LIMITES_CACHE` (config.py).")
+    columnas_cache = st.columns(len(cache_memoria.LIMITES_CACHE))
+    for col, nombre in zip(columnas_cache, cache_memoria.LIMITES_CACHE):
+        if col.button(f"🗑️ Vaciar {nombre}", key=f"vaciar_{nombre}"):
+            invalidar(nombre)
+            st.rerun()
+
 elif menu == "Equipo":
     st.markdown("""
     <style>
@@ -454,6 +720,8 @@ elif menu == "Equipo":
 elif menu == "Emergencias":
     st.title("📞 Centrales de Emergencia")
     st.caption("📱 En celulares, toca el botón para llamar directamente o ubicar ayuda cercana.")
+    st.info("🎯 En **Cerca de mí** puedes ver las comisarías, bomberos y hospitales más cercanos "
+            "a un punto y los delitos reportados a su alrededor, sin salir de la app.")
 
     col1, col2, col3 = st.columns(3)
 
@@ -0,0 +1,163 @@
+# articulos.py
+import hashlib
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from bd_local import BaseSQLite
+from clasificador import BUSCADOR_DISTRITOS
+from cliente_http import obtener
+from config import (
+    ARTICULOS_TTL_NEGATIVO_HORAS, MAX_ARTICULOS_SIMULTANEOS, PARRAFOS_ENTRADILLA,
+    RUTA_CACHE_ARTICULOS
+)
+from cortesia import esperar_turno
+from deduplicacion import enlace_canonico
+from parseo import parsear
+
+LARGO_MINIMO_PARRAFO = 40   # Menos que esto suele ser un pie de foto o un "Lee también"
+
+# ==============================================================================
+# 1. ENTRADILLA DEL ARTÍCULO
+# ==============================================================================
+
+
+def extraer_entradilla(html, parrafos=PARRAFOS_ENTRADILLA):
+    """Texto de los primeros `parrafos` <p> con contenido real del artículo."""
+    soup = parsear(html, "p")
+    textos = []
+    for p in soup.find_all("p"):
+        texto = p.get_text(" ", strip=True)
+        if len(texto) >= LARGO_MINIMO_PARRAFO:
+            textos.append(texto)
+            if len(textos) == parrafos:
+                break
+    return "\n".join(textos)
+
+# ==============================================================================
+# 2. CACHÉ DIRECCIONADA POR CONTENIDO
+# ==============================================================================
+
+
+class CacheArticulos(BaseSQLite):
+    """
+    `entradillas` guarda cada texto una sola vez, comprimido y con su SHA-256
+    como clave (la misma nota sindicada en dos URLs ocupa un solo registro).
+    `articulos` apunta del enlace canónico a ese hash; hash NULL = la descarga
+    falló y no se reintenta hasta que venza ARTICULOS_TTL_NEGATIVO_HORAS.
+    Se guarda el texto y no el distrito: si cambian las reglas del
+    clasificador no hace falta volver a descargar nada.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS entradillas (
+            hash TEXT PRIMARY KEY,
+            texto BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS articulos (
+            enlace TEXT PRIMARY KEY,
+            hash TEXT,
+            creado REAL NOT NULL
+        );
+    """
+
+    def __init__(self, ruta=RUTA_CACHE_ARTICULOS, ttl_negativo_horas=ARTICULOS_TTL_NEGATIVO_HORAS):
+        self.ttl_negativo = ttl_negativo_horas * 3600
+        super().__init__(ruta)
+
+    def obtener(self, enlace):
+        """
+        (True, texto) si el artículo ya se leyó, (True, None) si falló hace
+        poco y (False, None) si hay que descargarlo.
+        """
+        with self._conexion() as con:
+            fila = con.execute(
+                "SELECT a.hash, a.creado, e.texto FROM articulos a "
+                "LEFT JOIN entradillas e ON e.hash = a.hash WHERE a.enlace = ?",
+                (enlace,)).fetchone()
+        if fila is None:
+            return False, None
+        hash_texto, creado, texto = fila
+        if hash_texto is None:
+            return time.time() - creado <= self.ttl_negativo, None
+        return True, zlib.decompress(texto).decode("utf-8")
+
+    def guardar(self, enlace, texto):
+        """`texto` None registra un fallo."""
+        hash_texto = None
+        with self._conexion() as con:
+            if texto is not None:
+                datos = texto.encode("utf-8")
+                hash_texto = hashlib.sha256(datos).hexdigest()
+                con.execute("INSERT OR IGNORE INTO entradillas VALUES (?, ?)",
+                            (hash_texto, zlib.compress(datos)))
+            con.execute("INSERT OR REPLACE INTO articulos VALUES (?, ?, ?)",
+                        (enlace, hash_texto, time.time()))
+
+
+_CACHE = None
+_CANDADO = threading.Lock()
+_EJECUTOR = None
+
+
+def obtener_cache():
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = CacheArticulos()
+    return _CACHE
+
+
+def _ejecutor():
+    """Un solo pool para todo el proceso: el tope vale sumando todas las fuentes."""
+    global _EJECUTOR
+    with _CANDADO:
+        if _EJECUTOR is None:
+            _EJECUTOR = ThreadPoolExecutor(max_workers=MAX_ARTICULOS_SIMULTANEOS,
+                                           thread_name_prefix="articulo")
+        return _EJECUTOR
+
+# ==============================================================================
+# 3. DISTRITO DESDE EL CUERPO
+# ==============================================================================
+
+
+def leer_entradilla(enlace, headers=None):
+    """
+    (texto, origen) con origen 'cache', 'descarga' o 'error'. Respeta el
+    turno por dominio igual que las secciones.
+    """
+    cache = obtener_cache()
+    clave = enlace_canonico(enlace)
+    en_cache, texto = cache.obtener(clave)
+    if en_cache:
+        return texto, "cache" if texto is not None else "error"
+
+    try:
+        esperar_turno(enlace)
+        response = obtener(enlace, headers=headers)
+        if response.status_code != 200:
+            raise ValueError(f"HTTP {response.status_code}")
+        texto = extraer_entradilla(response.content)
+    except Exception as e:
+        print(f"⚠️ Artículo no disponible {enlace}: {e}")
+        cache.guardar(clave, None)
+        return None, "error"
+
+    cache.guardar(clave, texto)
+    return texto, "descarga"
+
+
+def ubicar_por_cuerpo(enlaces, headers=None):
+    """
+    Lista de (distrito o None, origen, entradilla) en el orden de `enlaces`.
+    Las descargas corren en el pool compartido de MAX_ARTICULOS_SIMULTANEOS hilos.
+    """
+    if not enlaces:
+        return []
+    futuros = [_ejecutor().submit(leer_entradilla, enlace, headers) for enlace in enlaces]
+    resultados = []
+    for futuro in futuros:
+        texto, origen = futuro.result()
+        resultados.append((BUSCADOR_DISTRITOS.buscar(texto), origen, texto))
+    return resultados
@@ -0,0 +1,34 @@
+# bd_local.py
+import os
+import sqlite3
+import threading
+
+# ==============================================================================
+# CONEXIONES SQLITE POR HILO
+# ==============================================================================
+
+
+class BaseSQLite:
+    """
+    Base común de las cachés y almacenes en SQLite del proyecto.
+    Cada hilo usa su propia conexión y la base trabaja en modo WAL, así varios
+    workers de Streamlit y scripts por lotes pueden leer y escribir a la vez.
+    """
+
+    ESQUEMA = ""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with self._conexion() as con:
+            con.executescript(self.ESQUEMA)
+
+    def _conexion(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
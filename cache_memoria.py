@@ -0,0 +1,160 @@
+# cache_memoria.py
+import sys
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+try:
+    from config import LIMITES_CACHE
+except ImportError:
+    LIMITES_CACHE = {}
+
+# ==============================================================================
+# 1. TAMAÑO APROXIMADO DE UN VALOR
+# ==============================================================================
+
+
+def tamano_aproximado(valor):
+    """Bytes que ocupa un resultado cacheado (DataFrames con memory_usage profundo)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if hasattr(valor, "memoria"):            # TablaIncidentes
+        return int(valor.memoria())
+    if hasattr(valor, "to_plotly_json"):     # Figuras de plotly
+        return len(valor.to_json())
+    if isinstance(valor, (tuple, list)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor.values())
+    return sys.getsizeof(valor)
+
+# ==============================================================================
+# 2. UN ESPACIO DE CACHÉ (LRU CON TOPE DE ENTRADAS Y DE BYTES)
+# ==============================================================================
+
+
+class EspacioCache:
+    """
+    Caché LRU con nombre, compartida por todas las sesiones del proceso.
+    Al pasar `max_entradas` o `max_bytes` se desalojan las entradas usadas
+    hace más tiempo; `invalidar()` vacía solo este espacio.
+    """
+
+    def __init__(self, nombre, max_entradas=64, max_mb=50, descripcion=""):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.max_entradas = max_entradas
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._candado = threading.Lock()
+        self._entradas = OrderedDict()   # clave -> (valor, bytes)
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+        self.demasiado_grandes = 0   # Valores que no caben en el espacio
+        self.mayor_rechazado = 0
+
+    def obtener(self, clave):
+        """(True, valor) si está; (False, None) si hay que calcularlo."""
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return True, self._entradas[clave][0]
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, clave, valor):
+        tamano = tamano_aproximado(valor)
+        with self._candado:
+            if tamano > self.max_bytes:
+                # Más grande que todo el espacio: no se guarda y se recalcula
+                # en cada consulta; Diagnóstico lo muestra para subir el tope
+                self.demasiado_grandes += 1
+                self.mayor_rechazado = max(self.mayor_rechazado, tamano)
+                return
+            if clave in self._entradas:
+                self.bytes -= self._entradas.pop(clave)[1]
+            self._entradas[clave] = (valor, tamano)
+            self.bytes += tamano
+            while len(self._entradas) > self.max_entradas or self.bytes > self.max_bytes:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self.bytes -= liberado
+                self.desalojos += 1
+
+    def invalidar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.bytes = 0
+            self.invalidaciones += 1
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "Espacio": self.nombre,
+                "Contenido": self.descripcion,
+                "Entradas": f"{len(self._entradas)}/{self.max_entradas}",
+                "MB": round(self.bytes / 1024 / 1024, 2),
+                "Tope MB": round(self.max_bytes / 1024 / 1024, 1),
+                "Aciertos": self.aciertos,
+                "Fallos": self.fallos,
+                "% aciertos": round(100 * self.aciertos / consultas, 1) if consultas else None,
+                "Desalojos": self.desalojos,
+                "Invalidaciones": self.invalidaciones,
+                "Muy grandes": self.demasiado_grandes,
+                "Mayor rechazado MB": round(self.mayor_rechazado / 1024 / 1024, 1),
+            }
+
+# ==============================================================================
+# 3. REGISTRO DE ESPACIOS Y DECORADOR
+# ==============================================================================
+
+ESPACIOS = {}
+_CANDADO_ESPACIOS = threading.Lock()
+
+
+def espacio(nombre):
+    """El espacio `nombre`, creado con sus límites de LIMITES_CACHE la primera vez."""
+    with _CANDADO_ESPACIOS:
+        if nombre not in ESPACIOS:
+            ESPACIOS[nombre] = EspacioCache(nombre, **LIMITES_CACHE.get(nombre, {}))
+        return ESPACIOS[nombre]
+
+
+def memoizar(nombre_espacio):
+    """
+    Guarda el resultado de la función en el espacio indicado, con los
+    argumentos (que deben ser hashables) como clave.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            cache = espacio(nombre_espacio)
+            clave = (funcion.__qualname__, args, tuple(sorted(kwargs.items())))
+            encontrado, valor = cache.obtener(clave)
+            if not encontrado:
+                valor = funcion(*args, **kwargs)
+                cache.guardar(clave, valor)
+            return valor
+        return envoltura
+    return decorador
+
+
+def invalidar(*nombres):
+    for nombre in nombres:
+        espacio(nombre).invalidar()
+
+
+def estadisticas():
+    """Una fila por espacio (en el orden de LIMITES_CACHE) para el panel."""
+    nombres = list(LIMITES_CACHE) + [n for n in list(ESPACIOS) if n not in LIMITES_CACHE]
+    return [espacio(nombre).estadisticas() for nombre in nombres]
@@ -0,0 +1,151 @@
+# clasificador.py
+import hashlib
+import json
+import re
+import time
+
+try:
+    from config import PALABRAS_CLAVE, DISTRITOS_INTEGRADOS, SECCIONES_DELITO
+except ImportError:
+    PALABRAS_CLAVE, DISTRITOS_INTEGRADOS, SECCIONES_DELITO = [], [], {}
+
+try:
+    from instrumentacion import acumular
+except ImportError:
+    def acumular(etapa, segundos):
+        pass
+
+# ==============================================================================
+# 1. CONSTRUCCIÓN DEL PATRÓN (TRIE -> UNA SOLA EXPRESIÓN REGULAR)
+# ==============================================================================
+
+
+def _trie_a_regex(nodo):
+    """
+    Convierte un trie {caracter: subtrie, '': True} en una regex sin
+    alternativas redundantes. Si un nodo es final y además tiene hijos, la
+    continuación queda como opcional codiciosa: primero se intenta lo más largo.
+    """
+    es_final = '' in nodo
+    ramas = [re.escape(c) + _trie_a_regex(hijo)
+             for c, hijo in sorted(nodo.items()) if c != '']
+
+    if not ramas:
+        return ''
+    if len(ramas) == 1 and not es_final:
+        return ramas[0]
+
+    patron = '(?:' + '|'.join(ramas) + ')'
+    return patron + '?' if es_final else patron
+
+
+def compilar_palabras(palabras):
+    trie = {}
+    for palabra in palabras:
+        nodo = trie
+        for c in palabra:
+            nodo = nodo.setdefault(c, {})
+        nodo[''] = True
+    return re.compile(r'\b' + _trie_a_regex(trie) + r'\b')
+
+# ==============================================================================
+# 2. BUSCADOR COMPILADO UNA SOLA VEZ
+# ==============================================================================
+
+
+class BuscadorPalabras:
+    """
+    Reemplaza a las copias de 'buscar_palabra_exacta' de cada scraper.
+    Todas las palabras se compilan una vez en un único patrón; el texto se
+    recorre en una sola pasada y gana la coincidencia más larga, así
+    'San Juan de Miraflores' tiene prioridad sobre 'Miraflores'.
+    """
+
+    def __init__(self, palabras):
+        self.palabras = sorted({p.lower() for p in palabras if p})
+        self._patron = compilar_palabras(self.palabras) if self.palabras else None
+
+    def buscar(self, texto):
+        """Devuelve la palabra encontrada en MAYÚSCULAS, o None."""
+        if not texto or self._patron is None:
+            return None
+
+        inicio = time.perf_counter()
+        mejor = ''
+        for coincidencia in self._patron.finditer(texto.lower()):
+            if len(coincidencia.group()) > len(mejor):
+                mejor = coincidencia.group()
+
+        acumular("clasificacion_segundos", time.perf_counter() - inicio)
+        return mejor.upper() if mejor else None
+
+    def buscar_todas(self, texto):
+        """Todas las palabras encontradas, en orden de aparición."""
+        if not texto or self._patron is None:
+            return []
+        return [c.group().upper() for c in self._patron.finditer(texto.lower())]
+
+
+# Instancias compartidas por todos los scrapers (se compilan al importar)
+BUSCADOR_DISTRITOS = BuscadorPalabras(DISTRITOS_INTEGRADOS)
+BUSCADOR_DELITOS = BuscadorPalabras(PALABRAS_CLAVE)
+
+
+def huella(*listas):
+    """Resumen estable de listas de palabras (cambia si se edita alguna)."""
+    return hashlib.sha1(json.dumps(listas, ensure_ascii=False).encode("utf-8")).hexdigest()[:12]
+
+
+# Si cambian las listas de config.py, los resultados guardados dejan de valer
+VERSION_REGLAS = huella(SECCIONES_DELITO, PALABRAS_CLAVE, DISTRITOS_INTEGRADOS)
+
+
+def texto_distrito(titular, contexto=None):
+    """
+    Donde se busca el distrito: el titular más el `contexto` (resumen del
+    listado o entradilla del artículo) con que se ubicó la noticia. El
+    almacén guarda ese contexto para que reclasificar.py busque en lo mismo.
+    """
+    return f"{titular} {contexto}" if contexto else titular
+
+# ==============================================================================
+# 3. SECCIONES A-F COMO MÁSCARA DE BITS
+# ==============================================================================
+# Un bit por sección de SECCIONES_DELITO (Vida = 1, Robos = 2, Crimen
+# organizado = 4...). Un titular sobre un robo con arma de fuego queda en
+# Robos | Armas; filtrar "alguna de estas secciones" es `mascara & filtro != 0`.
+
+BITS_SECCION = {nombre: 1 << i for i, nombre in enumerate(SECCIONES_DELITO)}
+SIN_SECCION = "Otros"   # Nombre para la máscara 0 (categorías antiguas sin palabra clave)
+
+_BIT_POR_PALABRA = {palabra.upper(): BITS_SECCION[nombre]
+                    for nombre, palabras in SECCIONES_DELITO.items() for palabra in palabras}
+
+
+def mascara_secciones(*textos, categoria=None):
+    """
+    OR de las secciones de todas las palabras clave que aparecen en los
+    textos. Una categoría por URL ('Policiales/Judiciales') suma la sección
+    cuyo nombre lleva al inicio.
+    """
+    mascara = 0
+    for texto in textos:
+        for palabra in BUSCADOR_DELITOS.buscar_todas(texto):
+            mascara |= _BIT_POR_PALABRA.get(palabra, 0)
+    if categoria:
+        mascara |= _BIT_POR_PALABRA.get(categoria.upper(), 0)
+        mascara |= next((bit for nombre, bit in BITS_SECCION.items()
+                         if categoria.lower().startswith(nombre.lower())), 0)
+    return mascara
+
+
+def mascara_de(nombres):
+    """Máscara con los bits de una lista de nombres de sección."""
+    mascara = 0
+    for nombre in nombres:
+        mascara |= BITS_SECCION.get(nombre, 0)
+    return mascara
+
+
+def nombres_secciones(mascara):
+    return [nombre for nombre, bit in BITS_SECCION.items() if mascara & bit] or [SIN_SECCION]
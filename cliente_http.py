@@ -0,0 +1,227 @@
+# cliente_http.py
+import hashlib
+import json
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from bd_local import BaseSQLite
+from clasificador import VERSION_REGLAS
+from config import (
+    FUENTES_DEFINIDAS, HEADERS, REINTENTOS_HTTP, RUTA_CACHE_HTTP, SERVIDOR_LOCAL,
+    TIMEOUT_POR_DEFECTO, TIMEOUTS_POR_HOST
+)
+from cortesia import esperar_turno
+from instrumentacion import contar, medir_pagina, observar, registrar_error
+
+# brotli solo se anuncia si hay con qué descomprimirlo
+try:
+    import brotli  # noqa: F401
+    ACEPTA_CODIFICACION = "gzip, deflate, br"
+except ImportError:
+    ACEPTA_CODIFICACION = "gzip, deflate"
+
+# Solo los medios van a SERVIDOR_LOCAL; Nominatim y demás servicios no
+HOSTS_FUENTES = {urlparse(url).netloc.removeprefix("www.")
+                 for fuente in FUENTES_DEFINIDAS for url in fuente["urls"]}
+
+# ==============================================================================
+# 1. SESIONES REUTILIZABLES POR DOMINIO
+# ==============================================================================
+
+_SESIONES = {}
+_CANDADO_SESIONES = threading.Lock()
+
+
+def _crear_sesion():
+    reintentos = Retry(
+        total=REINTENTOS_HTTP,
+        backoff_factor=0.5,                       # 0.5 s, 1 s, 2 s...
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=reintentos)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    sesion.headers.update(HEADERS)
+    sesion.headers["Accept-Encoding"] = ACEPTA_CODIFICACION
+    sesion.headers["Connection"] = "keep-alive"
+    return sesion
+
+
+def obtener_sesion(url):
+    """Una sesión (con su pool keep-alive) por dominio, compartida entre hilos."""
+    host = urlparse(url).netloc
+    with _CANDADO_SESIONES:
+        sesion = _SESIONES.get(host)
+        if sesion is None:
+            sesion = _SESIONES[host] = _crear_sesion()
+        return sesion
+
+
+def obtener(url, headers=None, timeout=None, **kwargs):
+    """
+    GET a través de la sesión del dominio: reutiliza la conexión TLS, pide
+    gzip/brotli y reintenta errores temporales (429/5xx) con espera exponencial.
+    """
+    host = urlparse(url).netloc
+    if timeout is None:
+        timeout = TIMEOUTS_POR_HOST.get(host.removeprefix("www."), TIMEOUT_POR_DEFECTO)
+
+    if SERVIDOR_LOCAL and host.removeprefix("www.") in HOSTS_FUENTES:
+        url = SERVIDOR_LOCAL.rstrip("/") + "/" + url.split("://", 1)[1]
+
+    return obtener_sesion(url).get(url, headers=headers, timeout=timeout, **kwargs)
+
+
+def bytes_recibidos(response):
+    """
+    Bytes del cuerpo tal como viajaron: comprimidos si llegó con gzip/br y 0
+    en un 304. Es lo que ahorran la compresión y la revalidación. Un cuerpo
+    comprimido sin Content-Length (chunked) del que urllib3 no llevó la
+    cuenta se mide ya descomprimido.
+    """
+    if response.headers.get("Content-Encoding"):
+        largo = response.headers.get("Content-Length", "")
+        if largo.isdigit():
+            return int(largo)
+        leidos = getattr(response.raw, "tell", lambda: 0)()   # Lo leído del socket
+        if leidos:
+            return int(leidos)
+    return len(response.content)
+
+# ==============================================================================
+# 2. CACHÉ DE PÁGINAS (ETAG / LAST-MODIFIED / HASH / NOTICIAS EXTRAÍDAS)
+# ==============================================================================
+
+
+class CachePaginas(BaseSQLite):
+    """
+    Por cada URL de sección guarda los validadores HTTP, el hash del HTML, el
+    HTML comprimido y las noticias que se extrajeron de él la última vez.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS paginas (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            ultima_modificacion TEXT,
+            hash TEXT,
+            html BLOB,
+            version TEXT,
+            registros TEXT,
+            actualizado REAL
+        );
+    """
+
+    def __init__(self, ruta=RUTA_CACHE_HTTP):
+        super().__init__(ruta)
+
+    def obtener(self, url):
+        with self._conexion() as con:
+            fila = con.execute(
+                "SELECT etag, ultima_modificacion, hash, html, version, registros "
+                "FROM paginas WHERE url = ?", (url,)).fetchone()
+        if fila is None:
+            return None
+        etag, ultima_modificacion, hash_html, html, version, registros = fila
+        return {
+            "etag": etag,
+            "ultima_modificacion": ultima_modificacion,
+            "hash": hash_html,
+            "html": zlib.decompress(html) if html else None,
+            "version": version,
+            "registros": json.loads(registros) if registros else [],
+        }
+
+    def guardar(self, url, etag, ultima_modificacion, hash_html, html, version, registros):
+        with self._conexion() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO paginas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, ultima_modificacion, hash_html, zlib.compress(html),
+                 version, json.dumps(registros, ensure_ascii=False), time.time()))
+
+    def vaciar(self):
+        with self._conexion() as con:
+            con.execute("DELETE FROM paginas")
+
+    def tocar(self, url):
+        with self._conexion() as con:
+            con.execute("UPDATE paginas SET actualizado = ? WHERE url = ?", (time.time(), url))
+
+
+_CACHE = None
+
+
+def obtener_cache():
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = CachePaginas()
+    return _CACHE
+
+# ==============================================================================
+# 3. DESCARGA CONDICIONAL
+# ==============================================================================
+
+
+def procesar_pagina(url, extraer, version="", headers=None, timeout=None):
+    """
+    Descarga `url` y devuelve `extraer(html_bytes)` (una lista de noticias).
+
+    Se envían If-None-Match / If-Modified-Since con lo guardado de la visita
+    anterior. Si el servidor responde 304, o el HTML llega idéntico (mismo
+    hash), no se vuelve a parsear ni clasificar: se devuelven las noticias
+    guardadas. `version` identifica los filtros propios del scraper; si
+    cambia, el HTML guardado se vuelve a procesar aunque no haya cambiado.
+    """
+    cache = obtener_cache()
+    previo = cache.obtener(url)
+    version = f"{VERSION_REGLAS}:{version}"
+
+    cabeceras = dict(headers or {})
+    if previo and previo["html"] is not None:
+        if previo["etag"]:
+            cabeceras["If-None-Match"] = previo["etag"]
+        if previo["ultima_modificacion"]:
+            cabeceras["If-Modified-Since"] = previo["ultima_modificacion"]
+
+    esperar_turno(url)
+    contar("paginas_total")
+    inicio = time.perf_counter()
+    response = obtener(url, headers=cabeceras, timeout=timeout)
+    observar("descarga_segundos", time.perf_counter() - inicio)
+    observar("descarga_bytes", bytes_recibidos(response))
+
+    if response.status_code == 304 and previo:
+        if previo["version"] == version:
+            contar("paginas_sin_cambios_total")
+            cache.tocar(url)
+            return previo["registros"]
+        html = previo["html"]
+        etag, ultima_modificacion = previo["etag"], previo["ultima_modificacion"]
+    elif response.status_code == 200:
+        html = response.content
+        etag = response.headers.get("ETag")
+        ultima_modificacion = response.headers.get("Last-Modified")
+    else:
+        registrar_error(url, f"HTTP {response.status_code}")
+        return []
+
+    hash_html = hashlib.sha256(html).hexdigest()
+    if previo and previo["hash"] == hash_html and previo["version"] == version:
+        contar("paginas_sin_cambios_total")
+        registros = previo["registros"]
+    else:
+        with medir_pagina():
+            registros = extraer(html)
+
+    cache.guardar(url, etag, ultima_modificacion, hash_html, html, version, registros)
+    return registros
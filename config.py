@@ -1,4 +1,6 @@
 # config.py
+import os
+from datetime import timedelta, timezone
 
 # 1. IDENTIDAD DEL ROBOT (HEADERS)
 HEADERS = {
@@ -6,43 +8,58 @@ HEADERS = {
 }
 
 # 2. DICCIONARIO DE PALABRAS CLAVE (VOCABULARIO AMPLIADO)
-PALABRAS_CLAVE = [
+# Agrupadas en secciones A-F: cada incidente guarda una máscara de bits con
+# todas las secciones cuyas palabras aparecen (clasificador.py)
+SECCIONES_DELITO = {
     # --- A. DELITOS CONTRA LA VIDA (Verbos y Sustantivos) ---
-    "asesinato", "asesinan", "asesino", "homicidio", "muerte", "muere", "fallece",
-    "matan", "matar", "crimen", "sicario", "sicariato", "feminicidio",
-    "acribillado", "acribillan", "baleado", "balean", "disparos", "disparan", "balacera",
-    "cadáver", "cuerpo", "hallan cuerpo", "degollado", "descuartizado", "quemado",
-    "envenenado", "estrangulado", "ajuste de cuentas", "tiroteo",
+    "Vida": [
+        "asesinato", "asesinan", "asesino", "homicidio", "muerte", "muere", "fallece",
+        "matan", "matar", "crimen", "sicario", "sicariato", "feminicidio",
+        "acribillado", "acribillan", "baleado", "balean", "disparos", "disparan", "balacera",
+        "cadáver", "cuerpo", "hallan cuerpo", "degollado", "descuartizado", "quemado",
+        "envenenado", "estrangulado", "ajuste de cuentas", "tiroteo"
+    ],
 
     # --- B. ROBOS Y ASALTOS (Modalidades) ---
-    "robo", "roban", "asaltan", "asalto", "delincuencia", "delincuente", "ladrón", "ladrones",
-    "atraco", "arrebatador", "arrebatan", "raquetero", "raqueteros", "bujiazo",
-    "marca", "marcas", "sacapintas", "cogotero", "tendero", "patrones", 
-    "celular", "mochila", "cartera", "billetera", "autopartes", "desmantelan",
+    "Robos": [
+        "robo", "roban", "asaltan", "asalto", "delincuencia", "delincuente", "ladrón", "ladrones",
+        "atraco", "arrebatador", "arrebatan", "raquetero", "raqueteros", "bujiazo",
+        "marca", "marcas", "sacapintas", "cogotero", "tendero", "patrones",
+        "celular", "mochila", "cartera", "billetera", "autopartes", "desmantelan"
+    ],
 
     # --- C. CRIMEN ORGANIZADO Y EXTORSIÓN ---
-    "extorsion", "extorsión", "extorsionadores", "cupos", "cobro de cupos",
-    "vacunas", "gota a gota", "gotagota", "prestamistas", 
-    "banda criminal", "organización criminal", "clan", "cártel", "mafia",
-    "tren de aragua", "los pulpos", "malditos", "hijos de dios",
+    "Crimen organizado": [
+        "extorsion", "extorsión", "extorsionadores", "cupos", "cobro de cupos",
+        "vacunas", "gota a gota", "gotagota", "prestamistas",
+        "banda criminal", "organización criminal", "clan", "cártel", "mafia",
+        "tren de aragua", "los pulpos", "malditos", "hijos de dios"
+    ],
 
     # --- D. VIOLENCIA Y AMENAZAS ---
-    "secuestro", "secuestran", "tentativa", "amenaza", "amedrentan", "golpean", "golpiza",
-    "agresión", "violencia", "abuso", "tocamientos", "violación", "ultrajan",
-    "pepean", "pepeado", "pildoritas", "droga", "tráfico ilícito", "microcomercialización",
+    "Violencia": [
+        "secuestro", "secuestran", "tentativa", "amenaza", "amedrentan", "golpean", "golpiza",
+        "agresión", "violencia", "abuso", "tocamientos", "violación", "ultrajan",
+        "pepean", "pepeado", "pildoritas", "droga", "tráfico ilícito", "microcomercialización"
+    ],
 
     # --- E. POLICIALES Y JUSTICIA (Acciones de la autoridad) ---
-    "policia", "policía", "pnp", "comisaria", "comisaría", "serenazgo", "serenos",
-    "captura", "capturan", "detenido", "detienen", "cae", "caen", "intervención", 
-    "intervienen", "operativo", "allanamiento", "desarticulan",
-    "incautan", "decomisan", "fiscalía", "fiscal", "prisión", "cárcel", "marrocas",
-    "terna", "escuadrón verde", "suat", "dirincri", "diviac",
+    "Policiales": [
+        "policia", "policía", "pnp", "comisaria", "comisaría", "serenazgo", "serenos",
+        "captura", "capturan", "detenido", "detienen", "cae", "caen", "intervención",
+        "intervienen", "operativo", "allanamiento", "desarticulan",
+        "incautan", "decomisan", "fiscalía", "fiscal", "prisión", "cárcel", "marrocas",
+        "terna", "escuadrón verde", "suat", "dirincri", "diviac"
+    ],
 
     # --- F. ARMAS Y PELIGRO ---
-    "armas", "arma de fuego", "pistola", "revólver", "fusil", "cuchillo", "navaja", "arma blanca",
-    "granada", "explosivo", "detonación", "dinamita", "artefacto explosivo",
-    "incendio", "siniestro", "fuego", "bomberos", "rescate", "emergencia"
-]
+    "Armas": [
+        "armas", "arma de fuego", "pistola", "revólver", "fusil", "cuchillo", "navaja", "arma blanca",
+        "granada", "explosivo", "detonación", "dinamita", "artefacto explosivo",
+        "incendio", "siniestro", "fuego", "bomberos", "rescate", "emergencia"
+    ],
+}
+PALABRAS_CLAVE = [p for palabras in SECCIONES_DELITO.values() for p in palabras]
 
 # 3. GEOLOCALIZACIÓN (COORDENADAS DE DISTRITOS)
 COORDENADAS_LIMA = {
@@ -64,5 +81,232 @@ COORDENADAS_LIMA = {
     "VENTANILLA": [-11.8753, -77.1256], "LA PERLA": [-12.0675, -77.1025]
 }
 
+# Nombres alternativos que también aparecen en titulares (se comparan sin tildes)
+ALIAS_DISTRITOS = {
+    "CERCADO": "CERCADO DE LIMA", "LIMA CERCADO": "CERCADO DE LIMA",
+    "S.J.L.": "SJL", "S.M.P.": "SMP", "V.E.S.": "VES", "S.J.M.": "SJM", "V.M.T.": "VMT",
+    "MAGDALENA DEL MAR": "MAGDALENA", "SAN JUAN DE LURIGANCHO (SJL)": "SJL",
+    "CHOSICA (LURIGANCHO)": "CHOSICA", "ATE VITARTE": "ATE", "VITARTE": "ATE",
+    "SAN MARTIN": "SAN MARTIN DE PORRES", "CALLAO CERCADO": "CALLAO"
+}
+
 # 4. LISTA DE DISTRITOS PARA BÚSQUEDA
-DISTRITOS_INTEGRADOS = [d.lower() for d in COORDENADAS_LIMA.keys()]
\ No newline at end of file
+DISTRITOS_INTEGRADOS = [d.lower() for d in COORDENADAS_LIMA.keys()]
+
+# 5. ESCANEO CONCURRENTE
+MAX_FUENTES_SIMULTANEAS = 7     # Periódicos escaneados a la vez (tope de hilos)
+PAUSA_ENTRE_PETICIONES = 1.0    # Segundos mínimos entre peticiones al mismo dominio
+
+# Conexiones HTTP (cliente_http.py): (segundos para conectar, segundos para leer)
+TIMEOUT_POR_DEFECTO = (5, 10)
+TIMEOUTS_POR_HOST = {
+    "elcomercio.pe": (5, 15),
+    "rpp.pe": (5, 15),
+    "nominatim.openstreetmap.org": (5, 10),
+}
+REINTENTOS_HTTP = 3             # Con espera exponencial y respetando Retry-After
+
+# Pruebas sin internet: con "http://127.0.0.1:8090" la URL https://rpp.pe/x se pide
+# como http://127.0.0.1:8090/rpp.pe/x (ver herramientas/servidor_paginas.py).
+# Solo se redirigen los dominios de FUENTES_DEFINIDAS, no Nominatim.
+SERVIDOR_LOCAL = os.environ.get("LIMA_SEGURA_SERVIDOR_LOCAL")
+
+# Parseo: construir solo los titulares (h2/h3/article) y no el árbol de toda la página
+PARSEO_DIRIGIDO = True
+
+# Ingesta en segundo plano (ingesta.py): cada cuánto se vuelve a escanear
+INTERVALO_INGESTA = 900         # Segundos, para fuentes sin intervalo propio
+INTERVALOS_POR_FUENTE = {
+    "RPP": 600,                 # "Últimas noticias" cambia más seguido
+    "Infobae": 600,
+}
+
+
+# 6. ARCHIVOS LOCALES (CACHÉS Y BASES DE DATOS)
+CARPETA_DATOS = os.environ.get(
+    "LIMA_SEGURA_DATOS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos"))
+RUTA_CACHE_GEO = os.path.join(CARPETA_DATOS, "cache_geocodificacion.sqlite")
+RUTA_CACHE_HTTP = os.path.join(CARPETA_DATOS, "cache_paginas.sqlite")
+RUTA_ALMACEN = os.path.join(CARPETA_DATOS, "noticias.sqlite")
+RUTA_CACHE_ARTICULOS = os.path.join(CARPETA_DATOS, "cache_articulos.sqlite")
+RUTA_CSV_HISTORICO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_unificado.csv")
+RUTA_SERVICIOS_EMERGENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "servicios_emergencia.csv")
+ZONA_LIMA = timezone(timedelta(hours=-5))   # Hora de Perú (sin horario de verano)
+
+# 7. GEOCODIFICACIÓN (NOMINATIM)
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+NOMINATIM_USER_AGENT = "SistemaAlertaDelitos_LP2_Final"
+NOMINATIM_PETICIONES_POR_SEGUNDO = 1.0   # Política de uso de Nominatim: máx. 1 req/s
+GEO_TTL_DIAS = 30                        # Vigencia de una coordenada encontrada
+GEO_TTL_NEGATIVO_HORAS = 24              # Vigencia de un "no encontrado"
+GEO_MAX_ENTRADAS = 5000                  # Tope de la caché (se borran las menos usadas)
+
+# 8. FUENTES DE NOTICIAS (LAS LEE motor_scraping.py)
+# Agregar un medio = agregar un diccionario aquí. Campos:
+#   nombre            Nombre único del medio (columna 'Fuente' en todo el proyecto)
+#   base              Dominio para completar enlaces relativos
+#   urls              Secciones que se visitan
+#   paginas           Páginas por sección (usa 'paginacion' desde la página 1)
+#   contenedor        Etiquetas que se parsean y recorren, una por titular
+#   titulo            Etiqueta del título dentro del contenedor (None = el texto del <a>)
+#   resumen           Etiqueta del resumen dentro del contenedor (opcional)
+#   ignorar_urls      Trozos de URL que descartan la noticia (secciones ajenas)
+#   ignorar_titulos   Palabras que descartan el titular (lista negra)
+#   categorias_por_url  Categoría por trozo de URL si el título no trae delito
+#   distrito_en_resumen  Buscar el distrito también en el resumen (el delito, solo en el título)
+#   leer_articulos    Buscar el distrito en el artículo si el titular no lo trae
+#                     (por defecto LEER_ARTICULOS, sección 10)
+FUENTES_DEFINIDAS = [
+    {
+        "nombre": "RPP",
+        "base": "https://rpp.pe",
+        "urls": ["https://rpp.pe/ultimas-noticias"],
+        "paginas": 3,                       # Más historial
+        "paginacion": "{url}?page={pagina}",
+        "contenedor": ["h2", "h3"],
+        "ignorar_urls": [
+            "/famosos/", "/entretenimiento/", "/deportes/", "/futbol/", "/voley/",
+            "/automovilismo/", "/tecnologia/", "/ciencia/", "/salud/", "/economia/",
+            "/mundo/", "/horoscopo/", "/vital/",
+            "/peru/piura/", "/peru/arequipa/", "/peru/cusco/", "/peru/norte/", "/peru/sur/"
+        ],
+        "categorias_por_url": {
+            "/policiales/": "Policiales/Judiciales",
+            "/judiciales/": "Policiales/Judiciales",
+        },
+    },
+    {
+        "nombre": "El Comercio",
+        "base": "https://elcomercio.pe",
+        "urls": [
+            "https://elcomercio.pe/noticias/delincuencia/",
+            "https://elcomercio.pe/noticias/sicariato/",
+            "https://elcomercio.pe/noticias/asaltos/",
+            "https://elcomercio.pe/noticias/homicidios/",
+            "https://elcomercio.pe/noticias/extorsion/",
+            "https://elcomercio.pe/noticias/robo/"
+        ],
+        "contenedor": ["h2", "h3"],
+        # Lista negra (filtro anti-relleno)
+        "ignorar_titulos": [
+            "gobierno", "estado de emergencia", "prórroga", "decreto", "oficial",
+            "guardia municipal", "serenos", "serenazgo", "funciones", "municipalidad",
+            "alcalde", "norma", "ley", "congreso", "cuentan cómo", "vivir a un paso",
+            "crónica", "historia de", "perfil", "tráfico", "vehicular", "congestion",
+            "desvío", "navidad", "año nuevo", "feriado", "celebración", "misa",
+            "senamhi", "clima", "verano", "playa", "calor", "incendio", "bomberos",
+            "sismo", "temblor"
+        ],
+    },
+    {
+        "nombre": "Canal N",
+        "base": "https://canaln.pe",
+        "urls": [
+            "https://canaln.pe/noticias/policiales",
+            "https://canaln.pe/noticias/policia",
+            "https://canaln.pe/noticias/inseguridad-ciudadana"
+        ],
+        "contenedor": ["h2", "h3"],
+    },
+    {
+        "nombre": "Diario Correo",
+        "base": "https://diariocorreo.pe",
+        "urls": ["https://diariocorreo.pe/peru/"],
+        "contenedor": ["h2"],
+    },
+    {
+        "nombre": "Infobae",
+        "base": "https://www.infobae.com",
+        "urls": ["https://www.infobae.com/peru/"],
+        "contenedor": ["article"],
+        "titulo": ["h2", "h3"],
+    },
+    {
+        "nombre": "La República",
+        "base": "https://larepublica.pe",
+        "urls": ["https://larepublica.pe/sociedad"],
+        "contenedor": ["h2", "h3"],
+    },
+    {
+        "nombre": "Perú21",
+        "base": "https://peru21.pe",
+        "urls": ["https://peru21.pe/actualidad/"],
+        "contenedor": ["article"],
+        "titulo": "h2",
+        "resumen": "p",
+        "distrito_en_resumen": True,
+        "cabeceras": {"User-Agent": "Mozilla/5.0"},
+    },
+]
+
+# Nombres antiguos de algunos medios -> nombre de FUENTES_DEFINIDAS
+ALIAS_FUENTES = {
+    "Infobae Perú": "Infobae",
+    "Perú 21": "Perú21",
+}
+LARGO_MINIMO_TITULAR = 15
+
+# 9. DEDUPLICACIÓN (ENLACES Y TITULARES CASI IGUALES ENTRE MEDIOS)
+# Parámetros de URL que no cambian la noticia (campañas, redes, AMP)
+PARAMETROS_SEGUIMIENTO = [
+    "utm_", "fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src",
+    "cmpid", "ito", "outputtype", "output", "amp", "ns_source", "ns_campaign", "s_cid"
+]
+MINHASH_PERMUTACIONES = 64       # Largo de la firma de cada titular
+MINHASH_BANDAS = 32              # Bandas LSH (2 valores por banda)
+UMBRAL_DUPLICADO = 0.5           # Jaccard de palabras para "misma noticia"
+VENTANA_DUPLICADOS_DIAS = 3      # Solo se compara con noticias de estos últimos días
+
+# 10. CUERPO DE LA NOTICIA (TITULARES DE DELITO SIN DISTRITO)
+# Opcional: si el titular trae un delito pero no un distrito, se lee el inicio
+# del artículo (articulos.py). Cada artículo se descarga y parsea una sola vez.
+LEER_ARTICULOS = os.environ.get("LIMA_SEGURA_LEER_ARTICULOS") == "1"
+MAX_ARTICULOS_SIMULTANEOS = 4    # Descargas de artículos a la vez (todas las fuentes)
+MAX_ARTICULOS_POR_PAGINA = 15    # Tope de artículos pedidos por cada sección
+PARRAFOS_ENTRADILLA = 3          # Párrafos del inicio donde se busca el distrito
+ARTICULOS_TTL_NEGATIVO_HORAS = 24   # No reintentar antes un artículo que falló
+
+# 11. CACHÉS EN MEMORIA DEL DASHBOARD (cache_memoria.py)
+# Cada espacio se invalida por separado: un escaneo sin noticias nuevas solo
+# vacía "escaneos", y ninguno vacía "geocodigos".
+LIMITES_CACHE = {
+    "escaneos": {"max_entradas": 8, "max_mb": 5, "descripcion": "Estado de las fuentes y totales"},
+    "geocodigos": {"max_entradas": 256, "max_mb": 20, "descripcion": "Coordenadas por lista de distritos"},
+    "agregados": {"max_entradas": 32, "max_mb": 200, "descripcion": "Tabla compacta y cortes del cubo"},
+    "graficos": {"max_entradas": 64, "max_mb": 30, "descripcion": "Figuras de plotly del análisis"},
+}
+
+# 12. ESCANEO COMPARTIDO (escaneo_compartido.py)
+# Un solo escaneo a la vez en todo el servidor: las sesiones que piden otro
+# esperan al que está en curso, y uno recién terminado se reutiliza.
+ESCANEO_VIGENCIA_SEGUNDOS = 120    # Un escaneo más nuevo que esto no se repite
+ESCANEO_TURNO_SEGUNDOS = 900       # Vence el turno de un proceso que murió escaneando
+
+# 13. VENTANAS DE FECHAS (FILTROS DEL MAPA Y DEL ANÁLISIS)
+# Días contados hasta hoy (hora de Lima) sobre el día de publicación de cada
+# noticia; None = todo el archivo. "Rango personalizado" se agrega aparte.
+VENTANAS_FECHA = {
+    "Todo el archivo": None,
+    "Hoy": 1,
+    "Últimos 7 días": 7,
+    "Últimos 30 días": 30,
+}
+
+# 14. CERCA DE MÍ (indice_espacial.py)
+# servicios_emergencia.csv trae comisarías, compañías de bomberos y hospitales
+# con ubicación aproximada (referencial): en una emergencia, llamar primero.
+CELDA_INDICE_GRADOS = 0.01        # Lado de la celda de la rejilla (~1.1 km en Lima)
+RADIO_CERCA_KM = 2.0              # Radio por defecto de "¿qué pasó cerca?"
+SERVICIOS_CERCANOS = 3            # Servicios más cercanos por tipo
+TELEFONOS_EMERGENCIA = {"Comisaría": "105", "Bomberos": "116", "Hospital": "106"}
+
+# 15. API HTTP DE DATOS (api_datos.py)
+# Respuestas JSON ya serializadas (y comprimidas) por versión de datos: una
+# petición repetida no vuelve a consultar SQLite ni a serializar.
+API_HOST = "127.0.0.1"            # "0.0.0.0" para que la vean otros equipos
+API_PUERTO = 8502
+API_POR_PAGINA = 100              # Incidentes por página si no se pide otro tamaño
+API_MAX_POR_PAGINA = 500
+API_VERSION_SEGUNDOS = 1.0        # Cada cuánto se mira si hay datos nuevos
+API_GZIP_MINIMO_BYTES = 1024      # Respuestas más cortas van sin comprimir
+API_CACHE = {"max_entradas": 1024, "max_mb": 64}   # Respuestas serializadas (LRU)
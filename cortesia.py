@@ -0,0 +1,78 @@
+# cortesia.py
+import threading
+import time
+from urllib.parse import urlparse
+
+try:
+    from config import PAUSA_ENTRE_PETICIONES
+except ImportError:
+    PAUSA_ENTRE_PETICIONES = 1.0
+
+# ==============================================================================
+# LÍMITE DE CORTESÍA POR DOMINIO
+# ==============================================================================
+
+
+class LimitadorPorHost:
+    """
+    Reparte 'turnos' por dominio: dos peticiones al mismo host quedan separadas
+    al menos `intervalo` segundos, aunque vengan de hilos distintos.
+    Dominios diferentes no se esperan entre sí.
+    """
+
+    def __init__(self, intervalo=PAUSA_ENTRE_PETICIONES):
+        self.intervalo = intervalo
+        self._candado = threading.Lock()
+        self._proximo_turno = {}
+
+    def esperar_turno(self, url):
+        host = urlparse(url).netloc or url
+        with self._candado:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proximo_turno.get(host, 0.0))
+            self._proximo_turno[host] = turno + self.intervalo
+
+        espera = turno - ahora
+        if espera > 0:
+            time.sleep(espera)
+
+
+# Limitador compartido por todos los scrapers del proceso
+LIMITADOR = LimitadorPorHost()
+
+
+def esperar_turno(url):
+    LIMITADOR.esperar_turno(url)
+
+# ==============================================================================
+# CUBETA DE TOKENS (LÍMITE DE PETICIONES POR SEGUNDO A UNA API)
+# ==============================================================================
+
+
+class CubetaTokens:
+    """
+    Permite `tasa` peticiones por segundo con ráfagas de hasta `capacidad`.
+    `tomar()` bloquea al hilo que llama hasta que haya un token disponible.
+    """
+
+    def __init__(self, tasa, capacidad=1):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = capacidad
+        self._ultimo = time.monotonic()
+        self._candado = threading.Lock()
+
+    def tomar(self):
+        while True:
+            with self._candado:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad,
+                                   self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.tasa
+
+            time.sleep(espera)
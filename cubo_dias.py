@@ -0,0 +1,81 @@
+# cubo_dias.py
+import bisect
+import threading
+
+import pandas as pd
+
+from fechas import SIN_FECHA, acotar_ventana
+
+COLUMNAS_CUBO = ["Distrito", "Secciones", "Fuente", "Día", "Casos"]
+
+# ==============================================================================
+# CUBO EN MEMORIA PARTIDO POR DÍA (SE ACTUALIZA SOLO LO QUE CAMBIÓ)
+# ==============================================================================
+
+
+class CuboPorDia:
+    """
+    Las celdas del cubo del almacén agrupadas por día, en memoria y
+    compartidas por todas las sesiones. Tras un escaneo solo se vuelven a
+    leer los días que recibieron incidentes nuevos (id > último visto); una
+    reclasificación (cambia la 'revision') obliga a releer todo.
+
+    `ventana(desde, hasta)` junta solo las particiones de esos días: "hoy" o
+    "últimos 7 días" no recorren el resto del archivo.
+    """
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+        self._candado = threading.Lock()
+        self._particiones = {}   # 'AAAA-MM-DD' -> DataFrame con COLUMNAS_CUBO
+        self._dias = []          # Claves ordenadas, para cortar rangos con bisect
+        self.version = None
+        self.recargas = 0
+        self.dias_releidos = 0
+
+    def actualizar(self):
+        """Pone al día las particiones y devuelve la versión de datos vigente."""
+        version = self.almacen.version_datos()
+        with self._candado:
+            if version == self.version:
+                return version
+            ultimo_id, revision = version
+            if self.version is None or revision != self.version[1] or ultimo_id < self.version[0]:
+                self._cargar(self.almacen.cubo(), todo=True)
+                self.recargas += 1
+            else:
+                dias = self.almacen.dias_desde(self.version[0])
+                self._cargar(self.almacen.cubo(dias=dias), dias=dias)
+                self.dias_releidos += len(dias)
+            self.version = version
+            return version
+
+    def _cargar(self, celdas, dias=(), todo=False):
+        nuevas = dict(tuple(celdas.groupby("Día", sort=False))) if not celdas.empty else {}
+        if todo:
+            self._particiones = {}
+        for dia in dias:
+            self._particiones.pop(dia, None)
+        for dia, parte in nuevas.items():
+            self._particiones[dia] = parte.reset_index(drop=True)
+        self._dias = sorted(self._particiones)
+
+    def ventana(self, desde=None, hasta=None):
+        """
+        Celdas de los días en [desde, hasta) ('AAAA-MM-DD'; None = sin límite).
+        La partición SIN_FECHA solo entra sin ningún límite.
+        """
+        desde, hasta = acotar_ventana(desde, hasta)
+        with self._candado:
+            inicio = 0 if desde is None else bisect.bisect_left(self._dias, desde)
+            fin = len(self._dias) if hasta is None else bisect.bisect_left(self._dias, hasta)
+            partes = [self._particiones[dia] for dia in self._dias[inicio:fin]]
+        if not partes:
+            return pd.DataFrame(columns=COLUMNAS_CUBO)
+        return pd.concat(partes, ignore_index=True)
+
+    def rango(self):
+        """(primer día, último día) con incidentes fechados, o (None, None)."""
+        with self._candado:
+            dias = [dia for dia in self._dias if dia != SIN_FECHA]
+        return (dias[0], dias[-1]) if dias else (None, None)
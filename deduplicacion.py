@@ -0,0 +1,99 @@
+# deduplicacion.py
+import hashlib
+import random
+import re
+import unicodedata
+from array import array
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import MINHASH_BANDAS, MINHASH_PERMUTACIONES, PARAMETROS_SEGUIMIENTO
+
+# ==============================================================================
+# 1. ENLACE CANÓNICO (CLAVE ÚNICA DE CADA NOTICIA)
+# ==============================================================================
+
+
+def _es_seguimiento(parametro):
+    parametro = parametro.lower()
+    return any(parametro == p or (p.endswith("_") and parametro.startswith(p))
+               for p in PARAMETROS_SEGUIMIENTO)
+
+
+def enlace_canonico(url):
+    """
+    Misma noticia -> mismo texto:
+    'http://www.RPP.pe/amp/a/b/?utm_source=fb#x' -> 'https://rpp.pe/a/b'
+
+    Quita parámetros de seguimiento, variantes AMP (subdominio amp., segmento
+    /amp y ?outputType=amp), 'www.', la barra final y el fragmento.
+    """
+    partes = urlsplit(url.strip())
+    host = partes.netloc.lower()
+    for prefijo in ("www.", "amp."):
+        if host.startswith(prefijo):
+            host = host[len(prefijo):]
+
+    segmentos = [s for s in partes.path.split("/") if s and s.lower() != "amp"]
+    ruta = "/" + "/".join(segmentos)
+
+    consulta = sorted((k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+                      if not _es_seguimiento(k))
+    return urlunsplit(("https", host, ruta, urlencode(consulta), ""))
+
+# ==============================================================================
+# 2. FIRMA MINHASH DEL TITULAR + BANDAS LSH
+# ==============================================================================
+# Dos medios casi nunca titulan igual, pero comparten la mayoría de palabras
+# con contenido ("mototaxista", "asesinado", "lurigancho"...). La firma
+# MinHash resume esas palabras y las bandas LSH encuentran candidatos con una
+# búsqueda indexada por banda, en lugar de comparar contra todo el archivo.
+# Cada candidato se confirma con la similitud de Jaccard exacta.
+
+PALABRAS_VACIAS = {
+    "del", "las", "los", "una", "uno", "por", "con", "para", "que", "sus", "tras",
+    "fue", "son", "esta", "este", "como", "mas", "pero", "sin", "sobre", "entre",
+    "desde", "hasta", "ante", "segun", "cuando", "donde", "video", "fotos", "ultimo",
+}
+_PRIMO = (1 << 61) - 1
+_azar = random.Random(20240601)   # Semilla fija: las firmas guardadas siguen valiendo
+_PERMUTACIONES = [(_azar.randrange(1, _PRIMO), _azar.randrange(0, _PRIMO))
+                  for _ in range(MINHASH_PERMUTACIONES)]
+FILAS_POR_BANDA = MINHASH_PERMUTACIONES // MINHASH_BANDAS
+
+
+def palabras_titular(titulo):
+    """Conjunto de palabras con contenido, sin tildes ni mayúsculas."""
+    texto = unicodedata.normalize("NFKD", titulo.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return {p for p in re.findall(r"[a-z0-9ñ]+", texto)
+            if len(p) >= 3 and p not in PALABRAS_VACIAS}
+
+
+def _hash64(texto):
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def firma_minhash(palabras, minimo_palabras=3):
+    """array('Q') con MINHASH_PERMUTACIONES mínimos, o None si hay muy pocas palabras."""
+    if len(palabras) < minimo_palabras:
+        return None
+    valores = [_hash64(p) for p in palabras]
+    return array("Q", (min((a * x + b) % _PRIMO for x in valores) for a, b in _PERMUTACIONES))
+
+
+def bandas_lsh(firma):
+    """[(banda, valor)]: dos titulares similares coinciden en alguna banda."""
+    bandas = []
+    for banda in range(MINHASH_BANDAS):
+        trozo = firma[banda * FILAS_POR_BANDA:(banda + 1) * FILAS_POR_BANDA]
+        valor = int.from_bytes(hashlib.blake2b(trozo.tobytes(), digest_size=8).digest(),
+                               "big", signed=True)   # Cabe en un INTEGER de SQLite
+        bandas.append((banda, valor))
+    return bandas
+
+
+def jaccard(palabras_a, palabras_b):
+    """Similitud exacta con la que se confirma a un candidato de las bandas."""
+    if not palabras_a or not palabras_b:
+        return 0.0
+    return len(palabras_a & palabras_b) / len(palabras_a | palabras_b)
@@ -0,0 +1,168 @@
+# escaneo.py
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from config import ALIAS_FUENTES, MAX_FUENTES_SIMULTANEAS
+from instrumentacion import medir_fuente, registrar_error
+
+# ==============================================================================
+# 1. FUENTES DE NOTICIAS
+# ==============================================================================
+# Cada medio es una definición en config.py (FUENTES_DEFINIDAS) que corre el
+# motor genérico; los módulos de webscraping/ solo envuelven a ese motor.
+try:
+    from motor_scraping import MOTORES
+    MODULES_AVAILABLE = True
+
+    # (nombre, scraper) en el orden de config.py
+    FUENTES = list(MOTORES.items())
+except ImportError as e:
+    MODULES_AVAILABLE = False
+    FUENTES = []
+    print(f"Error importando módulos: {e}")
+
+# ==============================================================================
+# 2. CONTRATO DE STREAMING Y ADAPTADORES
+# ==============================================================================
+# Un scraper entrega noticias normalizadas (Titular, Enlace, Fuente, Distrito,
+# Categoría) una por una con `iterar_noticias()`. Los contratos antiguos se
+# adaptan: `obtener_noticias()` / `scrape()` (lista o DataFrame) y funciones
+# `scraping_*()` que devuelven columnas propias como titulo/link (Perú21).
+
+# Columnas de los contratos antiguos -> columnas normalizadas
+COLUMNAS_ANTIGUAS = {
+    "titulo": "Titular",
+    "Titulo": "Titular",
+    "link": "Enlace",
+    "Link": "Enlace",
+    "periodico": "Fuente",
+    "distrito": "Distrito",
+    "categoria": "Categoría",
+    "resumen": "Resumen",
+}
+
+
+def normalizar_noticia(noticia, nombre_web):
+    """Renombra columnas antiguas y completa 'Fuente' y 'Categoría'."""
+    registro = {COLUMNAS_ANTIGUAS.get(k, k): v for k, v in noticia.items()}
+    registro["Fuente"] = ALIAS_FUENTES.get(registro.get("Fuente"), registro.get("Fuente")) or nombre_web
+    # Si no tiene categoría, le ponemos una por defecto
+    if not registro.get("Categoría"):
+        registro["Categoría"] = "Delito Detectado"
+    return registro
+
+
+def _a_registros(datos):
+    if datos is None:
+        return []
+    if isinstance(datos, pd.DataFrame):
+        return datos.astype(object).where(datos.notna(), None).to_dict('records')
+    return datos
+
+
+def _noticias_crudas(nombre_web, modulo):
+    """Generador con lo que entregue el scraper, según el contrato que tenga."""
+    if hasattr(modulo, 'iterar_noticias'):
+        yield from modulo.iterar_noticias()
+        return
+
+    for nombre_funcion in ('obtener_noticias', 'scrape'):
+        if hasattr(modulo, nombre_funcion):
+            yield from _a_registros(getattr(modulo, nombre_funcion)())
+            return
+
+    antiguas = [n for n in dir(modulo) if n.startswith('scraping_')]
+    if antiguas:
+        yield from _a_registros(getattr(modulo, antiguas[0])())
+        return
+
+    raise TypeError(f"{nombre_web}: el scraper no tiene iterar_noticias, "
+                    "obtener_noticias, scrape ni scraping_*")
+
+
+def iterar_fuente(nombre_web, modulo):
+    """Noticias normalizadas de una fuente, a medida que el scraper las encuentra."""
+    # (El scraper ya se encargó de filtrar, confiamos en él)
+    with medir_fuente(nombre_web):
+        try:
+            for noticia in _noticias_crudas(nombre_web, modulo):
+                yield normalizar_noticia(noticia, nombre_web)
+        except Exception as e:
+            registrar_error(nombre_web, e)
+            raise
+
+
+def ejecutar_fuente(nombre_web, modulo):
+    """Corre un scraper completo y devuelve la lista de sus noticias."""
+    return list(iterar_fuente(nombre_web, modulo))
+
+# ==============================================================================
+# 3. ESCANEO CONCURRENTE DE TODAS LAS FUENTES
+# ==============================================================================
+
+
+def escanear_en_vivo(fuentes=None, max_simultaneas=MAX_FUENTES_SIMULTANEAS):
+    """
+    Lanza todas las fuentes a la vez (como máximo `max_simultaneas` hilos) y
+    entrega eventos `(nombre_web, noticia)` en el orden en que llegan. Cuando
+    una fuente termina se entrega `(nombre_web, None)`. La primera noticia
+    llega en lo que tarda la fuente más rápida, no la más lenta.
+
+    Cada dominio sigue respetando su pausa de cortesía (ver cortesia.py).
+    """
+    fuentes = FUENTES if fuentes is None else fuentes
+    if not fuentes:
+        return
+
+    cola = queue.Queue()
+
+    def trabajar(nombre_web, modulo):
+        try:
+            for noticia in iterar_fuente(nombre_web, modulo):
+                cola.put((nombre_web, noticia))
+        except Exception as e:
+            # Si falla un periódico, seguimos con los otros sin detener todo
+            print(f"Error leyendo {nombre_web}: {e}")
+        finally:
+            cola.put((nombre_web, None))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_simultaneas, len(fuentes)))) as ejecutor:
+        for nombre_web, modulo in fuentes:
+            ejecutor.submit(trabajar, nombre_web, modulo)
+
+        pendientes = len(fuentes)
+        while pendientes:
+            nombre_web, noticia = cola.get()
+            if noticia is None:
+                pendientes -= 1
+            yield nombre_web, noticia
+
+
+def escanear_fuentes(fuentes=None, max_simultaneas=MAX_FUENTES_SIMULTANEAS,
+                     al_terminar_fuente=None):
+    """
+    Versión por lotes de `escanear_en_vivo`: devuelve todas las noticias en el
+    orden de la lista de fuentes.
+
+    `al_terminar_fuente(nombre, noticias, terminadas, total)` se llama desde el
+    hilo que invoca esta función cada vez que una fuente acaba.
+    """
+    fuentes = FUENTES if fuentes is None else fuentes
+    resultados = {nombre_web: [] for nombre_web, _ in fuentes}
+    terminadas = 0
+
+    for nombre_web, noticia in escanear_en_vivo(fuentes, max_simultaneas):
+        if noticia is not None:
+            resultados[nombre_web].append(noticia)
+            continue
+        terminadas += 1
+        if al_terminar_fuente:
+            al_terminar_fuente(nombre_web, resultados[nombre_web], terminadas, len(fuentes))
+
+    # Mantenemos el orden de la lista de fuentes, no el de llegada
+    todas_las_noticias = []
+    for nombre_web, _ in fuentes:
+        todas_las_noticias.extend(resultados[nombre_web])
+    return todas_las_noticias
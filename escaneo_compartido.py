@@ -0,0 +1,170 @@
+# escaneo_compartido.py
+import os
+import socket
+import threading
+import time
+
+from clasificador import mascara_secciones
+from config import ESCANEO_TURNO_SEGUNDOS, ESCANEO_VIGENCIA_SEGUNDOS
+from ingesta import TURNO, ejecutar_ronda
+from tabla_compacta import etiquetas_secciones
+
+ESPERA_TURNO_SEGUNDOS = 2    # Cada cuánto se vuelve a mirar un turno ajeno
+
+# ==============================================================================
+# 1. UN ESCANEO (EL MISMO OBJETO PARA TODAS LAS SESIONES QUE LO PIDIERON)
+# ==============================================================================
+
+
+class EscaneoEnCurso:
+    """
+    Estado de un escaneo que llenan los hilos de fondo y solo leen las
+    sesiones. `origen`: 'propio' (lo corre este proceso), 'otro_proceso'
+    (se espera el turno de ingesta.py u otro servidor; pasa a 'propio' si
+    ese no completó la ronda) o 'reciente' (no se escanea: hay uno de hace
+    menos de ESCANEO_VIGENCIA_SEGUNDOS).
+    """
+
+    def __init__(self, version, origen, total):
+        self.version = version
+        self.origen = origen
+        self.total = total
+        self.inicio = time.time()
+        self.fin = None
+        self.llegadas = []       # Filas para la tabla en vivo, en orden de llegada
+        self.terminadas = []     # "Fuente (n)" por fuente terminada
+        self.nuevas = None       # {fuente: nuevas}; None si escaneó otro proceso
+        self.error = None
+        self._terminado = threading.Event()
+
+    @property
+    def en_curso(self):
+        return not self._terminado.is_set()
+
+    def vigente(self):
+        # Uno que terminó con error no se reutiliza: la próxima solicitud reintenta
+        return (self.fin is not None and self.error is None
+                and time.time() - self.fin < ESCANEO_VIGENCIA_SEGUNDOS)
+
+    def terminar(self):
+        self.fin = time.time()
+        self._terminado.set()
+
+    def esperar(self, segundos):
+        """True si terminó antes de `segundos`."""
+        return self._terminado.wait(segundos)
+
+    def total_nuevas(self):
+        return None if self.nuevas is None else sum(self.nuevas.values())
+
+# ==============================================================================
+# 2. COORDINADOR (UNO POR PROCESO, SINGLE-FLIGHT)
+# ==============================================================================
+
+
+class CoordinadorEscaneos:
+    """
+    Todas las sesiones piden el escaneo aquí: si hay uno en curso o uno
+    reciente reciben ese mismo objeto, y si no se arranca uno en un hilo de
+    fondo. Entre procesos manda el turno guardado en el almacén, así que el
+    dashboard tampoco escanea a la vez que ingesta.py.
+
+    `al_terminar(escaneo)` corre en el hilo de fondo al acabar (p. ej. para
+    invalidar cachés), una sola vez por escaneo y no una por sesión.
+    """
+
+    def __init__(self, almacen, fuentes, al_terminar=None):
+        self.almacen = almacen
+        self.fuentes = fuentes
+        self.al_terminar = al_terminar
+        self.dueno = f"{socket.gethostname()}:{os.getpid()}"
+        self._candado = threading.Lock()
+        self._actual = None
+        self._version = 0
+
+    def actual(self):
+        """El último escaneo de este proceso (o None)."""
+        return self._actual
+
+    def solicitar(self):
+        with self._candado:
+            actual = self._actual
+            if actual is not None and (actual.en_curso or actual.vigente()):
+                return actual
+
+            self._version += 1
+            if self.almacen.segundos_desde(TURNO) < ESCANEO_VIGENCIA_SEGUNDOS:
+                escaneo = EscaneoEnCurso(self._version, "reciente", len(self.fuentes))
+                escaneo.terminar()
+            else:
+                escaneo = EscaneoEnCurso(self._version, "propio", len(self.fuentes))
+                threading.Thread(target=self._correr, args=(escaneo,), daemon=True,
+                                 name=f"escaneo-{self._version}").start()
+            self._actual = escaneo
+            return escaneo
+
+    def _correr(self, escaneo):
+        # Todo el cuerpo, turno incluido, va en el try: si el almacén falla
+        # (p. ej. "database is locked") el escaneo igual se cierra con su
+        # error y la próxima solicitud arranca uno nuevo
+        nuevas, error = None, None
+        turno_tomado = completo = False
+        try:
+            while not self.almacen.tomar_turno(TURNO, self.dueno, ESCANEO_TURNO_SEGUNDOS):
+                escaneo.origen = "otro_proceso"
+                time.sleep(ESPERA_TURNO_SEGUNDOS)
+            turno_tomado = True
+
+            if escaneo.origen == "otro_proceso":
+                # El turno se soltó (o venció). Si el otro proceso terminó una
+                # ronda completa mientras se esperaba, esa ya está en el almacén;
+                # si solo escaneó algunas fuentes, falló o murió, se escanea aquí
+                # con el turno ya tomado para no servir un almacén a medias
+                if self.almacen.segundos_desde(TURNO) <= time.time() - escaneo.inicio:
+                    return
+                escaneo.origen = "propio"
+
+            nuevas = ejecutar_ronda(self.almacen, self.fuentes,
+                                    al_terminar_fuente=self._fuente_terminada(escaneo),
+                                    al_recibir_noticia=self._noticia_recibida(escaneo))
+            completo = True
+        except Exception as e:
+            error = str(e)
+            print(f"❌ Escaneo {escaneo.version} interrumpido: {e}")
+        finally:
+            if turno_tomado:
+                try:
+                    self.almacen.liberar_turno(TURNO, self.dueno, completo=completo)
+                except Exception as e:
+                    error = error or str(e)
+                    print(f"⚠️ No se pudo soltar el turno del escaneo {escaneo.version}: {e}")
+            self._cerrar(escaneo, nuevas, error)
+
+    def _cerrar(self, escaneo, nuevas=None, error=None):
+        # Las cachés se invalidan antes de avisar a las sesiones que esperan
+        escaneo.nuevas, escaneo.error = nuevas, error
+        if self.al_terminar:
+            try:
+                self.al_terminar(escaneo)
+            except Exception as e:
+                print(f"⚠️ al_terminar del escaneo {escaneo.version}: {e}")
+        escaneo.terminar()
+
+    # Los callbacks solo agregan al estado compartido; cada sesión lo dibuja
+    @staticmethod
+    def _noticia_recibida(escaneo):
+        def al_recibir_noticia(nombre_web, noticia, es_nueva):
+            secciones = noticia.get("Secciones")
+            if secciones is None:
+                secciones = mascara_secciones(noticia["Titular"], categoria=noticia["Categoría"])
+            escaneo.llegadas.append({"Fuente": nombre_web, "Distrito": noticia.get("Distrito"),
+                                     "Secciones": etiquetas_secciones([secciones])[0],
+                                     "Titular": noticia["Titular"],
+                                     "Nueva": "🆕" if es_nueva else ""})
+        return al_recibir_noticia
+
+    @staticmethod
+    def _fuente_terminada(escaneo):
+        def al_terminar_fuente(nombre_web, noticias, terminadas, total):
+            escaneo.terminadas.append(f"{nombre_web} ({len(noticias)})")
+        return al_terminar_fuente
@@ -0,0 +1,106 @@
+# fechas.py
+import re
+from datetime import date, datetime, timedelta
+
+from config import ZONA_LIMA
+
+# Etiquetas que se parsean junto a los titulares para fechar cada noticia
+ETIQUETAS_FECHA = ["time", "meta"]
+
+# <meta itemprop="..."> / <meta property="..."> con la fecha de publicación
+META_PUBLICACION = {"datepublished", "article:published_time", "datecreated", "pubdate"}
+
+# /2026/10/14/ (Infobae, La República) o /2026-10-14/
+PATRON_FECHA_URL = re.compile(r"/(20\d{2})[/-](\d{2})[/-](\d{2})(?=[/-])")
+
+MARGEN_FUTURO = timedelta(days=1)   # Más adelante que esto = fecha mal leída
+
+# Partición de las filas importadas sin fecha (ni en la fuente ni en la URL):
+# el día de la importación no dice nada de cuándo pasó, así que no entran en
+# ninguna ventana, solo en "todo el archivo"
+SIN_FECHA = ""
+PRIMER_DIA = "0000-01-01"   # Límite inferior de una ventana abierta: deja fuera SIN_FECHA
+
+# ==============================================================================
+# 1. NORMALIZACIÓN
+# ==============================================================================
+
+
+def normalizar_fecha(texto):
+    """
+    ISO 8601 en hora de Lima ('2026-10-14T08:45:00-05:00'), o solo el día
+    ('2026-10-14') si el texto no trae hora. None si no se puede leer o
+    cae en el futuro. Sin zona horaria se asume la de Lima.
+    """
+    if not texto:
+        return None
+    texto = texto.strip()
+    try:
+        if len(texto) == 10:
+            dia = date.fromisoformat(texto)
+            return dia.isoformat() if dia <= hoy_lima() + MARGEN_FUTURO else None
+        momento = datetime.fromisoformat(texto.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=ZONA_LIMA)
+    momento = momento.astimezone(ZONA_LIMA)
+    if momento > datetime.now(ZONA_LIMA) + MARGEN_FUTURO:
+        return None
+    return momento.isoformat(timespec="seconds")
+
+
+def fecha_de_etiqueta(nodo):
+    """Fecha de un <time datetime> o de un <meta> de publicación, sin normalizar."""
+    if nodo.name == "time":
+        return nodo.get("datetime")
+    if nodo.name == "meta":
+        propiedad = (nodo.get("itemprop") or nodo.get("property") or nodo.get("name") or "").lower()
+        if propiedad in META_PUBLICACION:
+            return nodo.get("content")
+    return None
+
+
+def fecha_en_url(enlace):
+    """'AAAA-MM-DD' si el enlace trae la fecha en la ruta."""
+    encontrada = PATRON_FECHA_URL.search(enlace or "")
+    if not encontrada:
+        return None
+    return normalizar_fecha("-".join(encontrada.groups()))
+
+# ==============================================================================
+# 2. DÍAS Y VENTANAS
+# ==============================================================================
+
+
+def hoy_lima():
+    return datetime.now(ZONA_LIMA).date()
+
+
+def dia_de(publicado, fecha_scrapeo=None):
+    """
+    Partición de un incidente: el día de publicación o, si no se conoce, el
+    del escaneo. Sin ninguno de los dos (filas importadas), SIN_FECHA.
+    """
+    return (publicado or fecha_scrapeo or SIN_FECHA)[:10]
+
+
+def ventana_dias(dias, hoy=None):
+    """
+    (desde, hasta) en días 'AAAA-MM-DD', `hasta` exclusivo, para los últimos
+    `dias` días contando hoy. `dias` None = todo el archivo (None, None).
+    """
+    if dias is None:
+        return None, None
+    hoy = hoy or hoy_lima()
+    return (hoy - timedelta(days=dias - 1)).isoformat(), (hoy + timedelta(days=1)).isoformat()
+
+
+def acotar_ventana(desde, hasta):
+    """
+    (desde, hasta) para comparar con la partición `dia`: con algún límite,
+    las filas SIN_FECHA quedan fuera aunque solo se haya dado `hasta`.
+    """
+    if desde is None and hasta is not None:
+        return PRIMER_DIA, hasta
+    return desde, hasta
@@ -1,23 +1,14 @@
-import pandas as pd
-import requests
-import time
+from geocodificador import obtener_coordenadas, resolver_lote
 
-def obtener_coordenadas(ubicacion):
-    
-    # Consultamos a Nominatim especificando Lima, Perú para mayor precisión
-    url = f"https://nominatim.openstreetmap.org/search?q={ubicacion},+Lima,+Peru&format=json&limit=1"
-    headers = {'User-Agent': 'SistemaAlertaDelitos_LP2_Pamela'}
-    
-    try:
-        response = requests.get(url, headers=headers).json()
-        if response:
-            return response[0]['lat'], response[0]['lon']
-    except Exception as e:
-        print(f"Error en {ubicacion}: {e}")
-    return None, None
+# La consulta pasa por la caché en disco (datos/cache_geocodificacion.sqlite)
+# y por el límite de 1 petición por segundo de Nominatim.
 
 print("Iniciando procesamiento de coordenadas...")
 
 # Ejemplo de prueba con un distrito encontrado en tus noticias
 lat, lon = obtener_coordenadas("Lince")
-print(f"Lince ubicado en: {lat}, {lon}")
\ No newline at end of file
+print(f"Lince ubicado en: {lat}, {lon}")
+
+# Varios distritos a la vez: los repetidos se consultan una sola vez
+for ubicacion, (lat, lon) in resolver_lote(["Lince", "Comas", "lince", "Breña"]).items():
+    print(f"{ubicacion} ubicado en: {lat}, {lon}")
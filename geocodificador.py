@@ -0,0 +1,238 @@
+# geocodificador.py
+import threading
+import time
+
+import pandas as pd
+
+from config import (
+    ALIAS_DISTRITOS, COORDENADAS_LIMA, GEO_MAX_ENTRADAS, GEO_TTL_DIAS,
+    GEO_TTL_NEGATIVO_HORAS, NOMINATIM_PETICIONES_POR_SEGUNDO, NOMINATIM_URL,
+    NOMINATIM_USER_AGENT, RUTA_CACHE_GEO
+)
+from bd_local import BaseSQLite
+from cliente_http import obtener
+from cortesia import CubetaTokens
+
+SIN_DISTRITO = "⚠️ No Especificado"
+
+# ==============================================================================
+# 1. TABLA LOCAL DE COORDENADAS (COORDENADAS_LIMA + ALIAS)
+# ==============================================================================
+
+
+def normalizar_distritos(serie):
+    """'Jesús María ' -> 'JESUS MARIA' (vectorizado sobre toda la serie)."""
+    return (
+        serie.astype("string")
+        .str.normalize("NFKD")
+        .str.encode("ascii", errors="ignore")
+        .str.decode("ascii")
+        .str.upper()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _construir_tabla():
+    nombres = list(COORDENADAS_LIMA) + list(ALIAS_DISTRITOS)
+    coords = list(COORDENADAS_LIMA.values()) + \
+        [COORDENADAS_LIMA[destino] for destino in ALIAS_DISTRITOS.values()]
+
+    tabla = pd.DataFrame(coords, columns=["lat", "lon"])
+    tabla["clave"] = normalizar_distritos(pd.Series(nombres))
+    return tabla.drop_duplicates("clave").set_index("clave")
+
+
+TABLA_COORDENADAS = _construir_tabla()
+
+# ==============================================================================
+# 2. GEOCODIFICACIÓN VECTORIZADA (SIN RED)
+# ==============================================================================
+
+
+def geocodificar_distritos(distritos, respaldo=None):
+    """
+    Devuelve un DataFrame con columnas 'lat' y 'lon' alineado al índice de
+    `distritos`, resuelto con un solo join contra TABLA_COORDENADAS.
+
+    `respaldo(nombres) -> {nombre: (lat, lon)}` (por ejemplo `resolver_lote`)
+    recibe de una sola vez los nombres distintos que no están en la tabla;
+    sin respaldo esas filas quedan en NaN y la función nunca toca la red.
+    """
+    # Solo se normalizan los valores distintos (unas decenas), no cada fila
+    unicos = pd.Series(distritos.dropna().unique())
+    claves = distritos.map(dict(zip(unicos, normalizar_distritos(unicos))))
+    resultado = claves.rename("clave").to_frame().join(
+        TABLA_COORDENADAS, on="clave")[["lat", "lon"]]
+
+    if respaldo is None:
+        return resultado
+
+    pendientes = distritos[resultado["lat"].isna() & distritos.notna() &
+                           (distritos != SIN_DISTRITO)]
+    if pendientes.empty:
+        return resultado
+
+    resueltos = respaldo(list(pendientes.unique()))
+    faltantes = pendientes.map(lambda nombre: resueltos.get(nombre, (None, None)))
+    resultado.loc[faltantes.index, "lat"] = faltantes.str[0].astype(float)
+    resultado.loc[faltantes.index, "lon"] = faltantes.str[1].astype(float)
+
+    return resultado
+
+# ==============================================================================
+# 3. CACHÉ PERSISTENTE EN DISCO (SQLITE, COMPARTIDA ENTRE PROCESOS)
+# ==============================================================================
+
+
+class CacheGeocodificacion(BaseSQLite):
+    """
+    Caché de Nominatim en un archivo SQLite: sobrevive a reinicios y la
+    comparten todos los workers de Streamlit y los scripts por lotes.
+    También guarda los "no encontrado" (lat/lon NULL) con una vigencia menor.
+    Al superar `max_entradas` se eliminan las consultas usadas hace más tiempo.
+    """
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS geocodigos (
+            consulta TEXT PRIMARY KEY,
+            lat REAL,
+            lon REAL,
+            creado REAL NOT NULL,
+            usado REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_geocodigos_usado ON geocodigos(usado);
+    """
+
+    def __init__(self, ruta=RUTA_CACHE_GEO, ttl_dias=GEO_TTL_DIAS,
+                 ttl_negativo_horas=GEO_TTL_NEGATIVO_HORAS,
+                 max_entradas=GEO_MAX_ENTRADAS):
+        self.ttl = ttl_dias * 86400
+        self.ttl_negativo = ttl_negativo_horas * 3600
+        self.max_entradas = max_entradas
+        super().__init__(ruta)
+
+    def obtener_varios(self, consultas):
+        """{consulta: (lat, lon)} de las consultas vigentes en la caché."""
+        if not consultas:
+            return {}
+
+        ahora = time.time()
+        marcas = ",".join("?" * len(consultas))
+        with self._conexion() as con:
+            filas = con.execute(
+                f"SELECT consulta, lat, lon, creado FROM geocodigos WHERE consulta IN ({marcas})",
+                list(consultas)).fetchall()
+
+            vigentes = {}
+            for consulta, lat, lon, creado in filas:
+                ttl = self.ttl if lat is not None else self.ttl_negativo
+                if ahora - creado <= ttl:
+                    vigentes[consulta] = (lat, lon)
+
+            con.executemany("UPDATE geocodigos SET usado = ? WHERE consulta = ?",
+                            [(ahora, c) for c in vigentes])
+        return vigentes
+
+    def guardar_varios(self, resultados):
+        """Guarda {consulta: (lat, lon)}; (None, None) es un resultado negativo."""
+        if not resultados:
+            return
+
+        ahora = time.time()
+        with self._conexion() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO geocodigos VALUES (?, ?, ?, ?, ?)",
+                [(c, lat, lon, ahora, ahora) for c, (lat, lon) in resultados.items()])
+            con.execute("""
+                DELETE FROM geocodigos WHERE consulta IN (
+                    SELECT consulta FROM geocodigos ORDER BY usado DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entradas,))
+
+    def limpiar_vencidos(self):
+        ahora = time.time()
+        with self._conexion() as con:
+            con.execute("""
+                DELETE FROM geocodigos
+                WHERE (lat IS NOT NULL AND creado < ?) OR (lat IS NULL AND creado < ?)
+            """, (ahora - self.ttl, ahora - self.ttl_negativo))
+
+# ==============================================================================
+# 4. RESOLUTOR POR LOTES CONTRA NOMINATIM
+# ==============================================================================
+
+
+class ResolutorNominatim:
+    """
+    Recibe muchos nombres de ubicaciones, elimina repetidos, responde lo que ya
+    está en la caché y solo consulta a Nominatim lo que falta, respetando su
+    límite de peticiones por segundo con una cubeta de tokens.
+    """
+
+    def __init__(self, cache=None, url=NOMINATIM_URL,
+                 peticiones_por_segundo=NOMINATIM_PETICIONES_POR_SEGUNDO):
+        self.cache = cache if cache is not None else CacheGeocodificacion()
+        self.url = url
+        self.cubeta = CubetaTokens(peticiones_por_segundo)
+
+    def consultar_nominatim(self, ubicacion):
+        """(lat, lon), (None, None) si no existe. Lanza excepción si falla la red."""
+        self.cubeta.tomar()
+        response = obtener(
+            self.url,
+            params={"q": f"{ubicacion}, Lima, Peru", "format": "json", "limit": 1},
+            headers={"User-Agent": NOMINATIM_USER_AGENT},
+        )
+        response.raise_for_status()
+        datos = response.json()
+        if datos:
+            return float(datos[0]["lat"]), float(datos[0]["lon"])
+        return None, None
+
+    def resolver_lote(self, ubicaciones):
+        """{ubicacion: (lat, lon)} para cada ubicación pedida."""
+        consultas = {}
+        for ubicacion in ubicaciones:
+            if ubicacion and ubicacion != SIN_DISTRITO:
+                consultas.setdefault(" ".join(str(ubicacion).upper().split()), []).append(ubicacion)
+
+        resueltos = self.cache.obtener_varios(list(consultas))
+        nuevos = {}
+        for consulta in consultas:
+            if consulta in resueltos:
+                continue
+            try:
+                nuevos[consulta] = self.consultar_nominatim(consulta)
+            except Exception as e:
+                # Un fallo de red no se guarda como "no encontrado"
+                print(f"Error en {consulta}: {e}")
+
+        self.cache.guardar_varios(nuevos)
+        resueltos.update(nuevos)
+
+        return {
+            original: resueltos.get(consulta, (None, None))
+            for consulta, originales in consultas.items()
+            for original in originales
+        }
+
+
+_RESOLUTOR = None
+_CANDADO_RESOLUTOR = threading.Lock()
+
+
+def obtener_resolutor():
+    global _RESOLUTOR
+    with _CANDADO_RESOLUTOR:
+        if _RESOLUTOR is None:
+            _RESOLUTOR = ResolutorNominatim()
+        return _RESOLUTOR
+
+
+def resolver_lote(ubicaciones):
+    return obtener_resolutor().resolver_lote(ubicaciones)
+
+
+def obtener_coordenadas(ubicacion):
+    """Consulta una sola ubicación (con caché en disco y límite de Nominatim)."""
+    return resolver_lote([ubicacion]).get(ubicacion, (None, None))
@@ -0,0 +1,112 @@
+# herramientas/benchmark_api.py
+"""
+Peticiones por segundo de api_datos.py sobre un almacén temporal con
+dataset_unificado.csv. Cada cliente es un hilo con una conexión keep-alive
+que repite las rutas de la API en tres modos:
+
+  - 200:   respuesta completa sin comprimir
+  - gzip:  Accept-Encoding: gzip
+  - 304:   If-None-Match con el ETag recibido (un cliente que sondea)
+
+    python herramientas/benchmark_api.py
+    python herramientas/benchmark_api.py --clientes 16 --segundos 5
+
+Clientes y servidor comparten el proceso (y el GIL): las cifras son un piso.
+"""
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Almacén del benchmark en una carpeta temporal (antes de importar config.py)
+os.environ["LIMA_SEGURA_DATOS"] = tempfile.mkdtemp(prefix="lima_segura_bench_api_")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from almacen import AlmacenNoticias
+from api_datos import iniciar_en_hilo
+
+RUTAS = [
+    "/api/incidentes?por_pagina=50",
+    "/api/incidentes?por_pagina=20&campos=Titular,Distrito,Publicado",
+    "/api/distritos",
+    "/api/ranking?limite=10",
+    "/api/celdas?zoom=11",
+    "/api/version",
+]
+
+MODOS = {
+    "200": {},
+    "gzip": {"Accept-Encoding": "gzip"},
+    "304": {"Accept-Encoding": "gzip"},   # + If-None-Match
+}
+
+
+def cliente(direccion, modo, hasta, resultados):
+    conexion = http.client.HTTPConnection(*direccion)
+    etags = {}
+    latencias, estados = [], {}
+    i = 0
+    while time.perf_counter() < hasta:
+        ruta = RUTAS[i % len(RUTAS)]
+        i += 1
+        cabeceras = dict(MODOS[modo])
+        if modo == "304" and ruta in etags:
+            cabeceras["If-None-Match"] = etags[ruta]
+        inicio = time.perf_counter()
+        conexion.request("GET", ruta, headers=cabeceras)
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        latencias.append(time.perf_counter() - inicio)
+        estados[respuesta.status] = estados.get(respuesta.status, 0) + 1
+        etags[ruta] = respuesta.getheader("ETag")
+    conexion.close()
+    resultados.append((latencias, estados))
+
+
+def medir(direccion, modo, clientes, segundos):
+    resultados = []
+    hasta = time.perf_counter() + segundos
+    hilos = [threading.Thread(target=cliente, args=(direccion, modo, hasta, resultados))
+             for _ in range(clientes)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    latencias = sorted(l for lista, _ in resultados for l in lista)
+    estados = {}
+    for _, parcial in resultados:
+        for estado, cantidad in parcial.items():
+            estados[estado] = estados.get(estado, 0) + cantidad
+    return {
+        "peticiones_s": len(latencias) / segundos,
+        "p50_ms": latencias[len(latencias) // 2] * 1000,
+        "p99_ms": latencias[int(len(latencias) * 0.99)] * 1000,
+        "estados": estados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de api_datos.py")
+    parser.add_argument("--clientes", type=int, default=8, help="Conexiones keep-alive simultáneas")
+    parser.add_argument("--segundos", type=float, default=3.0, help="Duración de cada modo")
+    args = parser.parse_args()
+
+    almacen = AlmacenNoticias()
+    almacen.importar_csv_si_falta()
+    servidor, _ = iniciar_en_hilo(almacen)
+    direccion = servidor.server_address
+
+    # Primera pasada: llena la caché de respuestas
+    medir(direccion, "200", 1, 0.2)
+
+    print(f"{'Modo':<8}{'Pet./s':>10}{'p50 ms':>9}{'p99 ms':>9}  Estados")
+    for modo in MODOS:
+        r = medir(direccion, modo, args.clientes, args.segundos)
+        estados = ", ".join(f"{e}: {n}" for e, n in sorted(r["estados"].items()))
+        print(f"{modo:<8}{r['peticiones_s']:>10.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}  {estados}")
+
+    servidor.shutdown()
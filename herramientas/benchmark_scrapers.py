@@ -0,0 +1,166 @@
+# herramientas/benchmark_scrapers.py
+"""
+Benchmark sin internet de los siete scrapers. Levanta servidor_paginas.py con
+las páginas grabadas, redirige ahí a cliente_http y mide por módulo:
+
+  - descarga:    páginas/s y KB/s contra el servidor local
+  - parseo:      páginas/s del parseo dirigido
+  - clasificar:  titulares/s (distrito + delito) sobre los titulares de la página
+  - escaneo:     por el contrato de streaming (escaneo.iterar_fuente): tiempo a
+                 la primera noticia, en frío (caché vacía) y reescaneo (304),
+                 pico de memoria
+  - golden:      las noticias extraídas coinciden con herramientas/golden/*.json
+
+    python herramientas/benchmark_scrapers.py
+    python herramientas/benchmark_scrapers.py --actualizar-golden   # tras un cambio intencional
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+# Cachés del benchmark en una carpeta temporal (antes de importar config.py)
+os.environ["LIMA_SEGURA_DATOS"] = tempfile.mkdtemp(prefix="lima_segura_bench_")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import cliente_http
+import cortesia
+from clasificador import BUSCADOR_DELITOS, BUSCADOR_DISTRITOS
+from parseo import parsear
+from escaneo import iterar_fuente
+from webscraping import (
+    web_scraping_el_comercio, webscraping_canalN, webscraping_diariocorreo,
+    webscraping_infobaePE, webscraping_larepublica, webscraping_peru21, webscraping_rpp
+)
+from servidor_paginas import CARPETA_PAGINAS, PAGINAS_POR_HOST, iniciar_en_hilo
+
+CARPETA_GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# nombre del golden: módulo (envoltorio del motor de config.FUENTES_DEFINIDAS)
+MODULOS = {
+    "el_comercio": web_scraping_el_comercio,
+    "rpp": webscraping_rpp,
+    "canal_n": webscraping_canalN,
+    "diario_correo": webscraping_diariocorreo,
+    "infobae": webscraping_infobaePE,
+    "la_republica": webscraping_larepublica,
+    "peru21": webscraping_peru21,
+}
+
+
+def escanear(modulo):
+    """Escaneo por el contrato de streaming; devuelve (noticias, segundos a la primera)."""
+    noticias, primera = [], None
+    inicio = time.perf_counter()
+    for noticia in iterar_fuente(modulo.MOTOR.nombre, modulo):
+        if primera is None:
+            primera = time.perf_counter() - inicio
+        noticias.append(noticia)
+    return noticias, primera
+
+
+def por_segundo(cantidad, segundos):
+    return cantidad / segundos if segundos > 0 else float("inf")
+
+
+def medir_modulo(nombre, repeticiones):
+    modulo = MODULOS[nombre]
+    motor = modulo.MOTOR
+    host, etiquetas, urls = urlsplit(motor.base).netloc, motor.contenedor, motor.urls
+    with open(os.path.join(CARPETA_PAGINAS, PAGINAS_POR_HOST[host]), "rb") as f:
+        html = f.read()
+
+    # 1. Descarga (conexión keep-alive del cliente compartido)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for url in urls:
+            cliente_http.obtener(url)
+    t_descarga = time.perf_counter() - inicio
+    paginas = repeticiones * len(urls)
+
+    # 2. Parseo
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        soup = parsear(html, etiquetas)
+    t_parseo = time.perf_counter() - inicio
+
+    # 3. Clasificación de todos los titulares de la página
+    titulares = [el.get_text(" ", strip=True) for el in soup.find_all(etiquetas)]
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for titulo in titulares:
+            BUSCADOR_DISTRITOS.buscar(titulo)
+            BUSCADOR_DELITOS.buscar(titulo)
+    t_clasificar = time.perf_counter() - inicio
+
+    # 4. Escaneo completo: en frío (sin caché) y reescaneo (304)
+    cliente_http.obtener_cache().vaciar()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    noticias, t_primera = escanear(modulo)
+    t_frio = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    escanear(modulo)
+    t_reescaneo = time.perf_counter() - inicio
+
+    return {
+        "paginas_s_descarga": por_segundo(paginas, t_descarga),
+        "kb_s_descarga": por_segundo(paginas * len(html) / 1024, t_descarga),
+        "paginas_s_parseo": por_segundo(repeticiones, t_parseo),
+        "titulares_s": por_segundo(repeticiones * len(titulares), t_clasificar),
+        "ms_primera": (t_primera or 0) * 1000,
+        "ms_frio": t_frio * 1000,
+        "ms_reescaneo": t_reescaneo * 1000,
+        "pico_kb": pico / 1024,
+        "noticias": noticias,
+    }
+
+
+def comparar_golden(nombre, noticias, actualizar):
+    ruta = os.path.join(CARPETA_GOLDEN, f"{nombre}.json")
+    if actualizar:
+        os.makedirs(CARPETA_GOLDEN, exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(noticias, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        return "actualizado"
+    if not os.path.exists(ruta):
+        return "sin golden"
+    with open(ruta, encoding="utf-8") as f:
+        return "✅" if json.load(f) == noticias else "❌ distinto"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline de los scrapers")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--modulo", action="append", choices=list(MODULOS),
+                        help="Medir solo estos módulos (repetible)")
+    parser.add_argument("--actualizar-golden", action="store_true",
+                        help="Reescribe los golden con la salida actual")
+    args = parser.parse_args()
+
+    servidor, url_base = iniciar_en_hilo()
+    cliente_http.SERVIDOR_LOCAL = url_base
+    cortesia.LIMITADOR.intervalo = 0      # Servidor local: sin pausa de cortesía
+
+    print(f"{'Módulo':<15}{'Desc. pág/s':>12}{'Desc. KB/s':>12}{'Parseo pág/s':>14}"
+          f"{'Titulares/s':>13}{'1.ª ms':>9}{'Frío ms':>10}{'304 ms':>9}{'Pico KB':>9}  Golden")
+    fallos = 0
+    for nombre in args.modulo or MODULOS:
+        r = medir_modulo(nombre, args.repeticiones)
+        golden = comparar_golden(nombre, r["noticias"], args.actualizar_golden)
+        fallos += golden.startswith("❌")
+        print(f"{nombre:<15}{r['paginas_s_descarga']:>12.0f}{r['kb_s_descarga']:>12.0f}"
+              f"{r['paginas_s_parseo']:>14.1f}{r['titulares_s']:>13.0f}{r['ms_primera']:>9.1f}"
+              f"{r['ms_frio']:>10.1f}"
+              f"{r['ms_reescaneo']:>9.1f}{r['pico_kb']:>9.0f}  {golden} ({len(r['noticias'])})")
+
+    servidor.shutdown()
+    sys.exit(1 if fallos else 0)
@@ -0,0 +1,75 @@
+# herramientas/medir_parseo.py
+"""
+Compara el parseo completo (árbol de toda la página) con el parseo dirigido
+(solo h2/h3/article) sobre páginas guardadas, módulo por módulo:
+
+    python herramientas/medir_parseo.py
+    python herramientas/medir_parseo.py --carpeta otra/carpeta --repeticiones 20
+
+Reporta tiempo medio por página, pico de memoria (tracemalloc) y verifica que
+ambos modos entreguen exactamente las mismas noticias.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import parseo
+from webscraping import (
+    web_scraping_el_comercio, webscraping_canalN, webscraping_diariocorreo,
+    webscraping_infobaePE, webscraping_larepublica, webscraping_peru21, webscraping_rpp
+)
+
+CARPETA_PAGINAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paginas_grabadas")
+
+# Página guardada -> módulo que la procesa
+PAGINAS = {
+    "el_comercio.html": web_scraping_el_comercio,
+    "rpp.html": webscraping_rpp,
+    "canal_n.html": webscraping_canalN,
+    "diario_correo.html": webscraping_diariocorreo,
+    "infobae.html": webscraping_infobaePE,
+    "la_republica.html": webscraping_larepublica,
+    "peru21.html": webscraping_peru21,
+}
+
+
+def medir(modulo, html, dirigido, repeticiones):
+    parseo.PARSEO_DIRIGIDO = dirigido
+
+    tracemalloc.start()
+    noticias = modulo.extraer_noticias(html)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        modulo.extraer_noticias(html)
+    segundos = (time.perf_counter() - inicio) / repeticiones
+
+    return noticias, segundos, pico
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el parseo completo vs. dirigido")
+    parser.add_argument("--carpeta", default=CARPETA_PAGINAS)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'Página':<20}{'KB':>7}{'Completo ms':>13}{'Dirigido ms':>13}"
+          f"{'Pico completo KB':>18}{'Pico dirigido KB':>18}  Iguales")
+    for archivo, modulo in PAGINAS.items():
+        ruta = os.path.join(args.carpeta, archivo)
+        if not os.path.exists(ruta):
+            continue
+        with open(ruta, "rb") as f:
+            html = f.read()
+
+        completo, t_completo, m_completo = medir(modulo, html, False, args.repeticiones)
+        dirigido, t_dirigido, m_dirigido = medir(modulo, html, True, args.repeticiones)
+
+        print(f"{archivo:<20}{len(html) / 1024:>7.0f}{t_completo * 1000:>13.1f}"
+              f"{t_dirigido * 1000:>13.1f}{m_completo / 1024:>18.0f}{m_dirigido / 1024:>18.0f}"
+              f"  {'✅' if completo == dirigido else '❌'} ({len(dirigido)} noticias)")
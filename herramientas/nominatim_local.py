@@ -0,0 +1,74 @@
+# herramientas/nominatim_local.py
+"""
+Servidor que imita la ruta /search de Nominatim usando COORDENADAS_LIMA.
+Sirve para probar la geocodificación sin salir a internet:
+
+    python herramientas/nominatim_local.py --puerto 8089
+    NOMINATIM_URL=http://127.0.0.1:8089/search streamlit run app_streamlit.py
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import ALIAS_DISTRITOS, COORDENADAS_LIMA
+
+
+class ManejadorNominatim(BaseHTTPRequestHandler):
+    retraso = 0.0
+    peticiones = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/search":
+            self.send_error(404)
+            return
+
+        consulta = parse_qs(url.query).get("q", [""])[0]
+        self.peticiones.append(consulta)
+        time.sleep(self.retraso)
+
+        # "Miraflores, Lima, Peru" -> "MIRAFLORES"
+        nombre = " ".join(consulta.split(",")[0].upper().split())
+        nombre = ALIAS_DISTRITOS.get(nombre, nombre)
+        coords = COORDENADAS_LIMA.get(nombre)
+
+        cuerpo = json.dumps(
+            [{"lat": str(coords[0]), "lon": str(coords[1]), "display_name": consulta}]
+            if coords else []
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_en_hilo(puerto=0, retraso=0.0):
+    """Arranca el servidor en segundo plano; devuelve (servidor, url_search)."""
+    manejador = type("ManejadorNominatimLocal", (ManejadorNominatim,),
+                     {"retraso": retraso, "peticiones": []})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/search"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nominatim local para pruebas")
+    parser.add_argument("--puerto", type=int, default=8089)
+    parser.add_argument("--retraso", type=float, default=0.0,
+                        help="Segundos de espera por respuesta (simula latencia)")
+    args = parser.parse_args()
+
+    ManejadorNominatim.retraso = args.retraso
+    print(f"🛰️ Nominatim local en http://127.0.0.1:{args.puerto}/search")
+    ThreadingHTTPServer(("127.0.0.1", args.puerto), ManejadorNominatim).serve_forever()
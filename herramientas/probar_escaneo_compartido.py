@@ -0,0 +1,92 @@
+# herramientas/probar_escaneo_compartido.py
+"""
+Comprueba que CoordinadorEscaneos (escaneo_compartido.py) cierra el escaneo
+aunque el almacén falle en el turno, y que la solicitud siguiente arranca
+uno nuevo en lugar de quedarse con el atascado:
+
+    python herramientas/probar_escaneo_compartido.py
+
+Usa un almacén temporal y una lista de fuentes vacía (no sale a la red).
+Sale con código 1 si algún caso falla.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Almacén de la prueba en una carpeta temporal (antes de importar config.py)
+os.environ["LIMA_SEGURA_DATOS"] = tempfile.mkdtemp(prefix="lima_segura_prueba_escaneo_")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import escaneo_compartido
+from almacen import AlmacenNoticias
+from escaneo_compartido import CoordinadorEscaneos
+from ingesta import TURNO
+
+ESPERA_SEGUNDOS = 10
+escaneo_compartido.ESPERA_TURNO_SEGUNDOS = 0.1
+
+
+def falla_desde(llamada):
+    """Reemplazo de un método del almacén que falla a partir de la `llamada`-ésima vez."""
+    llamadas = []
+
+    def metodo(*args, **kwargs):
+        llamadas.append(1)
+        if len(llamadas) >= llamada:
+            raise sqlite3.OperationalError("database is locked")
+        return metodo.original(*args, **kwargs)
+    return metodo
+
+
+def probar(nombre, metodo, llamada=1, otro_proceso=False):
+    """
+    Hace fallar `metodo` del almacén durante el primer escaneo y comprueba
+    que termina con error, suelta el turno y que el siguiente corre normal.
+    Con `otro_proceso`, el turno lo tiene otro dueño al pedir el escaneo.
+    """
+    almacen = AlmacenNoticias(os.path.join(tempfile.mkdtemp(dir=os.environ["LIMA_SEGURA_DATOS"]),
+                                           "noticias.sqlite"))
+    coordinador = CoordinadorEscaneos(almacen, [])
+    if otro_proceso:
+        almacen.tomar_turno(TURNO, "otro:1", 30)
+    reemplazo = falla_desde(llamada)
+    reemplazo.original = getattr(almacen, metodo)
+    setattr(almacen, metodo, reemplazo)
+    try:
+        fallido = coordinador.solicitar()
+        if otro_proceso:
+            hasta = time.time() + ESPERA_SEGUNDOS
+            while fallido.origen != "otro_proceso" and time.time() < hasta:   # Que espere el turno
+                time.sleep(0.01)
+            almacen.liberar_turno(TURNO, "otro:1", completo=False)
+        terminado = fallido.esperar(ESPERA_SEGUNDOS)
+    finally:
+        setattr(almacen, metodo, reemplazo.original)
+    nuevo = coordinador.solicitar()
+
+    fallas = []
+    if not terminado:
+        fallas.append("el escaneo fallido no terminó")
+    if fallido.error is None:
+        fallas.append("el escaneo fallido no registró el error")
+    if nuevo is fallido:
+        fallas.append("solicitar() devolvió el escaneo fallido")
+    if not nuevo.esperar(ESPERA_SEGUNDOS) or nuevo.error is not None:
+        fallas.append(f"el escaneo siguiente no terminó bien ({nuevo.error})")
+    if almacen.turno_ocupado(TURNO):
+        fallas.append("el turno quedó tomado")
+    print(f"{'❌' if fallas else '✅'} {nombre}" + "".join(f"\n   - {f}" for f in fallas))
+    return not fallas
+
+
+if __name__ == "__main__":
+    resultados = [
+        probar("tomar_turno falla", "tomar_turno"),
+        # La 1.ª llamada es la de solicitar(); la 2.ª, la de _correr con el turno ya tomado
+        probar("segundos_desde falla con el turno tomado", "segundos_desde", llamada=2,
+               otro_proceso=True),
+        probar("liberar_turno falla", "liberar_turno"),
+    ]
+    sys.exit(0 if all(resultados) else 1)
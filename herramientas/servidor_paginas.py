@@ -0,0 +1,95 @@
+# herramientas/servidor_paginas.py
+"""
+Sirve las páginas grabadas de `paginas_grabadas/` como si fueran los sitios
+reales. Con LIMA_SEGURA_SERVIDOR_LOCAL apuntando aquí, cliente_http pide
+https://rpp.pe/ultimas-noticias como http://127.0.0.1:8090/rpp.pe/ultimas-noticias:
+
+    python herramientas/servidor_paginas.py --puerto 8090
+    LIMA_SEGURA_SERVIDOR_LOCAL=http://127.0.0.1:8090 python ingesta.py --una-vez
+
+Todas las rutas de un mismo dominio devuelven la página grabada de ese medio.
+Responde con ETag, así que también sirve para probar los 304.
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CARPETA_PAGINAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paginas_grabadas")
+
+# Dominio -> página grabada
+PAGINAS_POR_HOST = {
+    "elcomercio.pe": "el_comercio.html",
+    "rpp.pe": "rpp.html",
+    "canaln.pe": "canal_n.html",
+    "diariocorreo.pe": "diario_correo.html",
+    "www.infobae.com": "infobae.html",
+    "larepublica.pe": "la_republica.html",
+    "peru21.pe": "peru21.html",
+}
+
+
+def cargar_paginas(carpeta=CARPETA_PAGINAS):
+    paginas = {}
+    for host, archivo in PAGINAS_POR_HOST.items():
+        with open(os.path.join(carpeta, archivo), "rb") as f:
+            html = f.read()
+        paginas[host] = (html, '"' + hashlib.sha1(html).hexdigest()[:16] + '"')
+    return paginas
+
+
+class ManejadorPaginas(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, como los sitios reales
+    paginas = {}
+    retraso = 0.0
+
+    def do_GET(self):
+        host = self.path.lstrip("/").split("/", 1)[0]
+        if host not in self.paginas:
+            self.send_error(404)
+            return
+
+        time.sleep(self.retraso)
+        html, etag = self.paginas[host]
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(html)))
+        self.end_headers()
+        self.wfile.write(html)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar_en_hilo(puerto=0, retraso=0.0, carpeta=CARPETA_PAGINAS):
+    """Arranca el servidor en segundo plano; devuelve (servidor, url_base)."""
+    manejador = type("ManejadorPaginasLocal", (ManejadorPaginas,),
+                     {"paginas": cargar_paginas(carpeta), "retraso": retraso})
+    servidor = ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sitios de noticias grabados, en local")
+    parser.add_argument("--puerto", type=int, default=8090)
+    parser.add_argument("--retraso", type=float, default=0.0,
+                        help="Segundos de espera por respuesta (simula latencia)")
+    parser.add_argument("--carpeta", default=CARPETA_PAGINAS)
+    args = parser.parse_args()
+
+    ManejadorPaginas.paginas = cargar_paginas(args.carpeta)
+    ManejadorPaginas.retraso = args.retraso
+    print(f"🗞️ Páginas grabadas en http://127.0.0.1:{args.puerto}/<dominio>/...")
+    ThreadingHTTPServer(("127.0.0.1", args.puerto), ManejadorPaginas).serve_forever()
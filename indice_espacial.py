@@ -0,0 +1,267 @@
+# indice_espacial.py
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import CELDA_INDICE_GRADOS, RUTA_SERVICIOS_EMERGENCIA
+from fechas import acotar_ventana
+
+RADIO_TIERRA_M = 6_371_000
+METROS_POR_GRADO = 111_195   # Un grado de latitud
+
+# ==============================================================================
+# 1. DISTANCIAS
+# ==============================================================================
+
+
+def distancia_m(lat, lon, lats, lons):
+    """Distancia haversine (metros) desde (lat, lon) hasta cada punto, vectorizada."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * RADIO_TIERRA_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+# ==============================================================================
+# 2. REJILLA REGULAR (RADIO Y K MÁS CERCANOS)
+# ==============================================================================
+
+
+class IndiceRejilla:
+    """
+    Puntos repartidos en celdas de `celda_grados` de lado. Una consulta solo
+    mide distancias a los puntos de las celdas vecinas, recorridas en anillos
+    alrededor de la celda del punto pedido. Agregar puntos no reordena nada:
+    se suman al final y a su celda (sirve para ir indexando cada escaneo).
+    """
+
+    def __init__(self, celda_grados=CELDA_INDICE_GRADOS):
+        self.celda = celda_grados
+        self.lat = np.empty(0)
+        self.lon = np.empty(0)
+        self._celdas = {}            # (fila, columna) -> posiciones de sus puntos
+        self._limites = None         # (fila_min, fila_max, columna_min, columna_max)
+        self._lat_maxima = 0.0       # |lat| mayor, para el ancho mínimo de una celda
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _celda_de(self, lat, lon):
+        return int(math.floor(lat / self.celda)), int(math.floor(lon / self.celda))
+
+    def agregar(self, lats, lons):
+        """Agrega puntos y devuelve sus posiciones (0, 1, 2... en orden de llegada)."""
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        posiciones = np.arange(len(self.lat), len(self.lat) + len(lats))
+        if not len(lats):
+            return posiciones
+        self.lat = np.concatenate([self.lat, lats])
+        self.lon = np.concatenate([self.lon, lons])
+
+        filas = np.floor(lats / self.celda).astype(int)
+        columnas = np.floor(lons / self.celda).astype(int)
+        for (fila, columna), indices in pd.Series(posiciones).groupby([filas, columnas]).indices.items():
+            clave = (int(fila), int(columna))
+            nuevas = posiciones[indices]
+            anteriores = self._celdas.get(clave)
+            self._celdas[clave] = nuevas if anteriores is None else np.concatenate([anteriores, nuevas])
+
+        limites = (filas.min(), filas.max(), columnas.min(), columnas.max())
+        if self._limites is not None:
+            limites = (min(limites[0], self._limites[0]), max(limites[1], self._limites[1]),
+                       min(limites[2], self._limites[2]), max(limites[3], self._limites[3]))
+        self._limites = tuple(int(x) for x in limites)
+        self._lat_maxima = max(self._lat_maxima, float(np.abs(lats).max()))
+        return posiciones
+
+    def _lado_minimo_m(self, lat):
+        """Lado más corto de una celda (el de longitud, que se achica hacia los polos)."""
+        coseno = math.cos(math.radians(min(89.0, max(abs(lat), self._lat_maxima))))
+        return self.celda * METROS_POR_GRADO * coseno
+
+    def _anillos(self, fila, columna):
+        """Primer y último anillo que tocan celdas con puntos (lejos de la rejilla no se recorre el vacío)."""
+        fila_min, fila_max, columna_min, columna_max = self._limites
+        primero = max(0, fila_min - fila, fila - fila_max, columna_min - columna, columna - columna_max)
+        ultimo = max(abs(fila - fila_min), abs(fila - fila_max),
+                     abs(columna - columna_min), abs(columna - columna_max))
+        return primero, ultimo
+
+    def _anillo(self, fila, columna, d):
+        """Posiciones de los puntos en las celdas a distancia (Chebyshev) d."""
+        if d == 0:
+            claves = [(fila, columna)]
+        else:
+            claves = [(fila + df, columna + dc) for df in (-d, d) for dc in range(-d, d + 1)]
+            claves += [(fila + df, columna + dc) for dc in (-d, d) for df in range(-d + 1, d)]
+        return [self._celdas[c] for c in claves if c in self._celdas]
+
+    def en_radio(self, lat, lon, metros):
+        """(posiciones, distancias en m) de los puntos a `metros` o menos, de cerca a lejos."""
+        if not self._celdas:
+            return np.empty(0, dtype=int), np.empty(0)
+        fila, columna = self._celda_de(lat, lon)
+        # Un punto del anillo d está a (d - 1) lados o más del punto pedido
+        primero, ultimo = self._anillos(fila, columna)
+        ultimo = min(int(metros // self._lado_minimo_m(lat)) + 1, ultimo)
+        partes = [p for d in range(primero, ultimo + 1) for p in self._anillo(fila, columna, d)]
+        if not partes:
+            return np.empty(0, dtype=int), np.empty(0)
+        posiciones = np.concatenate(partes)
+        distancias = distancia_m(lat, lon, self.lat[posiciones], self.lon[posiciones])
+        dentro = distancias <= metros
+        posiciones, distancias = posiciones[dentro], distancias[dentro]
+        orden = np.argsort(distancias, kind="stable")
+        return posiciones[orden], distancias[orden]
+
+    def vecinos(self, lat, lon, k):
+        """(posiciones, distancias en m) de los `k` puntos más cercanos."""
+        if not self._celdas or k <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+        fila, columna = self._celda_de(lat, lon)
+        lado = self._lado_minimo_m(lat)
+        posiciones, distancias = [], []
+        encontrados = 0
+        primero, ultimo = self._anillos(fila, columna)
+        for d in range(primero, ultimo + 1):
+            for parte in self._anillo(fila, columna, d):
+                posiciones.append(parte)
+                distancias.append(distancia_m(lat, lon, self.lat[parte], self.lon[parte]))
+                encontrados += len(parte)
+            # Lo que falta recorrer está a d lados o más: si ya hay k más cerca, basta
+            if encontrados >= k and np.partition(np.concatenate(distancias), k - 1)[k - 1] <= d * lado:
+                break
+        posiciones, distancias = np.concatenate(posiciones), np.concatenate(distancias)
+        orden = np.argsort(distancias, kind="stable")[:k]
+        return posiciones[orden], distancias[orden]
+
+# ==============================================================================
+# 3. INCIDENTES (SE INDEXAN LOS NUEVOS DE CADA ESCANEO)
+# ==============================================================================
+
+
+class IndiceIncidentes:
+    """
+    Rejilla sobre los incidentes con distrito, compartida por las sesiones.
+    Igual que CuboPorDia, tras un escaneo solo se agregan los ids nuevos y
+    una reclasificación (cambia la 'revision') la reconstruye.
+
+    Los titulares no traen la dirección: cada incidente se ubica en el centro
+    de su distrito (COORDENADAS_LIMA), así que "a 2 km" es "en un distrito
+    cuyo centro está a 2 km".
+    """
+
+    def __init__(self, almacen, geocodificar):
+        self.almacen = almacen
+        self.geocodificar = geocodificar   # Serie de distritos -> DataFrame lat/lon
+        self._candado = threading.Lock()
+        self.version = None
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self.rejilla = IndiceRejilla()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.dias = np.empty(0, dtype="U10")
+        self.distritos = np.empty(0, dtype=object)
+
+    def actualizar(self):
+        version = self.almacen.version_datos()
+        with self._candado:
+            if version == self.version:
+                return version
+            if self.version is None or version[1] != self.version[1] or version[0] < self.version[0]:
+                self._reiniciar()
+                despues_de = 0
+            else:
+                despues_de = self.version[0]
+
+            nuevos = self.almacen.ubicaciones(despues_de)
+            if not nuevos.empty:
+                # Unas decenas de distritos distintos: se geocodifica cada uno una vez
+                distritos = nuevos["Distrito"].unique()
+                coordenadas = self.geocodificar(pd.Series(distritos, dtype=object))
+                coordenadas.index = distritos
+                ubicados = nuevos.join(coordenadas, on="Distrito").dropna(subset=["lat", "lon"])
+                self.rejilla.agregar(ubicados["lat"], ubicados["lon"])
+                self.ids = np.concatenate([self.ids, ubicados["id"].to_numpy(dtype=np.int64)])
+                self.dias = np.concatenate([self.dias, ubicados["Día"].to_numpy(dtype="U10")])
+                self.distritos = np.concatenate([self.distritos, ubicados["Distrito"].to_numpy(dtype=object)])
+            self.version = version
+            return version
+
+    def _en_radio(self, lat, lon, metros, desde, hasta):
+        """(posiciones, distancias, arreglos) con los arreglos leídos bajo el candado."""
+        with self._candado:
+            posiciones, distancias = self.rejilla.en_radio(lat, lon, metros)
+            # actualizar() reemplaza los arreglos, no los modifica: basta con la referencia
+            arreglos = (self.ids, self.dias, self.distritos, self.rejilla.lat, self.rejilla.lon)
+        dias = arreglos[1][posiciones]
+        mascara = np.ones(len(posiciones), dtype=bool)
+        desde, hasta = acotar_ventana(desde, hasta)
+        if desde is not None:
+            mascara &= dias >= desde
+        if hasta is not None:
+            mascara &= dias < hasta
+        return posiciones[mascara], distancias[mascara], arreglos
+
+    def en_radio(self, lat, lon, metros, desde=None, hasta=None):
+        """(ids, distancias en m) de los incidentes a `metros` o menos en los días [desde, hasta)."""
+        posiciones, distancias, (ids, *_) = self._en_radio(lat, lon, metros, desde, hasta)
+        return ids[posiciones], distancias
+
+    def por_distrito(self, lat, lon, metros, desde=None, hasta=None):
+        """DataFrame (Distrito, lat, lon, Distancia (km), Delitos) de los distritos en el radio."""
+        posiciones, distancias, (_, _, distritos, lats, lons) = self._en_radio(lat, lon, metros, desde, hasta)
+        cercanos = pd.DataFrame({"Distrito": distritos[posiciones], "lat": lats[posiciones],
+                                 "lon": lons[posiciones],
+                                 "Distancia (km)": np.round(distancias / 1000, 2)})
+        return (cercanos.groupby(["Distrito", "lat", "lon", "Distancia (km)"], as_index=False)
+                .size().rename(columns={"size": "Delitos"})
+                .sort_values("Distancia (km)", kind="stable", ignore_index=True))
+
+# ==============================================================================
+# 4. SERVICIOS DE EMERGENCIA (DATOS LOCALES, SIN SERVICIOS EXTERNOS)
+# ==============================================================================
+
+
+class ServiciosEmergencia:
+    """
+    Comisarías, compañías de bomberos y hospitales de servicios_emergencia.csv,
+    con una rejilla por tipo para responder "los k más cercanos de cada uno".
+    """
+
+    def __init__(self, ruta=RUTA_SERVICIOS_EMERGENCIA):
+        self.tabla = pd.read_csv(ruta, encoding="utf-8")
+        self._indices = {}
+        for tipo, grupo in self.tabla.groupby("Tipo", sort=False):
+            rejilla = IndiceRejilla()
+            rejilla.agregar(grupo["lat"], grupo["lon"])
+            self._indices[tipo] = (rejilla, grupo.index.to_numpy())
+
+    @property
+    def tipos(self):
+        return list(self._indices)
+
+    def _tabla(self, resultados):
+        # Una sola selección de filas para todos los tipos (la tabla tiene RangeIndex)
+        filas = np.concatenate([filas[posiciones] for filas, posiciones, _ in resultados])
+        distancias = np.concatenate([distancias for _, _, distancias in resultados])
+        return self.tabla.iloc[filas].assign(
+            **{"Distancia (km)": np.round(distancias / 1000, 2)}).reset_index(drop=True)
+
+    def cercanos(self, lat, lon, k, tipos=None):
+        """Los `k` más cercanos de cada tipo, con la columna 'Distancia (km)'."""
+        resultados = []
+        for tipo in tipos or self.tipos:
+            rejilla, filas = self._indices[tipo]
+            resultados.append((filas, *rejilla.vecinos(lat, lon, k)))
+        return self._tabla(resultados)
+
+    def en_radio(self, lat, lon, metros):
+        """Todos los servicios a `metros` o menos, de cerca a lejos."""
+        resultados = [(filas, *rejilla.en_radio(lat, lon, metros))
+                      for rejilla, filas in self._indices.values()]
+        return self._tabla(resultados).sort_values("Distancia (km)", kind="stable", ignore_index=True)
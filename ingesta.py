@@ -0,0 +1,131 @@
+# ingesta.py
+"""
+Servicio de ingesta: corre los scrapers de `webscraping/` según un horario y
+guarda lo encontrado en el almacén compartido. El dashboard solo lee de ahí.
+
+    python ingesta.py                      # cada INTERVALO_INGESTA segundos
+    python ingesta.py --una-vez            # una sola ronda (útil para cron)
+    python ingesta.py --intervalo 600 --intervalo-fuente "El Comercio=1800"
+"""
+import argparse
+import os
+import socket
+import time
+
+import instrumentacion
+
+from almacen import AlmacenNoticias, ahora_lima
+from config import ESCANEO_TURNO_SEGUNDOS, INTERVALO_INGESTA, INTERVALOS_POR_FUENTE
+from escaneo import FUENTES, escanear_en_vivo
+
+# Turno del almacén compartido con el dashboard (escaneo_compartido.py):
+# nunca escanean dos procesos a la vez
+TURNO = "escaneo"
+
+# ==============================================================================
+# 1. UNA RONDA DE ESCANEO
+# ==============================================================================
+
+
+def ejecutar_ronda(almacen, fuentes=None, al_terminar_fuente=None, al_recibir_noticia=None):
+    """
+    Escanea las fuentes en paralelo y guarda cada noticia en cuanto llega.
+    Devuelve {fuente: noticias_nuevas}.
+
+    `al_recibir_noticia(nombre, noticia, es_nueva)` se llama por noticia y
+    `al_terminar_fuente(nombre, noticias, terminadas, total)` por fuente.
+    """
+    fuentes = FUENTES if fuentes is None else fuentes
+    inicio = ahora_lima()
+    recibidas = {nombre_web: [] for nombre_web, _ in fuentes}
+    nuevas_por_fuente = {nombre_web: 0 for nombre_web, _ in fuentes}
+    terminadas = 0
+
+    for nombre_web, noticia in escanear_en_vivo(fuentes):
+        if noticia is not None:
+            es_nueva = almacen.guardar_noticias([noticia]) > 0
+            recibidas[nombre_web].append(noticia)
+            nuevas_por_fuente[nombre_web] += es_nueva
+            if al_recibir_noticia:
+                al_recibir_noticia(nombre_web, noticia, es_nueva)
+            continue
+
+        terminadas += 1
+        almacen.registrar_escaneo(nombre_web, inicio, len(recibidas[nombre_web]),
+                                  nuevas_por_fuente[nombre_web])
+        if al_terminar_fuente:
+            al_terminar_fuente(nombre_web, recibidas[nombre_web], terminadas, len(fuentes))
+
+    instrumentacion.exportar()
+    return nuevas_por_fuente
+
+# ==============================================================================
+# 2. BUCLE PROGRAMADO
+# ==============================================================================
+
+
+def ejecutar_servicio(intervalos, una_vez=False, fuentes=None):
+    """`intervalos`: {fuente: segundos entre escaneos}."""
+    fuentes = FUENTES if fuentes is None else fuentes
+    almacen = AlmacenNoticias()
+    almacen.importar_csv_si_falta()
+    proximo = {nombre_web: 0.0 for nombre_web, _ in fuentes}
+    dueno = f"{socket.gethostname()}:{os.getpid()}"
+
+    while True:
+        ahora = time.time()
+        pendientes = [(n, m) for n, m in fuentes if proximo[n] <= ahora]
+
+        if pendientes and not almacen.tomar_turno(TURNO, dueno, ESCANEO_TURNO_SEGUNDOS):
+            print(f"⏳ {ahora_lima()} El dashboard está escaneando; se reintenta en 30 s")
+            time.sleep(30)
+            continue
+
+        if pendientes:
+            print(f"🛰️ {ahora_lima()} Escaneando: {', '.join(n for n, _ in pendientes)}")
+            try:
+                nuevas = ejecutar_ronda(almacen, pendientes)
+            finally:
+                # Solo una ronda de todas las fuentes cuenta como escaneo reciente
+                almacen.liberar_turno(TURNO, dueno, completo=len(pendientes) == len(FUENTES))
+            for nombre_web, _ in pendientes:
+                proximo[nombre_web] = time.time() + intervalos[nombre_web]
+            print(f"💾 Nuevas noticias: {nuevas} | Total: {almacen.contar()}")
+
+        if una_vez:
+            return
+
+        time.sleep(max(1.0, min(proximo.values()) - time.time()))
+
+
+def _leer_intervalos(args):
+    intervalos = {nombre_web: INTERVALOS_POR_FUENTE.get(nombre_web, args.intervalo)
+                  for nombre_web, _ in FUENTES}
+    for par in args.intervalo_fuente:
+        nombre_web, _, segundos = par.partition("=")
+        if nombre_web not in intervalos or not segundos:
+            raise SystemExit(f"Intervalo inválido '{par}'. Fuentes: {', '.join(intervalos)}")
+        intervalos[nombre_web] = float(segundos)
+    return intervalos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta programada de Lima Segura")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_INGESTA,
+                        help="Segundos entre escaneos de cada fuente")
+    parser.add_argument("--intervalo-fuente", action="append", default=[], metavar="FUENTE=SEG",
+                        help='Intervalo propio de una fuente, p. ej. "RPP=300" (repetible)')
+    parser.add_argument("--fuente", action="append", metavar="FUENTE",
+                        help="Escanear solo estas fuentes (repetible)")
+    parser.add_argument("--una-vez", action="store_true", help="Una sola ronda y salir")
+    args = parser.parse_args()
+    instrumentacion.PROCESO = "ingesta"
+
+    fuentes = FUENTES
+    if args.fuente:
+        fuentes = [(n, m) for n, m in FUENTES if n in args.fuente]
+
+    try:
+        ejecutar_servicio(_leer_intervalos(args), una_vez=args.una_vez, fuentes=fuentes)
+    except KeyboardInterrupt:
+        print("🛑 Ingesta detenida.")
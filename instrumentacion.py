@@ -0,0 +1,293 @@
+# instrumentacion.py
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from config import CARPETA_DATOS
+
+# Nombre del proceso en los archivos exportados (ingesta.py lo cambia a "ingesta")
+PROCESO = "app"
+VENTANA = 200   # Observaciones recientes que se guardan por histograma
+
+# Límites de los histogramas (segundos o bytes)
+LIMITES_SEGUNDOS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+LIMITES_BYTES = [10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000]
+
+# Métrica -> (límites, descripción)
+HISTOGRAMAS = {
+    "escaneo_segundos": (LIMITES_SEGUNDOS, "Duración total del escaneo de la fuente"),
+    "descarga_segundos": (LIMITES_SEGUNDOS, "Latencia de descarga por página"),
+    "descarga_bytes": (LIMITES_BYTES, "Bytes recibidos por página (comprimidos; 0 en un 304)"),
+    "parseo_segundos": (LIMITES_SEGUNDOS, "Tiempo de parseo HTML por página"),
+    "clasificacion_segundos": (LIMITES_SEGUNDOS, "Tiempo de clasificación por página"),
+}
+CONTADORES = {
+    "paginas_total": "Páginas pedidas",
+    "paginas_sin_cambios_total": "Páginas sin cambios (304 o mismo HTML)",
+    "titulares_vistos_total": "Titulares revisados",
+    "titulares_conservados_total": "Titulares guardados como delito",
+    "titulares_descartados_total": "Titulares descartados, por motivo",
+    "errores_total": "Errores de descarga o parseo",
+    "articulos_descarga_total": "Artículos descargados para buscar el distrito",
+    "articulos_cache_total": "Artículos leídos de la caché de cuerpos",
+    "articulos_error_total": "Artículos que no se pudieron leer",
+    "titulares_ubicados_por_cuerpo_total": "Titulares cuyo distrito salió del artículo",
+    "titulares_con_fecha_total": "Titulares guardados con fecha de publicación",
+}
+
+# ==============================================================================
+# 1. HISTOGRAMA ACUMULADO + VENTANA MÓVIL
+# ==============================================================================
+
+
+class Histograma:
+    """
+    Cubetas acumuladas (lo que espera Prometheus) y las últimas VENTANA
+    observaciones para los percentiles "recientes" del dashboard.
+    """
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cubetas = [0] * (len(limites) + 1)   # La última es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+        self.recientes = deque(maxlen=VENTANA)
+
+    def observar(self, valor):
+        self.cubetas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+        self.recientes.append(valor)
+
+    def a_dict(self):
+        return {"limites": self.limites, "cubetas": self.cubetas, "suma": self.suma,
+                "cuenta": self.cuenta, "recientes": list(self.recientes)}
+
+# ==============================================================================
+# 2. REGISTRO DEL PROCESO
+# ==============================================================================
+
+
+class Registro:
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.histogramas = defaultdict(dict)    # fuente -> métrica -> Histograma
+        self.contadores = defaultdict(lambda: defaultdict(int))  # fuente -> (métrica, motivo) -> n
+        self.errores = deque(maxlen=50)
+
+    def observar(self, fuente, metrica, valor):
+        with self._candado:
+            por_fuente = self.histogramas[fuente]
+            if metrica not in por_fuente:
+                por_fuente[metrica] = Histograma(HISTOGRAMAS[metrica][0])
+            por_fuente[metrica].observar(valor)
+
+    def contar(self, fuente, metrica, cantidad=1, motivo=""):
+        with self._candado:
+            self.contadores[fuente][(metrica, motivo)] += cantidad
+
+    def error(self, fuente, donde, excepcion):
+        self.contar(fuente, "errores_total")
+        with self._candado:
+            self.errores.append({"fuente": fuente, "donde": donde, "error": str(excepcion)[:300],
+                                 "hora": time.strftime("%Y-%m-%d %H:%M:%S")})
+
+    def a_dict(self):
+        with self._candado:
+            return {
+                "proceso": PROCESO,
+                "actualizado": time.time(),
+                "histogramas": {f: {m: h.a_dict() for m, h in hs.items()}
+                                for f, hs in self.histogramas.items()},
+                "contadores": {f: [[m, motivo, n] for (m, motivo), n in cs.items()]
+                               for f, cs in self.contadores.items()},
+                "errores": list(self.errores),
+            }
+
+
+REGISTRO = Registro()
+_contexto = threading.local()
+
+# ==============================================================================
+# 3. API PARA SCRAPERS Y CLIENTE HTTP
+# ==============================================================================
+
+
+def fuente_actual():
+    return getattr(_contexto, "fuente", "sin_fuente")
+
+
+@contextmanager
+def medir_fuente(fuente):
+    """Marca el hilo con la fuente que se escanea y mide la duración total."""
+    anterior = getattr(_contexto, "fuente", None)
+    _contexto.fuente = fuente
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRO.observar(fuente, "escaneo_segundos", time.perf_counter() - inicio)
+        _contexto.fuente = anterior
+
+
+def observar(metrica, valor):
+    REGISTRO.observar(fuente_actual(), metrica, valor)
+
+
+def contar(metrica, cantidad=1):
+    REGISTRO.contar(fuente_actual(), metrica, cantidad)
+
+
+def descartar(motivo):
+    """Un titular que no pasó un filtro ('basura', 'sin_distrito', 'sin_delito'...)."""
+    REGISTRO.contar(fuente_actual(), "titulares_descartados_total", 1, motivo)
+
+
+def registrar_error(donde, excepcion):
+    REGISTRO.error(fuente_actual(), donde, excepcion)
+
+
+def acumular(etapa, segundos):
+    """Suma tiempo de parseo o clasificación a la página en curso."""
+    tiempos = getattr(_contexto, "tiempos", None)
+    if tiempos is not None:
+        tiempos[etapa] = tiempos.get(etapa, 0.0) + segundos
+
+
+@contextmanager
+def medir_pagina():
+    """Agrupa el parseo y la clasificación de una página en una observación."""
+    _contexto.tiempos = {}
+    try:
+        yield
+    finally:
+        tiempos, _contexto.tiempos = _contexto.tiempos, None
+        for etapa in ("parseo_segundos", "clasificacion_segundos"):
+            if etapa in tiempos:
+                observar(etapa, tiempos[etapa])
+
+# ==============================================================================
+# 4. EXPORTACIÓN (PROMETHEUS + JSON PARA LA PÁGINA DIAGNÓSTICO)
+# ==============================================================================
+
+
+def _etiquetas(**pares):
+    return "{" + ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in pares.items() if v != "") + "}"
+
+
+def texto_prometheus(datos):
+    lineas = []
+    for metrica, (_, descripcion) in HISTOGRAMAS.items():
+        nombre = f"lima_segura_{metrica}"
+        lineas += [f"# HELP {nombre} {descripcion}", f"# TYPE {nombre} histogram"]
+        for fuente, hs in datos["histogramas"].items():
+            h = hs.get(metrica)
+            if not h:
+                continue
+            acumulado = 0
+            for limite, n in zip(h["limites"] + ["+Inf"], h["cubetas"]):
+                acumulado += n
+                lineas.append(f"{nombre}_bucket{_etiquetas(proceso=datos['proceso'], fuente=fuente, le=limite)} {acumulado}")
+            lineas.append(f"{nombre}_sum{_etiquetas(proceso=datos['proceso'], fuente=fuente)} {h['suma']}")
+            lineas.append(f"{nombre}_count{_etiquetas(proceso=datos['proceso'], fuente=fuente)} {h['cuenta']}")
+
+    for metrica, descripcion in CONTADORES.items():
+        nombre = f"lima_segura_{metrica}"
+        lineas += [f"# HELP {nombre} {descripcion}", f"# TYPE {nombre} counter"]
+        for fuente, cs in datos["contadores"].items():
+            for m, motivo, n in cs:
+                if m == metrica:
+                    lineas.append(f"{nombre}{_etiquetas(proceso=datos['proceso'], fuente=fuente, motivo=motivo)} {n}")
+    return "\n".join(lineas) + "\n"
+
+
+def _escribir_atomico(ruta, texto):
+    temporal = f"{ruta}.tmp{os.getpid()}"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(temporal, ruta)
+
+
+def exportar(carpeta=CARPETA_DATOS):
+    """Escribe metricas_<proceso>.prom (para el textfile collector) y .json."""
+    os.makedirs(carpeta, exist_ok=True)
+    datos = REGISTRO.a_dict()
+    _escribir_atomico(os.path.join(carpeta, f"metricas_{PROCESO}.prom"), texto_prometheus(datos))
+    _escribir_atomico(os.path.join(carpeta, f"metricas_{PROCESO}.json"),
+                      json.dumps(datos, ensure_ascii=False))
+
+
+def cargar_exportadas(carpeta=CARPETA_DATOS):
+    """Métricas exportadas por todos los procesos (app, ingesta...)."""
+    resultado = []
+    for ruta in sorted(glob.glob(os.path.join(carpeta, "metricas_*.json"))):
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                resultado.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return resultado
+
+# ==============================================================================
+# 5. RESÚMENES PARA EL DASHBOARD
+# ==============================================================================
+
+
+def _percentil(valores, q):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def resumen_por_fuente(exportadas):
+    """Una fila por (proceso, fuente) con percentiles de la ventana reciente."""
+    filas = []
+    for datos in exportadas:
+        fuentes = sorted(set(datos["histogramas"]) | set(datos["contadores"]))
+        for fuente in fuentes:
+            hs = datos["histogramas"].get(fuente, {})
+            totales = defaultdict(int)
+            for metrica, _, n in datos["contadores"].get(fuente, []):
+                totales[metrica] += n
+
+            def p(metrica, q, escala=1.0):
+                valor = _percentil(hs.get(metrica, {}).get("recientes", []), q)
+                return None if valor is None else round(valor * escala, 1)
+
+            filas.append({
+                "Proceso": datos["proceso"],
+                "Fuente": fuente,
+                "Escaneo p50 (s)": p("escaneo_segundos", 0.5),
+                "Descarga p50 (ms)": p("descarga_segundos", 0.5, 1000),
+                "Descarga p95 (ms)": p("descarga_segundos", 0.95, 1000),
+                "KB recibidos/página p50": p("descarga_bytes", 0.5, 1 / 1000),
+                "Parseo p50 (ms)": p("parseo_segundos", 0.5, 1000),
+                "Clasificación p50 (ms)": p("clasificacion_segundos", 0.5, 1000),
+                "Páginas": totales["paginas_total"],
+                "Sin cambios": totales["paginas_sin_cambios_total"],
+                "Vistos": totales["titulares_vistos_total"],
+                "Guardados": totales["titulares_conservados_total"],
+                "Con fecha": totales["titulares_con_fecha_total"],
+                "Descartados": totales["titulares_descartados_total"],
+                "Por artículo": totales["titulares_ubicados_por_cuerpo_total"],
+                "Artículos descargados": totales["articulos_descarga_total"],
+                "Errores": totales["errores_total"],
+            })
+    return filas
+
+
+def descartes_por_motivo(exportadas):
+    filas = []
+    for datos in exportadas:
+        for fuente, cs in datos["contadores"].items():
+            for metrica, motivo, n in cs:
+                if metrica == "titulares_descartados_total":
+                    filas.append({"Proceso": datos["proceso"], "Fuente": fuente,
+                                  "Motivo": motivo, "Titulares": n})
+    return filas
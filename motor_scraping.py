@@ -0,0 +1,239 @@
+# motor_scraping.py
+import re
+from urllib.parse import urljoin
+
+from articulos import ubicar_por_cuerpo
+from clasificador import BUSCADOR_DELITOS, BUSCADOR_DISTRITOS, huella, mascara_secciones, texto_distrito
+from cliente_http import procesar_pagina
+from config import (
+    FUENTES_DEFINIDAS, LARGO_MINIMO_TITULAR, LEER_ARTICULOS, MAX_ARTICULOS_POR_PAGINA
+)
+from deduplicacion import enlace_canonico
+from fechas import ETIQUETAS_FECHA, fecha_de_etiqueta, fecha_en_url, normalizar_fecha
+from instrumentacion import contar, descartar, registrar_error
+from parseo import parsear
+
+# ==============================================================================
+# 1. LISTAS DE TEXTO -> UNA SOLA EXPRESIÓN REGULAR
+# ==============================================================================
+
+
+def compilar_subcadenas(lista):
+    """
+    'Alguna palabra de la lista aparece dentro del texto' en una sola pasada.
+    A diferencia de BuscadorPalabras no exige palabras completas: 'ley'
+    también descarta 'leyes', igual que el antiguo `any(b in titulo ...)`.
+    """
+    if not lista:
+        return None
+    ordenadas = sorted({p.lower() for p in lista}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(p) for p in ordenadas))
+
+# Sube cuando cambia lo que `extraer` saca de una página que no cambió
+VERSION_EXTRACCION = 4   # 2: fecha de publicación; 3: delito solo en el título; 4: contexto
+
+# ==============================================================================
+# 2. MOTOR DE UNA FUENTE
+# ==============================================================================
+
+
+class MotorFuente:
+    """
+    Scraper genérico: descarga (con caché condicional), parseo dirigido,
+    clasificación y deduplicación, todo gobernado por una definición de
+    FUENTES_DEFINIDAS en config.py.
+    """
+
+    def __init__(self, definicion):
+        self.definicion = definicion
+        self.nombre = definicion["nombre"]
+        self.base = definicion["base"]
+        self.contenedor = definicion["contenedor"]
+        self.titulo = definicion.get("titulo")
+        self.resumen = definicion.get("resumen")
+        self.distrito_en_resumen = definicion.get("distrito_en_resumen", False)
+        self.cabeceras = definicion.get("cabeceras")
+        self.largo_minimo = definicion.get("largo_minimo", LARGO_MINIMO_TITULAR)
+        self.categorias_por_url = definicion.get("categorias_por_url", {})
+        self.leer_articulos = definicion.get("leer_articulos", LEER_ARTICULOS)
+
+        self._ignorar_urls = compilar_subcadenas(definicion.get("ignorar_urls"))
+        self._ignorar_titulos = compilar_subcadenas(definicion.get("ignorar_titulos"))
+
+        # <time> y <meta> de publicación se parsean junto a los titulares
+        self._etiquetas = list(self.contenedor) + ETIQUETAS_FECHA
+
+        # Si cambia la definición, las páginas guardadas se vuelven a procesar
+        self.version = huella({**definicion, "leer_articulos": self.leer_articulos},
+                              VERSION_EXTRACCION)
+
+    @property
+    def urls(self):
+        """Todas las páginas que se visitan, con la paginación ya aplicada."""
+        paginas = self.definicion.get("paginas", 1)
+        if paginas <= 1:
+            return list(self.definicion["urls"])
+        patron = self.definicion["paginacion"]
+        return [patron.format(url=url, pagina=pagina)
+                for url in self.definicion["urls"] for pagina in range(1, paginas + 1)]
+
+    # --------------------------------------------------------------------------
+    # Una página
+    # --------------------------------------------------------------------------
+    def _titular(self, nodo):
+        """(titulo, enlace, resumen) de un contenedor, o None si no tiene enlace."""
+        enlace = nodo if nodo.name == "a" else nodo.find("a")
+        if self.titulo:
+            nodo_titulo = nodo.find(self.titulo)
+        else:
+            nodo_titulo = enlace
+        if not nodo_titulo or not enlace:
+            return None
+
+        resumen = ""
+        if self.resumen:
+            nodo_resumen = nodo.find(self.resumen)
+            resumen = nodo_resumen.get_text(strip=True) if nodo_resumen else ""
+        return nodo_titulo.get_text(strip=True), enlace.get("href"), resumen
+
+    def _fechas(self, soup):
+        """
+        {id(contenedor): fecha} con el primer <time>/<meta> de publicación que
+        aparece dentro del contenedor o después de él y antes del siguiente
+        (en los listados con <h2> la fecha suele ser un hermano del título).
+        """
+        fechas = {}
+        ultimo = None
+        for nodo in soup.find_all(self._etiquetas):
+            if nodo.name not in ETIQUETAS_FECHA:
+                ultimo = nodo
+            elif ultimo is not None and id(ultimo) not in fechas:
+                fecha = normalizar_fecha(fecha_de_etiqueta(nodo))
+                if fecha:
+                    fechas[id(ultimo)] = fecha
+        return fechas
+
+    def extraer(self, html):
+        """Noticias de delitos en Lima/Callao encontradas en una página."""
+        noticias = []
+        sin_distrito = []   # Delitos cuyo distrito se busca en el artículo
+        soup = parsear(html, self._etiquetas)
+        fechas = self._fechas(soup)
+
+        for nodo in soup.find_all(self.contenedor):
+            contar("titulares_vistos_total")
+            partes = self._titular(nodo)
+            if partes is None:
+                descartar("sin_enlace")
+                continue
+
+            titulo, enlace, resumen = partes
+            if not enlace or len(titulo) < self.largo_minimo:
+                descartar("corto")
+                continue
+            enlace = urljoin(self.base, enlace)
+
+            if self._ignorar_urls and self._ignorar_urls.search(enlace):
+                descartar("seccion_ignorada")
+                continue
+            if self._ignorar_titulos and self._ignorar_titulos.search(titulo.lower()):
+                descartar("basura")
+                continue
+
+            publicado = fechas.get(id(nodo)) or fecha_en_url(enlace)
+            contexto = resumen if self.distrito_en_resumen else None
+            distrito = BUSCADOR_DISTRITOS.buscar(texto_distrito(titulo, contexto))
+            if not distrito and not self.leer_articulos:
+                descartar("sin_distrito")
+                continue
+
+            # El delito tiene que estar en el título: un resumen genérico no
+            # convierte una nota de deportes en un crimen
+            categoria = BUSCADOR_DELITOS.buscar(titulo) or next(
+                (c for trozo, c in self.categorias_por_url.items() if trozo in enlace), None)
+            if not categoria:
+                descartar("sin_delito" if distrito else "sin_distrito")
+                continue
+            if not distrito:
+                if len(sin_distrito) < MAX_ARTICULOS_POR_PAGINA:
+                    sin_distrito.append((titulo, enlace, resumen, categoria, publicado))
+                else:
+                    descartar("sin_distrito")
+                continue
+
+            noticias.append(self._noticia(titulo, enlace, resumen, distrito, categoria, publicado, contexto))
+
+        # Segunda etapa: el distrito suele estar en la entradilla del artículo
+        ubicados = ubicar_por_cuerpo([pendiente[1] for pendiente in sin_distrito], self.cabeceras)
+        for pendiente, (distrito, origen, entradilla) in zip(sin_distrito, ubicados):
+            contar(f"articulos_{origen}_total")
+            if not distrito:
+                descartar("sin_distrito")
+                continue
+            contar("titulares_ubicados_por_cuerpo_total")
+            titulo, enlace, resumen, categoria, publicado = pendiente
+            noticias.append(self._noticia(titulo, enlace, resumen, distrito, categoria, publicado, entradilla))
+
+        return noticias
+
+    def _noticia(self, titulo, enlace, resumen, distrito, categoria, publicado, contexto=None):
+        noticia = {
+            "Titular": titulo,
+            "Enlace": enlace,
+            "Fuente": self.nombre,
+            "Distrito": distrito,
+            "Categoría": categoria,
+            # Todas las secciones A-F que nombra el texto, no solo la primera palabra
+            "Secciones": mascara_secciones(titulo, categoria=categoria),
+            # <time>/<meta> del listado o fecha de la URL; None si no hay ninguna
+            "Publicado": publicado,
+            # Texto (además del título) donde se encontró el distrito
+            "Contexto": contexto or None,
+        }
+        if self.resumen:
+            noticia["Resumen"] = resumen
+        contar("titulares_conservados_total")
+        if publicado:
+            contar("titulares_con_fecha_total")
+        return noticia
+
+    # --------------------------------------------------------------------------
+    # Todas las páginas de la fuente
+    # --------------------------------------------------------------------------
+    def iterar_noticias(self):
+        """
+        Generador: entrega cada noticia en cuanto se procesa su página, sin
+        esperar al resto de secciones (contrato de streaming de escaneo.py).
+        """
+        enlaces_vistos = set()
+        total = 0
+        print(f"📡 Escaneando {self.nombre}...")
+
+        for url in self.urls:
+            try:
+                # Páginas sin cambios (304 / mismo HTML) no se vuelven a parsear
+                noticias = procesar_pagina(url, self.extraer, version=self.version,
+                                           headers=self.cabeceras)
+            except Exception as e:
+                registrar_error(url, e)
+                print(f"⚠️ Error leve en {url}: {e}")
+                continue
+
+            for noticia in noticias:
+                # La misma nota en dos secciones (o con ?utm_... / AMP) sale una vez
+                clave = enlace_canonico(noticia["Enlace"])
+                if clave in enlaces_vistos:
+                    descartar("repetido")
+                    continue
+                enlaces_vistos.add(clave)
+                total += 1
+                yield noticia
+
+        print(f"✅ {self.nombre}: {total} noticias válidas de Lima")
+
+    def obtener_noticias(self):
+        return list(self.iterar_noticias())
+
+
+# Un motor por medio, en el orden de config.py
+MOTORES = {d["nombre"]: MotorFuente(d) for d in FUENTES_DEFINIDAS}
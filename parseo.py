@@ -0,0 +1,37 @@
+# parseo.py
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from config import PARSEO_DIRIGIDO
+except ImportError:
+    PARSEO_DIRIGIDO = True
+
+try:
+    from instrumentacion import acumular
+except ImportError:
+    def acumular(etapa, segundos):
+        pass
+
+# ==============================================================================
+# PARSEO DIRIGIDO (SOLO LAS ETIQUETAS QUE USA CADA SCRAPER)
+# ==============================================================================
+
+
+def parsear(html, etiquetas):
+    """
+    Devuelve una 'sopa' que contiene solo las etiquetas pedidas (con todo su
+    contenido). Los scrapers llaman luego `soup.find_all(etiquetas)` igual que
+    antes, pero BeautifulSoup ya no crea objetos para menús, scripts, pies de
+    página ni el resto del documento.
+
+    Con PARSEO_DIRIGIDO = False se construye el árbol completo (modo antiguo).
+    """
+    inicio = time.perf_counter()
+    if not PARSEO_DIRIGIDO:
+        soup = BeautifulSoup(html, "html.parser")
+    else:
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(etiquetas))
+    acumular("parseo_segundos", time.perf_counter() - inicio)
+    return soup
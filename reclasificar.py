@@ -0,0 +1,146 @@
+# reclasificar.py
+"""
+Vuelve a pasar todo el archivo de incidentes (incluidas las filas importadas
+de dataset_unificado.csv) por el clasificador de distritos y delitos, para
+que los cambios de PALABRAS_CLAVE, COORDENADAS_LIMA o de las fuentes de
+config.py (también el reparto en secciones A-F) lleguen a las noticias
+viejas sin volver a scrapear.
+
+    python reclasificar.py                 # todos los núcleos, retoma si se cortó
+    python reclasificar.py --procesos 2 --lote 2000
+    python reclasificar.py --desde-cero    # ignora el avance guardado
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from almacen import SIN_DISTRITO, AlmacenNoticias
+from clasificador import (
+    BUSCADOR_DELITOS, BUSCADOR_DISTRITOS, VERSION_REGLAS, huella, mascara_secciones, texto_distrito
+)
+from config import FUENTES_DEFINIDAS
+
+LOTE = 5000                       # Filas por tarea enviada a un proceso
+CLAVE_AVANCE = "reclasificacion"
+CATEGORIA_POR_DEFECTO = "Delito Detectado"
+
+CATEGORIAS_POR_URL = {d["nombre"]: d.get("categorias_por_url", {}) for d in FUENTES_DEFINIDAS}
+
+VERSION_RECLASIFICACION = 2   # 2: distrito en titular + contexto; secciones como al ingerir
+
+# Cambia si cambian las listas de palabras o las categorías por sección
+REGLAS = huella(VERSION_REGLAS, CATEGORIAS_POR_URL, VERSION_RECLASIFICACION)
+
+# ==============================================================================
+# 1. CLASIFICACIÓN DE UN LOTE (CORRE EN LOS PROCESOS DEL POOL)
+# ==============================================================================
+
+DISTRITOS_VALIDOS = set(BUSCADOR_DISTRITOS.palabras)
+CATEGORIAS_VALIDAS = set(BUSCADOR_DELITOS.palabras) | {
+    c.lower() for categorias in CATEGORIAS_POR_URL.values() for c in categorias.values()}
+
+
+def _categoria_por_url(fuente, enlace):
+    return next((c for trozo, c in CATEGORIAS_POR_URL.get(fuente, {}).items() if trozo in enlace), None)
+
+
+def reclasificar_lote(filas):
+    """
+    [(id, distrito, categoria, secciones)] de las filas cuya clasificación
+    cambió.
+
+    Cada campo se calcula sobre el mismo texto que al ingerir: el distrito
+    con el titular y el contexto guardado (resumen o entradilla), el delito y
+    las secciones solo con el titular. Con las mismas reglas, una pasada no
+    cambia nada. Si el texto ya no da un distrito o un delito, se conserva el
+    valor guardado mientras siga existiendo en las listas (las filas
+    anteriores a la columna contexto no guardan dónde se ubicaron); si se
+    quitó de config.py, la fila pasa a SIN_DISTRITO o a la categoría por
+    defecto.
+    """
+    cambios = []
+    for id_, titular, enlace, fuente, distrito, categoria, secciones, contexto in filas:
+        nuevo_distrito = BUSCADOR_DISTRITOS.buscar(texto_distrito(titular, contexto))
+        if not nuevo_distrito:
+            nuevo_distrito = distrito if distrito.lower() in DISTRITOS_VALIDOS else SIN_DISTRITO
+
+        nueva_categoria = BUSCADOR_DELITOS.buscar(titular) or _categoria_por_url(fuente, enlace)
+        if not nueva_categoria:
+            nueva_categoria = categoria if categoria.lower() in CATEGORIAS_VALIDAS else CATEGORIA_POR_DEFECTO
+
+        nuevas_secciones = mascara_secciones(titular, categoria=nueva_categoria)
+
+        if (nuevo_distrito, nueva_categoria, nuevas_secciones) != (distrito, categoria, secciones):
+            cambios.append((id_, nuevo_distrito, nueva_categoria, nuevas_secciones))
+    return cambios
+
+# ==============================================================================
+# 2. RECORRIDO DEL ARCHIVO POR LOTES
+# ==============================================================================
+
+
+def reclasificar(almacen, tamano_lote=LOTE, procesos=None, desde_cero=False):
+    """
+    Lee el archivo por rangos de id y reparte los lotes en un ProcessPool.
+    Los resultados se escriben en orden, cada lote en una transacción junto
+    con el último id terminado: si se interrumpe, la siguiente ejecución
+    con las mismas reglas continúa desde ahí. Devuelve las filas cambiadas.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    almacen.importar_csv_si_falta()
+
+    avance = json.loads(almacen.leer_estado(CLAVE_AVANCE, "{}"))
+    if desde_cero or avance.get("reglas") != REGLAS:
+        avance = {"reglas": REGLAS, "ultimo_id": 0, "completo": False, "cambiadas": 0}
+    elif avance["completo"]:
+        print("✅ El archivo ya está clasificado con las reglas actuales.")
+        return 0
+    else:
+        print(f"↩️ Retomando desde el incidente {avance['ultimo_id']}")
+
+    inicio = time.perf_counter()
+    leidas = 0
+    ultimo_leido = avance["ultimo_id"]
+    en_curso = deque()   # (último id del lote, futuro) en orden de id
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        while True:
+            filas = almacen.leer_lote(ultimo_leido, tamano_lote)
+            if filas:
+                ultimo_leido = filas[-1][0]
+                leidas += len(filas)
+                en_curso.append((ultimo_leido, pool.submit(reclasificar_lote, filas)))
+
+            # Hasta dos lotes por proceso en vuelo; el resto espera en la base
+            if en_curso and (not filas or len(en_curso) >= 2 * procesos):
+                hasta, futuro = en_curso.popleft()
+                cambios = futuro.result()
+                avance.update(ultimo_id=hasta, cambiadas=avance["cambiadas"] + len(cambios))
+                almacen.aplicar_cambios(cambios, CLAVE_AVANCE, json.dumps(avance))
+                print(f"   ... hasta el incidente {hasta}: {avance['cambiadas']} filas cambiadas")
+
+            if not filas and not en_curso:
+                break
+
+    avance["completo"] = True
+    almacen.aplicar_cambios([], CLAVE_AVANCE, json.dumps(avance))
+    segundos = time.perf_counter() - inicio
+    print(f"✅ {leidas} incidentes revisados en {segundos:.1f} s con {procesos} procesos; "
+          f"{avance['cambiadas']} reclasificados.")
+    return avance["cambiadas"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reclasificación por lotes del archivo de Lima Segura")
+    parser.add_argument("--lote", type=int, default=LOTE, help="Filas por tarea")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--desde-cero", action="store_true", help="Ignora el avance guardado")
+    args = parser.parse_args()
+
+    try:
+        reclasificar(AlmacenNoticias(), args.lote, args.procesos, args.desde_cero)
+    except KeyboardInterrupt:
+        print("🛑 Reclasificación interrumpida; se retomará desde el último lote guardado.")
@@ -0,0 +1,150 @@
+# tabla_compacta.py
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+from almacen import variantes_distrito
+from clasificador import BITS_SECCION, SIN_SECCION, nombres_secciones
+from fechas import acotar_ventana
+
+# pyarrow (requirements.txt; también llega con streamlit) guarda titulares y enlaces en un solo buffer
+# contiguo en lugar de un objeto str de Python por fila
+TIPO_TEXTO = "string[pyarrow]" if find_spec("pyarrow") else object
+
+# Columnas con pocas decenas de valores distintos -> códigos enteros
+# (también los días: categorías ordenadas, un rango de fechas es un rango de códigos)
+CATEGORICAS = ["Distrito", "Categoría", "Fuente", "Día"]
+TEXTOS = ["Titular", "Enlace", "Fecha", "Publicado"]
+
+# ==============================================================================
+# TABLA DE INCIDENTES CODIFICADA (UNA POR PROCESO, COMPARTIDA POR SESIONES)
+# ==============================================================================
+
+
+class TablaIncidentes:
+    """
+    Incidentes en memoria con Distrito/Categoría/Fuente como códigos enteros
+    (pd.Categorical) y titulares/enlaces en buffers de pyarrow. Los filtros
+    comparan códigos con np.isin y los conteos usan np.bincount, sin tocar
+    los strings de cada fila.
+    """
+
+    def __init__(self, df):
+        self.largo = len(df)
+        self.categoricas = {c: pd.Categorical(df[c]) for c in CATEGORICAS}
+        self.textos = {c: pd.array(df[c].astype(object), dtype=TIPO_TEXTO) for c in TEXTOS}
+        # Máscara de secciones A-F: 6 bits caben en un byte por fila
+        self.secciones = df["Secciones"].to_numpy(dtype=np.uint8)
+
+    @classmethod
+    def desde_almacen(cls, almacen):
+        return cls(almacen.consultar())
+
+    def valores(self, columna):
+        return list(self.categoricas[columna].categories)
+
+    def codigos(self, columna):
+        return self.categoricas[columna].codes
+
+    # --------------------------------------------------------------------------
+    # Filtros y conteos sobre códigos
+    # --------------------------------------------------------------------------
+    def mascara(self, distritos=None, categorias=None, fuentes=None, secciones=None,
+                desde=None, hasta=None):
+        """
+        Máscara booleana; cada filtro es una lista de valores o None (todos).
+        `secciones` es una máscara de bits: pasan las filas con alguno de ellos.
+        `desde`/`hasta` son días 'AAAA-MM-DD' (hasta exclusivo).
+        """
+        mascara = np.ones(self.largo, dtype=bool)
+        if secciones is not None:
+            mascara &= (self.secciones & np.uint8(secciones)) != 0
+        desde, hasta = acotar_ventana(desde, hasta)   # Sin fecha: fuera de toda ventana
+        if desde is not None or hasta is not None:
+            dias = self.categoricas["Día"].categories
+            inicio = 0 if desde is None else dias.searchsorted(desde)
+            fin = len(dias) if hasta is None else dias.searchsorted(hasta)
+            codigos = self.codigos("Día")
+            mascara &= (codigos >= inicio) & (codigos < fin)
+        if distritos is not None:
+            distritos = variantes_distrito(distritos)   # 'LIMA' también es 'CERCADO DE LIMA'
+        for columna, valores in (("Distrito", distritos), ("Categoría", categorias),
+                                 ("Fuente", fuentes)):
+            if valores is None:
+                continue
+            categorias_col = self.categoricas[columna].categories
+            buscados = categorias_col.get_indexer(list(valores))
+            mascara &= np.isin(self.codigos(columna), buscados[buscados >= 0])
+        return mascara
+
+    def contar_por(self, columna, mascara=None):
+        """Serie valor -> cantidad (np.bincount sobre los códigos)."""
+        codigos = self.codigos(columna)
+        if mascara is not None:
+            codigos = codigos[mascara]
+        cuentas = np.bincount(codigos[codigos >= 0], minlength=len(self.categoricas[columna].categories))
+        return pd.Series(cuentas, index=self.categoricas[columna].categories, name=columna)
+
+    def filtrar(self, ultimas=None, **filtros):
+        """DataFrame (con categóricas) de las filas que pasan los filtros."""
+        indices = np.flatnonzero(self.mascara(**filtros))
+        if ultimas is not None:
+            indices = indices[::-1][:ultimas]
+        return self._filas(indices)
+
+    def pagina(self, numero, tamano, **filtros):
+        """(total, DataFrame) de la página `numero` (desde 1), de la más nueva a la más vieja."""
+        indices = np.flatnonzero(self.mascara(**filtros))[::-1]
+        inicio = (numero - 1) * tamano
+        return len(indices), self._filas(indices[inicio:inicio + tamano])
+
+    def _filas(self, indices):
+        datos = {c: self.textos[c][indices] for c in TEXTOS}
+        datos.update({c: self.categoricas[c][indices] for c in CATEGORICAS})
+        datos["Secciones"] = self.secciones[indices]
+        return pd.DataFrame(datos)[["Titular", "Enlace", "Fuente", "Distrito", "Categoría",
+                                    "Secciones", "Publicado", "Día", "Fecha"]]
+
+    def coordenadas(self, geocodificar, mascara=None):
+        """
+        (lat, lon) por fila geocodificando solo las categorías de Distrito
+        (unas decenas) y expandiendo por código.
+        """
+        distritos = self.categoricas["Distrito"]
+        tabla = geocodificar(pd.Series(distritos.categories, dtype=object))
+        lat = np.append(tabla["lat"].to_numpy(dtype=float), np.nan)   # código -1 -> NaN
+        lon = np.append(tabla["lon"].to_numpy(dtype=float), np.nan)
+        codigos = distritos.codes if mascara is None else distritos.codes[mascara]
+        return lat[codigos], lon[codigos]
+
+    def memoria(self):
+        """Bytes aproximados que ocupa la tabla."""
+        total = self.secciones.nbytes + sum(c.codes.nbytes + c.categories.memory_usage(deep=True)
+                                            for c in self.categoricas.values())
+        for columna in self.textos.values():
+            total += columna.nbytes if hasattr(columna, "nbytes") else pd.Series(columna).memory_usage(deep=True)
+        return total
+
+# ==============================================================================
+# SECCIONES A-F (UNA NOTICIA PUEDE CONTAR EN VARIAS)
+# ==============================================================================
+
+
+def expandir_secciones(df, columna="Secciones"):
+    """
+    Una fila por cada sección presente en la máscara de `columna`, con la
+    columna 'Sección'. Un robo con arma de fuego aparece en Robos y en Armas;
+    la máscara 0 queda como SIN_SECCION. Son 6 comparaciones vectorizadas.
+    """
+    bits = df[columna].to_numpy(dtype=np.int64)
+    partes = [df[(bits & bit) != 0].assign(Sección=nombre) for nombre, bit in BITS_SECCION.items()]
+    partes.append(df[bits == 0].assign(Sección=SIN_SECCION))
+    return pd.concat(partes, ignore_index=True)
+
+
+def etiquetas_secciones(mascaras):
+    """'Robos, Armas' por fila, calculado una vez por máscara distinta."""
+    mascaras = pd.Series(mascaras)
+    nombres = {m: ", ".join(nombres_secciones(int(m))) for m in mascaras.unique()}
+    return mascaras.map(nombres)
@@ -1,84 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
-import re
 import sys
 import os
 
-# --- CONEXIÓN CON CONFIG.PY ---
+# --- CONEXIÓN CON EL MOTOR (la definición de la fuente está en config.py) ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import HEADERS, PALABRAS_CLAVE, DISTRITOS_INTEGRADOS
+from motor_scraping import MOTORES
 
-URL_WEB = "https://diariocorreo.pe/peru/"
+MOTOR = MOTORES['Diario Correo']
+extraer_noticias = MOTOR.extraer     # Una página (parseo + clasificación)
+iterar_noticias = MOTOR.iterar_noticias   # Streaming: noticia por noticia
 
-# ======================================================================
-# FUNCIÓN AUXILIAR
-# ======================================================================
-
-def buscar_palabra_exacta(texto, lista):
-    texto = texto.lower()
-    for palabra in lista:
-        patron = r'\b' + re.escape(palabra) + r'\b'
-        if re.search(patron, texto):
-            return palabra.upper()
-    return None
-
-# ======================================================================
-# FUNCIÓN PRINCIPAL (CONTRATO STREAMLIT)
-# ======================================================================
 
 def obtener_noticias():
-    noticias = []
-    enlaces_vistos = set()
-
-    print("📡 Escaneando Diario Correo...")
-
-    try:
-        response = requests.get(URL_WEB, headers=HEADERS, timeout=10)
-
-        if response.status_code != 200:
-            return noticias
-
-        soup = BeautifulSoup(response.content, "html.parser")
-        titulares = soup.find_all("h2")
-
-        for h in titulares:
-            a = h.find("a")
-            if not a:
-                continue
-
-            titulo = a.text.strip()
-            enlace = a.get("href")
-
-            if not titulo or len(titulo) < 15:
-                continue
-
-            if enlace and not enlace.startswith("http"):
-                enlace = "https://diariocorreo.pe" + enlace
-
-            if enlace in enlaces_vistos:
-                continue
-
-            delito = buscar_palabra_exacta(titulo, PALABRAS_CLAVE)
-            distrito = buscar_palabra_exacta(titulo, DISTRITOS_INTEGRADOS)
-
-            # 🔒 FILTRO CLAVE: SOLO NOTICIAS DE LIMA / CALLAO
-            if not distrito:
-                continue
-
-            if delito:
-                noticias.append({
-                    "Titular": titulo,
-                    "Enlace": enlace,
-                    "Fuente": "Diario Correo",
-                    "Distrito": distrito,
-                    "Categoría": delito
-                })
-                enlaces_vistos.add(enlace)
-
-    except Exception as e:
-        print(f"❌ Error en Diario Correo: {e}")
-
-    return noticias
+    """Noticias de delitos en Lima/Callao de todas las secciones de Diario Correo."""
+    return MOTOR.obtener_noticias()
 
 # ======================================================================
 # PRUEBA LOCAL
@@ -86,3 +20,5 @@ def obtener_noticias():
 if __name__ == "__main__":
     datos = obtener_noticias()
     print(f"Resumen: {len(datos)} noticias detectadas.")
+    for n in datos:
+        print(f"✅ {n['Titular']} | 📍 {n['Distrito']} | 🏷️ {n['Categoría']}")
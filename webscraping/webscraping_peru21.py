@@ -1,51 +1,31 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
+import sys
+import os
 
-def scraping_peru21_lima():
-    url = "https://peru21.pe/actualidad/"
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
-
-    response = requests.get(url, headers=headers)
-
-    if response.status_code != 200:
-        return pd.DataFrame()
-
-    soup = BeautifulSoup(response.text, "html.parser")
+# --- CONEXIÓN CON EL MOTOR (la definición de la fuente está en config.py) ---
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from motor_scraping import MOTORES
 
-    noticias = []
+MOTOR = MOTORES["Perú21"]
+extraer_noticias = MOTOR.extraer     # Una página (parseo + clasificación)
+iterar_noticias = MOTOR.iterar_noticias   # Streaming: noticia por noticia
 
-    # Cada noticia
-    articulos = soup.find_all("article")
 
-    for articulo in articulos:
-        titulo_tag = articulo.find("h2")
-        resumen_tag = articulo.find("p")
-        link_tag = articulo.find("a")
+def obtener_noticias():
+    """Noticias de delitos en Lima/Callao de la sección Actualidad de Perú21."""
+    return MOTOR.obtener_noticias()
 
-        if not titulo_tag or not link_tag:
-            continue
 
-        titulo = titulo_tag.get_text(strip=True)
-        resumen = resumen_tag.get_text(strip=True) if resumen_tag else ""
-        link = link_tag.get("href")
-
-        # Asegurar link completo
-        if link and not link.startswith("http"):
-            link = "https://peru21.pe" + link
-
-        # 🔍 FILTRO LIMA
-        texto_completo = f"{titulo} {resumen}".lower()
-
-        if "lima" in texto_completo:
-            noticias.append({
-                "periodico": "Perú21",
-                "titulo": titulo,
-                "resumen": resumen,
-                "link": link,
-                "region": "Lima"
-            })
+def scraping_peru21_lima():
+    """Contrato antiguo: DataFrame con periodico, titulo, resumen, link, ..."""
+    noticias = obtener_noticias()
+    return pd.DataFrame([{
+        "periodico": n["Fuente"],
+        "titulo": n["Titular"],
+        "resumen": n["Resumen"],
+        "link": n["Enlace"],
+        "region": "Lima",
+        "distrito": n["Distrito"],
+        "categoria": n["Categoría"]
+    } for n in noticias])
 
-    return pd.DataFrame(noticias)